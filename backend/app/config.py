@@ -1,14 +1,17 @@
 import os
 from typing import Optional
-from dotenv import load_dotenv
 
 # Load environment variables from a .env file at the project root
 # Assuming .env is in the same directory as the main execution script or project root
+# python-dotenv is only imported when there is a file to read; deployments configured purely
+# through the environment (scale-to-zero) set DOTENV_SEARCH=false to skip the fallback search too
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env') # Adjust if .env is elsewhere
 if os.path.exists(dotenv_path):
+    from dotenv import load_dotenv
     load_dotenv(dotenv_path)
-else:
+elif os.getenv("DOTENV_SEARCH", "true").lower() == "true":
     # Fallback if .env is in the same directory as config.py (less common for app structure)
+    from dotenv import load_dotenv
     load_dotenv()
 
 
@@ -21,22 +24,154 @@ class Settings:
     DEFAULT_VAPI_ASSISTANT_ID: Optional[str] = os.getenv("DEFAULT_VAPI_ASSISTANT_ID")
     VAPI_PHONE_NUMBER_ID: Optional[str] = os.getenv("VAPI_PHONE_NUMBER_ID")
     VAPI_API_URL: str = "https://api.vapi.ai"
+    VAPI_TIMEOUT_SECONDS: float = float(os.getenv("VAPI_TIMEOUT_SECONDS", "20"))
+    VAPI_MAX_CONNECTIONS: int = int(os.getenv("VAPI_MAX_CONNECTIONS", "100"))
+    VAPI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("VAPI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    VAPI_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("VAPI_KEEPALIVE_EXPIRY_SECONDS", "30")) # Idle pooled connections are kept this long
+
+    # Startup warm-up: pre-open upstream connections and prime caches; /api/ready reports 503 until done
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+    WARMUP_CONNECTIONS: int = int(os.getenv("WARMUP_CONNECTIONS", "4")) # Keep-alive connections per tenant
+    WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "30"))
+
+    # Tenants: extra Vapi accounts from a JSON file; the settings above form the default tenant
+    TENANTS_FILE: str = os.getenv("TENANTS_FILE", "")
+    DEFAULT_TENANT_ID: str = os.getenv("DEFAULT_TENANT_ID", "default")
+    TENANT_MAX_CONCURRENCY: int = int(os.getenv("TENANT_MAX_CONCURRENCY", "20")) # Upstream requests in flight per tenant
+    TENANT_MAX_CLIENTS: int = int(os.getenv("TENANT_MAX_CLIENTS", "32")) # Pooled HTTP clients kept open (LRU)
+
+    # Hedged GETs: a second attempt goes out once the first is slower than the given latency percentile,
+    # limited to VAPI_HEDGE_BUDGET_RATIO extra requests
+    VAPI_HEDGING_ENABLED: bool = os.getenv("VAPI_HEDGING_ENABLED", "false").lower() == "true"
+    VAPI_HEDGE_PERCENTILE: float = float(os.getenv("VAPI_HEDGE_PERCENTILE", "95"))
+    VAPI_HEDGE_BUDGET_RATIO: float = float(os.getenv("VAPI_HEDGE_BUDGET_RATIO", "0.05"))
+    VAPI_HEDGE_MIN_DELAY_MS: float = float(os.getenv("VAPI_HEDGE_MIN_DELAY_MS", "50"))
+    VAPI_HEDGE_INITIAL_DELAY_MS: float = float(os.getenv("VAPI_HEDGE_INITIAL_DELAY_MS", "1000"))
+
+    # Request deadlines (seconds); X-Request-Timeout-Ms overrides, capped at DEADLINE_MAX_SECONDS
+    DEADLINE_DEFAULT_SECONDS: float = float(os.getenv("DEADLINE_DEFAULT_SECONDS", "15"))
+    DEADLINE_WEBHOOK_SECONDS: float = float(os.getenv("DEADLINE_WEBHOOK_SECONDS", "10"))
+    DEADLINE_CREATE_AGENT_SECONDS: float = float(os.getenv("DEADLINE_CREATE_AGENT_SECONDS", "25"))
+    DEADLINE_MAX_SECONDS: float = float(os.getenv("DEADLINE_MAX_SECONDS", "60"))
+    TOOL_HANDLER_TIMEOUT_SECONDS: float = float(os.getenv("TOOL_HANDLER_TIMEOUT_SECONDS", "8"))
+
+    # Bulk deletes
+    BULK_DELETE_CONCURRENCY: int = int(os.getenv("BULK_DELETE_CONCURRENCY", "5"))
+    BULK_DELETE_MAX_RETRIES: int = int(os.getenv("BULK_DELETE_MAX_RETRIES", "3"))
+    BULK_DELETE_PAGE_SIZE: int = int(os.getenv("BULK_DELETE_PAGE_SIZE", "1000")) # Upstream page size when matching filters
+    BULK_DELETE_MAX_MATCHES: int = int(os.getenv("BULK_DELETE_MAX_MATCHES", "10000")) # Filters matching more are rejected
 
     # DateMate Agent Defaults
     DEFAULT_LLM_PROVIDER: str = os.getenv("DEFAULT_LLM_PROVIDER", "openai")
     DEFAULT_LLM_MODEL: str = os.getenv("DEFAULT_LLM_MODEL", "gpt-3.5-turbo")
     DEFAULT_VOICE_PROVIDER: str = os.getenv("DEFAULT_VOICE_PROVIDER", "elevenlabs")
 
+    # Persona prompt templates (versioned JSON files), compiled at startup; reload via POST /api/prompts/reload
+    PROMPT_TEMPLATES_DIR: str = os.getenv("PROMPT_TEMPLATES_DIR", os.path.join(os.path.dirname(__file__), 'prompt_templates'))
+    PROMPT_DEFAULT_TEMPLATE: str = os.getenv("PROMPT_DEFAULT_TEMPLATE", "datemate")
+    PROMPT_DEFAULT_LANGUAGE: str = os.getenv("PROMPT_DEFAULT_LANGUAGE", "en")
+    PROMPT_RENDER_CACHE_SIZE: int = int(os.getenv("PROMPT_RENDER_CACHE_SIZE", "4096"))
+
+    # Response encoding for list/detail endpoints: gzip or brotli (optional package) above a size
+    # threshold, optional MessagePack (optional package); compressed bodies cached by ETag
+    RESPONSE_COMPRESS_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "5")) # 1-9; past 5 costs CPU for little gain on JSON
+    RESPONSE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4")) # 0-11; 4 compresses better than gzip at similar speed
+    RESPONSE_COMPRESS_OFFLOAD_BYTES: int = int(os.getenv("RESPONSE_COMPRESS_OFFLOAD_BYTES", "262144")) # Larger bodies compress on the thread pool
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_MAX_ITEM_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_ITEM_BYTES", "2097152"))
+
+    # Local data (mirror snapshots etc.)
+    DATA_DIR: str = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+    # Assistant catalog mirror; local writes apply immediately, upstream changes via delta sync
+    ASSISTANT_MIRROR_SYNC_ENABLED: bool = os.getenv("ASSISTANT_MIRROR_SYNC_ENABLED", "true").lower() == "true"
+    ASSISTANT_MIRROR_SYNC_INTERVAL_SECONDS: float = float(os.getenv("ASSISTANT_MIRROR_SYNC_INTERVAL_SECONDS", "60"))
+    ASSISTANT_MIRROR_FULL_SYNC_SECONDS: float = float(os.getenv("ASSISTANT_MIRROR_FULL_SYNC_SECONDS", "3600"))
+    # Reads are served from the mirror only if its last sync is at most this old
+    ASSISTANT_MIRROR_MAX_STALENESS_SECONDS: float = float(os.getenv("ASSISTANT_MIRROR_MAX_STALENESS_SECONDS", "300"))
+
+    # Live call events (SSE)
+    EVENTS_SUBSCRIBER_BUFFER: int = int(os.getenv("EVENTS_SUBSCRIBER_BUFFER", "100"))
+    EVENTS_MAX_SUBSCRIBERS: int = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "1000"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+    # Live transcripts assembled from transcript / conversation-update webhooks
+    LIVE_TRANSCRIPT_MAX_CALLS: int = int(os.getenv("LIVE_TRANSCRIPT_MAX_CALLS", "1000")) # Least recently active calls evicted beyond this
+    LIVE_TRANSCRIPT_IDLE_SECONDS: float = float(os.getenv("LIVE_TRANSCRIPT_IDLE_SECONDS", "900")) # Calls without events this long are evicted
+    LIVE_TRANSCRIPT_MAX_ENTRIES: int = int(os.getenv("LIVE_TRANSCRIPT_MAX_ENTRIES", "2000")) # Per call; later turns are dropped
+
+    # Async agent creation jobs
+    AGENT_JOB_WORKERS: int = int(os.getenv("AGENT_JOB_WORKERS", "4"))
+    AGENT_JOB_MAX_QUEUE: int = int(os.getenv("AGENT_JOB_MAX_QUEUE", "100"))
+    AGENT_JOB_RESULT_TTL_SECONDS: int = int(os.getenv("AGENT_JOB_RESULT_TTL_SECONDS", "3600"))
+
+    # Columnar exports (needs pyarrow); each part file holds up to EXPORT_ROWS_PER_FILE rows
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    EXPORT_ROWS_PER_FILE: int = int(os.getenv("EXPORT_ROWS_PER_FILE", "50000"))
+    EXPORT_COMPRESSION: str = os.getenv("EXPORT_COMPRESSION", "zstd")
+    EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "1"))
+    EXPORT_MAX_QUEUE: int = int(os.getenv("EXPORT_MAX_QUEUE", "10"))
+
+    # Rate limiting (per client, per route class) and upstream admission control
+    RATE_LIMIT_READ_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "120"))
+    RATE_LIMIT_READ_BURST: float = float(os.getenv("RATE_LIMIT_READ_BURST", "30"))
+    RATE_LIMIT_WRITE_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "20"))
+    RATE_LIMIT_WRITE_BURST: float = float(os.getenv("RATE_LIMIT_WRITE_BURST", "5"))
+    RATE_LIMIT_WEBHOOK_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_WEBHOOK_PER_MINUTE", "6000"))
+    RATE_LIMIT_WEBHOOK_BURST: float = float(os.getenv("RATE_LIMIT_WEBHOOK_BURST", "500"))
+    UPSTREAM_SHED_THRESHOLD: int = int(os.getenv("UPSTREAM_SHED_THRESHOLD", "50"))
+
+    # Conversation scoring
+    SCORING_CACHE_SIZE: int = int(os.getenv("SCORING_CACHE_SIZE", "50000"))
+    # Scoring has its own process pool, separate from the tool handlers'. It only pays for its
+    # pickling overhead (~15-20% in bench_scoring) on big batches with idle cores to run on,
+    # so it defaults to one worker per spare core and none on a single-core host
+    SCORING_PROCESS_WORKERS: int = int(os.getenv("SCORING_PROCESS_WORKERS", str(min(4, (os.cpu_count() or 1) - 1))))
+    SCORING_PROCESS_POOL_MIN_BATCH: int = int(os.getenv("SCORING_PROCESS_POOL_MIN_BATCH", "2000"))
+    SCORING_CHUNK_SIZE: int = int(os.getenv("SCORING_CHUNK_SIZE", "250"))
+    # Calls scored on the event loop between yields (~145 us each, so ~4 ms per chunk)
+    SCORING_INLINE_CHUNK_SIZE: int = int(os.getenv("SCORING_INLINE_CHUNK_SIZE", "25"))
+    # Most calls one backfill request pages through; scored in batches of the pool threshold
+    SCORING_BACKFILL_MAX_CALLS: int = int(os.getenv("SCORING_BACKFILL_MAX_CALLS", "20000"))
+
     # Webhook Security
     VAPI_WEBHOOK_SECRET: Optional[str] = os.getenv("VAPI_WEBHOOK_SECRET")
+    VAPI_WEBHOOK_TOLERANCE_SECONDS: int = int(os.getenv("VAPI_WEBHOOK_TOLERANCE_SECONDS", "300"))
+    # Timed webhooks send x-vapi-timestamp and sign "<timestamp>." + body. Full replay protection
+    # needs the timestamp: the replay cache only remembers signatures for 2x the tolerance, so an
+    # untimed signed body is accepted again after that. Off by default so senders that only sign
+    # the body keep working (a warning is logged); turn on once every sender is timed.
+    VAPI_WEBHOOK_REQUIRE_TIMESTAMP: bool = os.getenv("VAPI_WEBHOOK_REQUIRE_TIMESTAMP", "false").lower() == "true"
+    VAPI_WEBHOOK_REPLAY_CACHE_SIZE: int = int(os.getenv("VAPI_WEBHOOK_REPLAY_CACHE_SIZE", "10000"))
     YOUR_BACKEND_BASE_URL: str = os.getenv("YOUR_BACKEND_BASE_URL", "http://localhost:8000")
 
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON: bool = os.getenv("LOG_JSON", "true").lower() == "true"
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Comma separated logger=rate pairs; INFO/DEBUG records of these loggers are sampled
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "app.webhook=0.1")
+    LOG_MAX_PAYLOAD_CHARS: int = int(os.getenv("LOG_MAX_PAYLOAD_CHARS", "2000"))
+
+    # Tool handler executors (for THREAD / PROCESS mode handlers)
+    TOOL_THREAD_WORKERS: int = int(os.getenv("TOOL_THREAD_WORKERS", "8"))
+    TOOL_PROCESS_WORKERS: int = int(os.getenv("TOOL_PROCESS_WORKERS", "2"))
+    TOOL_EXECUTOR_MAX_QUEUE: int = int(os.getenv("TOOL_EXECUTOR_MAX_QUEUE", "64"))
+
 
 settings = Settings()
 
-# Basic Logging Configuration (can be expanded)
+# Queue-based logging: records are handed to a background writer thread
 import logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from app.services.logging_service import configure_logging, parse_sample_rates
+configure_logging(
+    level=settings.LOG_LEVEL,
+    json_output=settings.LOG_JSON,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+    max_payload_chars=settings.LOG_MAX_PAYLOAD_CHARS,
+)
 logger = logging.getLogger(__name__)
 
 if not settings.VAPI_API_KEY:
@@ -1,33 +1,122 @@
 import hmac
 import hashlib
+import time
 from typing import Optional
 from fastapi import Request, HTTPException, Header
 
 from app.config import settings, logger
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.tenant_service import current_tenant
+
+# Signatures of webhooks that already passed verification. A replay carries the same
+# signature, so it is rejected with one dict lookup before any HMAC or parsing work.
+_seen_signatures: TTLCache[bool] = TTLCache(
+    maxsize=settings.VAPI_WEBHOOK_REPLAY_CACHE_SIZE,
+    ttl=settings.VAPI_WEBHOOK_TOLERANCE_SECONDS * 2,
+)
+_warned_missing_secret = False
+_warned_untimed = False
+
+metrics.register_gauge("webhook.replay_cache", _seen_signatures.stats)
+
+
+class WebhookVerificationError(Exception):
+    def __init__(self, status_code: int, detail: str, reason: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.reason = reason
+
+
+def compute_signature(secret: str, body: bytes, timestamp: Optional[str] = None) -> str:
+    """
+    Hex HMAC-SHA256 sent as x-vapi-signature: over the raw body, or over "<timestamp>." + body
+    when x-vapi-timestamp (unix seconds or milliseconds) is sent.
+    """
+    message = f"{timestamp}.".encode("utf-8") + body if timestamp else body
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def verify_webhook_signature(
+    body: bytes,
+    signature: Optional[str],
+    timestamp: Optional[str],
+    secret: str,
+    now: Optional[float] = None,
+) -> None:
+    """
+    Verifies a webhook body. Raises WebhookVerificationError on a missing or invalid
+    signature, a missing timestamp (when VAPI_WEBHOOK_REQUIRE_TIMESTAMP is on), a
+    timestamp outside the tolerance window, or a replayed signature. Untimed signatures
+    are only remembered for the replay cache TTL and can be replayed after it.
+    """
+    if not signature:
+        raise WebhookVerificationError(403, "Missing x-vapi-signature header", "missing_signature")
+
+    # O(1) replay check first: only verified signatures ever enter the cache
+    if signature in _seen_signatures:
+        raise WebhookVerificationError(409, "Duplicate webhook delivery", "replay")
+
+    if timestamp:
+        try:
+            sent_at = float(timestamp)
+        except ValueError:
+            raise WebhookVerificationError(403, "Invalid x-vapi-timestamp header", "bad_timestamp")
+        if sent_at > 1e12: # Milliseconds
+            sent_at /= 1000
+        current = now if now is not None else time.time()
+        if abs(current - sent_at) > settings.VAPI_WEBHOOK_TOLERANCE_SECONDS:
+            raise WebhookVerificationError(403, "Webhook timestamp outside the allowed window", "stale_timestamp")
+    elif settings.VAPI_WEBHOOK_REQUIRE_TIMESTAMP:
+        raise WebhookVerificationError(403, "Missing x-vapi-timestamp header", "missing_timestamp")
+    else:
+        _warn_untimed()
+
+    expected_signature = compute_signature(secret, body, timestamp)
+    if not hmac.compare_digest(expected_signature, signature):
+        raise WebhookVerificationError(403, "Invalid signature", "invalid_signature")
+
+    if not _seen_signatures.add(signature, True): # Lost a race with a concurrent duplicate
+        raise WebhookVerificationError(409, "Duplicate webhook delivery", "replay")
+
+
+def _warn_untimed() -> None:
+    global _warned_untimed
+    metrics.incr("webhook.signature.untimed")
+    if not _warned_untimed:
+        logger.warning(
+            "Accepting a signed webhook without x-vapi-timestamp; it can be replayed once the replay cache "
+            "forgets it. Sign \"<timestamp>.\" + body and set VAPI_WEBHOOK_REQUIRE_TIMESTAMP=true."
+        )
+        _warned_untimed = True
+
 
 async def verify_vapi_signature_dependency(
     request: Request,
-    x_vapi_signature: Optional[str] = Header(None, alias="x-vapi-signature") # FastAPI handles case-insensitivity
-):
+    x_vapi_signature: Optional[str] = Header(None, alias="x-vapi-signature"), # FastAPI handles case-insensitivity
+    x_vapi_timestamp: Optional[str] = Header(None, alias="x-vapi-timestamp"),
+) -> bytes:
     """
     FastAPI dependency to verify the signature of incoming webhooks from Vapi.
+    Returns the buffered request body so the route can parse it without a second read.
     """
-    if not settings.VAPI_WEBHOOK_SECRET:
-        logger.warning("VAPI_WEBHOOK_SECRET is not set. Skipping webhook signature verification (NOT RECOMMENDED for production).")
-        return # Allow request if secret not set (for dev/testing or if webhook is public)
-
-    if not x_vapi_signature:
-        logger.error("Webhook verification failed: Missing 'x-vapi-signature' header.")
-        raise HTTPException(status_code=403, detail="Missing x-vapi-signature header")
-
+    global _warned_missing_secret
     request_body_bytes = await request.body()
+    secret = current_tenant().webhook_secret or settings.VAPI_WEBHOOK_SECRET
 
-    hasher = hmac.new(settings.VAPI_WEBHOOK_SECRET.encode('utf-8'), request_body_bytes, hashlib.sha256)
-    expected_signature = hasher.hexdigest()
+    if not secret:
+        if not _warned_missing_secret:
+            logger.warning("VAPI_WEBHOOK_SECRET is not set. Skipping webhook signature verification (NOT RECOMMENDED for production).")
+            _warned_missing_secret = True
+        return request_body_bytes # Allow request if secret not set (for dev/testing or if webhook is public)
 
-    if not hmac.compare_digest(expected_signature, x_vapi_signature):
-        logger.error(f"Webhook signature mismatch. Expected: {expected_signature}, Got: {x_vapi_signature}")
-        raise HTTPException(status_code=403, detail="Invalid signature")
+    try:
+        verify_webhook_signature(request_body_bytes, x_vapi_signature, x_vapi_timestamp, secret)
+    except WebhookVerificationError as e:
+        metrics.incr(f"webhook.signature.rejected.{e.reason}")
+        logger.error(f"Webhook verification failed: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    logger.info("Webhook signature verified successfully via dependency.")
-    # If successful, the dependency allows the request to proceed to the route handler
\ No newline at end of file
+    metrics.incr("webhook.signature.verified")
+    return request_body_bytes
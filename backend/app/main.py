@@ -1,7 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings, logger
-from app.routers import datemate_router, call_router, webhook_router, assistant_router, analytics_router
+from app.services.logging_service import stop_logging
+from app.services.executor_service import start_executors, shutdown_executors
+from app.services.vapi_client import VapiClient, close_http_client
+from app.services.assistant_mirror import start_mirror_sync, stop_mirror_sync
+from app.services.job_service import stop_job_queues
+from app.services.warmup_service import start_warmup, stop_warmup
+from app.services.transcript_service import flush_live_transcripts
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.tenant import TenantMiddleware
+from app.middleware.lazy_routers import LazyRouterMiddleware
+from app.routers import datemate_router, call_router, webhook_router, metrics_router, events_router, health_router
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -9,6 +20,20 @@ app = FastAPI(
     version=settings.VERSION,
     description="Backend service for DateMate Vapi agent creation and general Vapi interactions."
 )
+# Rarely used routers are imported and mounted on their first request (cold start)
+app.add_middleware(LazyRouterMiddleware, routers={
+    "/api/assistants": "app.routers.assistant_router",
+    "/api/calls": "app.routers.analytics_router",
+    "/api/exports": "app.routers.export_router",
+    "/api/prompts": "app.routers.prompt_router",
+    "/api/dashboard": "app.routers.dashboard_router",
+})
+# Tenant resolution runs closest to the routes; everything below it acts for that tenant
+app.add_middleware(TenantMiddleware)
+# Deadline sits inside rate limiting so rate-limit rejections do not consume any budget
+app.add_middleware(DeadlineMiddleware)
+# Rate limiting sits inside CORS so 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
 # ADD cors middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,8 +49,9 @@ app.add_middleware(
 app.include_router(datemate_router.router)
 app.include_router(call_router.router)
 app.include_router(webhook_router.router)
-app.include_router(assistant_router.router)
-app.include_router(analytics_router.router)
+app.include_router(metrics_router.router)
+app.include_router(events_router.router)
+app.include_router(health_router.router)
 
 @app.on_event("startup")
 async def startup_event():
@@ -33,12 +59,23 @@ async def startup_event():
     if not settings.VAPI_API_KEY:
         logger.critical("VAPI_API_KEY is not set. The application may not function correctly with Vapi.")
     # You can add other startup logic here, like initializing DB connections if needed
+    start_executors() # Shared bounded pools for THREAD / PROCESS tool handlers
+    if settings.ASSISTANT_MIRROR_SYNC_ENABLED:
+        start_mirror_sync(VapiClient) # Syncs every tenant that has a Vapi key
+    start_warmup(app) # Background; /api/ready turns 200 once connections and caches are primed
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Vapi Backend Service...")
     # Add cleanup logic here if needed
+    await stop_warmup()
+    await stop_job_queues()
+    await stop_mirror_sync()
+    await flush_live_transcripts() # Calls still in progress are stored as incomplete
+    shutdown_executors()
+    await close_http_client()
+    stop_logging() # Flush queued log records last
 
 
 @app.get("/", tags=["Root"])
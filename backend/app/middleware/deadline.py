@@ -0,0 +1,52 @@
+# app/middleware/deadline.py
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.services.deadline import set_deadline, reset_deadline
+
+# Route defaults by path prefix; first match wins
+ROUTE_DEADLINES = (
+    ("/api/vapi-webhook", settings.DEADLINE_WEBHOOK_SECONDS),
+    ("/api/create-agent", settings.DEADLINE_CREATE_AGENT_SECONDS),
+)
+# Long-lived streams and file downloads have no deadline
+EXEMPT_PREFIXES = ("/api/events", "/api/exports")
+EXEMPT_SUFFIXES = ("/bulk-delete",)
+
+
+def _header_budget(scope: Scope):
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-timeout-ms":
+            try:
+                return max(0.0, float(value) / 1000)
+            except ValueError:
+                return None
+    return None
+
+
+class DeadlineMiddleware:
+    """
+    Gives each API request a time budget: the route default, or the caller's
+    X-Request-Timeout-Ms header (capped at DEADLINE_MAX_SECONDS). Upstream calls and tool handlers read it via
+    app.services.deadline.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path.startswith(EXEMPT_PREFIXES) or path.endswith(EXEMPT_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        budget = next((seconds for prefix, seconds in ROUTE_DEADLINES if path.startswith(prefix)), settings.DEADLINE_DEFAULT_SECONDS)
+        requested = _header_budget(scope)
+        if requested is not None:
+            budget = min(requested, settings.DEADLINE_MAX_SECONDS)
+
+        token = set_deadline(budget)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
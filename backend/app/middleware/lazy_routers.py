@@ -0,0 +1,49 @@
+# app/middleware/lazy_routers.py
+import importlib
+import time
+from typing import Dict
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import logger
+from app.services import metrics
+
+
+class LazyRouterMiddleware:
+    """
+    Imports and mounts rarely used routers on the first request under their prefix,
+    so their imports and route setup stay out of cold start. The OpenAPI schema
+    request mounts all of them so /docs stays complete.
+    `routers` maps a path prefix to the module that defines `router`.
+    """
+
+    def __init__(self, app: ASGIApp, routers: Dict[str, str]):
+        self.app = app
+        self.routers = routers
+        self.mounted = set()
+
+    def _mount(self, fastapi_app, prefix: str) -> None:
+        # Synchronous, so concurrent first requests cannot mount a router twice
+        if prefix in self.mounted:
+            return
+        started = time.perf_counter()
+        module = importlib.import_module(self.routers[prefix])
+        fastapi_app.include_router(module.router)
+        fastapi_app.openapi_schema = None # Regenerated with the new routes
+        self.mounted.add(prefix)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.incr("routers.lazy_mounted")
+        logger.info(f"Mounted {self.routers[prefix]} on first use in {elapsed_ms:.1f}ms")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and len(self.mounted) < len(self.routers):
+            path = scope.get("path", "")
+            fastapi_app = scope["app"]
+            if path == fastapi_app.openapi_url:
+                for prefix in self.routers:
+                    self._mount(fastapi_app, prefix)
+            else:
+                for prefix in self.routers:
+                    if path == prefix or path.startswith(prefix + "/"):
+                        self._mount(fastapi_app, prefix)
+        await self.app(scope, receive, send)
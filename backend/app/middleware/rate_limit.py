@@ -0,0 +1,135 @@
+# app/middleware/rate_limit.py
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.services import metrics
+from app.services.tenant_service import tenant_for_api_key
+from app.services.vapi_client import upstream_in_flight
+
+# Route classes, highest priority first. Webhooks from Vapi are latency-critical
+# during live calls and are never shed for upstream load.
+WEBHOOK, WRITE, READ = "webhook", "write", "read"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Liveness / readiness probes are never limited
+PROBE_PATHS = {"/api/health", "/api/ready"}
+
+
+def classify_route(method: str, path: str) -> Optional[str]:
+    """Returns the route class, or None for paths that are not rate limited."""
+    if not path.startswith("/api/") or method == "OPTIONS" or path in PROBE_PATHS:
+        return None
+    if path.startswith("/api/vapi-webhook"):
+        return WEBHOOK
+    if method in WRITE_METHODS:
+        return WRITE
+    return READ
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by (client, route class). O(1) per check; the least
+    recently seen buckets are dropped once `max_buckets` is reached.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_buckets: int = 100000, clock=time.monotonic):
+        self.limits = limits # route class -> (tokens per second, burst size)
+        self.max_buckets = max_buckets
+        self._clock = clock
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+    def check(self, client: str, route_class: str) -> float:
+        """Takes one token. Returns 0 if allowed, else seconds until a token is available."""
+        rate, burst = self.limits[route_class]
+        now = self._clock()
+        key = (client, route_class)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+
+def _client_key(scope: Scope) -> str:
+    """
+    A valid X-API-Key (each of a tenant's keys is its own client), else the client IP.
+    Unknown keys never get their own bucket: a client sending a fresh random key per
+    request would otherwise bypass the limit and push real clients' buckets out of the LRU.
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"x-api-key":
+            api_key = value.decode("latin-1")
+            if tenant_for_api_key(api_key) is not None:
+                return "key:" + api_key
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class RateLimitMiddleware:
+    """
+    Per-client token-bucket limits per route class, plus admission control: when
+    too many upstream Vapi requests are in flight, reads and then writes are shed
+    with 429 so webhooks keep their share of the upstream quota.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[TokenBucketLimiter] = None):
+        self.app = app
+        self.limiter = limiter or TokenBucketLimiter({
+            WEBHOOK: (settings.RATE_LIMIT_WEBHOOK_PER_MINUTE / 60, settings.RATE_LIMIT_WEBHOOK_BURST),
+            WRITE: (settings.RATE_LIMIT_WRITE_PER_MINUTE / 60, settings.RATE_LIMIT_WRITE_BURST),
+            READ: (settings.RATE_LIMIT_READ_PER_MINUTE / 60, settings.RATE_LIMIT_READ_BURST),
+        })
+        # Lower priority classes are shed earlier
+        self.shed_thresholds = {
+            WRITE: settings.UPSTREAM_SHED_THRESHOLD,
+            READ: settings.UPSTREAM_SHED_THRESHOLD * 0.75,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify_route(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.limiter.check(_client_key(scope), route_class)
+        if retry_after > 0:
+            metrics.incr(f"rate_limit.limited.{route_class}")
+            await self._reject(scope, receive, send, retry_after, "Rate limit exceeded")
+            return
+
+        threshold = self.shed_thresholds.get(route_class)
+        if threshold is not None and upstream_in_flight() >= threshold:
+            metrics.incr(f"rate_limit.shed.{route_class}")
+            await self._reject(scope, receive, send, 1, "Server busy, retry shortly")
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, retry_after: float, detail: str) -> None:
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": detail},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,52 @@
+# app/middleware/tenant.py
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services import metrics
+from app.services.tenant_service import resolve_tenant, use_tenant, reset_tenant, tenant_usage
+
+# Webhooks are authenticated by their signature (checked against the tenant's secret),
+# so a bare X-Tenant-ID header is enough to select the tenant there
+SIGNED_PREFIXES = ("/api/vapi-webhook",)
+
+
+def _headers(scope: Scope):
+    tenant_id = api_key = None
+    for name, value in scope.get("headers", []):
+        if name == b"x-tenant-id":
+            tenant_id = value.decode("latin-1")
+        elif name == b"x-api-key":
+            api_key = value.decode("latin-1")
+    return tenant_id, api_key
+
+
+class TenantMiddleware:
+    """
+    Resolves the tenant of each API request from X-API-Key or X-Tenant-ID and makes it
+    current for the request, so Vapi calls use that tenant's key, pool and quota.
+    Requests without either header act for the default tenant.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id, api_key = _headers(scope)
+        tenant = resolve_tenant(tenant_id, api_key, trust_header=path.startswith(SIGNED_PREFIXES))
+        if tenant is None:
+            metrics.incr("tenants.rejected")
+            response = JSONResponse(status_code=401, content={"detail": "Unknown tenant or invalid API key"})
+            await response(scope, receive, send)
+            return
+
+        tenant_usage(tenant.id).requests += 1
+        token = use_tenant(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_tenant(token)
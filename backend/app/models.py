@@ -1,7 +1,13 @@
-from typing import Dict, Any, Optional, List, Union
-from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional, List, Literal, Union
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+# Response models of the lazily mounted routers (assistants, analytics, exports) build their
+# validators on first use instead of at import, which keeps them off the cold-start path.
+# The webhook and call models stay eager so the first webhook pays nothing extra. Request
+# bodies are left as they are; FastAPI builds those when their router is mounted anyway.
+DEFERRED = ConfigDict(defer_build=True)
+
 # --- Generic Vapi Interaction Models ---
 
 class StartCallRequest(BaseModel):
@@ -31,6 +37,17 @@ class VapiWebhookMessage(BaseModel):
     role: Optional[str] = None
     toolCalls: Optional[List[VapiWebhookToolCall]] = Field(None, alias="tool_calls")
     functionCall: Optional[Dict[str, Any]] = Field(None, alias="function_call") # For older Vapi versions
+    # Call lifecycle fields (status-update, end-of-call-report)
+    call: Optional[Dict[str, Any]] = None
+    status: Optional[str] = None
+    endedReason: Optional[str] = None
+    analysis: Optional[Dict[str, Any]] = None
+    timestamp: Optional[Union[int, float, str]] = None
+    # Live transcript fields (transcript, conversation-update, end-of-call-report)
+    transcript: Optional[str] = None
+    transcriptType: Optional[str] = None # "partial" or "final"
+    messages: Optional[List[Dict[str, Any]]] = None # Whole conversation so far
+    artifact: Optional[Dict[str, Any]] = None
 
 class VapiWebhookPayload(BaseModel):
     message: VapiWebhookMessage
@@ -49,16 +66,32 @@ class CreateAgentRequest(BaseModel):
     voice_model: str = Field(..., description="Voice model ID to be used (frontend will send a default if not on form)")
     difficulty: Optional[str] = Field("easy", description="Difficulty level of the conversation (easy, medium, hard)")
     scenario_description: Optional[str] = Field(None, description="Additional user-defined scenario details")
+    interests: Optional[List[str]] = Field(None, max_length=20, description="Topics the persona enjoys talking about")
+    # Prompt template selection (GET /api/prompts/templates lists what is available)
+    prompt_template: Optional[str] = Field(None, description="Template name (default: PROMPT_DEFAULT_TEMPLATE)")
+    language: Optional[str] = Field(None, description="Template language, e.g. 'en' (default: PROMPT_DEFAULT_LANGUAGE)")
+    prompt_variant: Optional[str] = Field(None, description="A/B variant of the template (default: 'default')")
+    prompt_version: Optional[int] = Field(None, ge=1, description="Pin a template version (default: latest)")
 
 class CreateAgentResponse(BaseModel):
     assistant_id: str
     status: str = "success"
     name: str
     prompt_used: str # For debugging/verification
+    prompt_template: Optional[str] = None # Template the prompt came from, e.g. "datemate/en/default@1"
+
+class AgentJobStatus(BaseModel):
+    job_id: str
+    status: str # queued, running, succeeded, failed
+    result: Optional[CreateAgentResponse] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None # HTTP status the synchronous call would have returned on failure
 
 # Assistant Management Models
 
 class AssistantMetadata(BaseModel):
+    model_config = DEFERRED
+
     app_persona_name: Optional[str] = None
     app_age: Optional[Union[int, str]] = None # Allow string for parsing flexibility
     app_personality: Optional[str] = None
@@ -67,6 +100,8 @@ class AssistantMetadata(BaseModel):
     app_short_description: Optional[str] = None
 
 class AssistantSummary(BaseModel):
+    model_config = DEFERRED
+
     id: str
     name: str  # This is Vapi's name for the assistant
     personality: Optional[str] = None # This should be derived from app_metadata.app_personality
@@ -77,8 +112,11 @@ class AssistantSummary(BaseModel):
     metadata: Optional[AssistantMetadata] = None
 
 class AssistantList(BaseModel):
+    model_config = DEFERRED
+
     data: List[AssistantSummary]
-    next_page_token: Optional[str] = None
+    next_page_token: Optional[str] = None # Opaque keyset cursor for the next page
+    total_estimate: Optional[int] = None # Only with include_total; an upper bound under setting/age filters
 
 class AssistantDetail(AssistantSummary):
     age: int
@@ -94,8 +132,29 @@ class UpdateAssistantRequest(BaseModel):
     difficulty: Optional[str] = None
     setting: Optional[str] = None
 
+class BulkDeleteAssistantsRequest(BaseModel):
+    ids: Optional[List[str]] = Field(None, max_length=1000, description="Explicit assistant IDs to delete.")
+    created_before: Optional[datetime] = Field(None, description="Only assistants created before this time.")
+    difficulty: Optional[str] = Field(None, description="Only assistants with this difficulty.")
+    personality: Optional[str] = Field(None, description="Only assistants with this personality.")
+    dry_run: bool = Field(False, description="Report matching IDs without deleting anything.")
+
 # Call Analytics Models
+class ConversationScore(BaseModel):
+    model_config = DEFERRED
+
+    score: Optional[float] = Field(None, description="Overall conversation quality, 0-100")
+    talk_time_ratio: Optional[float] = Field(None, description="User share of speaking time, 0-1")
+    question_rate: Optional[float] = Field(None, description="Questions asked per user turn")
+    avg_response_latency: Optional[float] = Field(None, description="Seconds between the persona finishing and the user replying")
+    filler_rate: Optional[float] = Field(None, description="Filler words per 100 user words")
+    avg_user_turn_words: Optional[float] = None
+    avg_assistant_turn_words: Optional[float] = None
+    user_turns: int = 0
+
 class CallAnalytics(BaseModel):
+    model_config = DEFERRED
+
     call_id: str
     assistant_id: str
     start_time: Optional[datetime] = None
@@ -105,8 +164,70 @@ class CallAnalytics(BaseModel):
     summary: Optional[str] = None
     success_metrics: Optional[bool] = None
     structured_data: Optional[dict] = None
+    conversation_score: Optional[ConversationScore] = None
+
+class BulkDeleteCallsRequest(BaseModel):
+    ids: Optional[List[str]] = Field(None, max_length=1000, description="Explicit call IDs to delete.")
+    assistant_id: Optional[str] = Field(None, description="Only calls made with this assistant.")
+    created_before: Optional[datetime] = Field(None, description="Only calls created before this time.")
+    dry_run: bool = Field(False, description="Report matching IDs without deleting anything.")
 
 class CallsList(BaseModel):
+    model_config = DEFERRED
+
     data: List[CallAnalytics]
-    next_page: Optional[str] = None
-    total: int
\ No newline at end of file
+    next_page: Optional[str] = None # Opaque keyset cursor for the next page
+    total_estimate: Optional[int] = None # Only with include_total and an assistant_id
+
+# Dashboard Models
+class DashboardError(BaseModel):
+    status_code: int
+    detail: str
+
+class AssistantDashboard(BaseModel):
+    model_config = DEFERRED
+
+    assistant_id: str
+    assistant: Optional[AssistantDetail] = None
+    metrics: Optional[Dict[str, Any]] = None
+    recent_calls: Optional[CallsList] = None # Transcripts trimmed; fetch a call for its transcript
+    errors: Dict[str, DashboardError] = Field(default_factory=dict) # Sections that failed, by section name
+
+# Live Transcript Models
+class TranscriptEntry(BaseModel):
+    offset: int
+    role: str # "user" or "assistant"
+    text: str
+    seconds_from_start: Optional[float] = None
+
+class LiveTranscript(BaseModel):
+    model_config = DEFERRED
+
+    call_id: str
+    status: Literal["live", "ended"]
+    entries: List[TranscriptEntry] # From the requested offset on
+    next_offset: int # Pass as `since` to get only what was added after this response
+    pending: Dict[str, str] = Field(default_factory=dict) # Partial utterance per role, not yet final
+    truncated: bool = False # LIVE_TRANSCRIPT_MAX_ENTRIES reached; later turns were dropped
+
+# Export Models
+class ExportRequest(BaseModel):
+    kind: Literal["calls", "assistants"]
+    format: Literal["parquet", "arrow"] = "parquet"
+    assistant_id: Optional[str] = Field(None, description="Calls only: restrict to this assistant.")
+    created_before: Optional[datetime] = Field(None, description="Calls only: start from calls created before this time.")
+
+class ExportStatus(BaseModel):
+    model_config = DEFERRED
+
+    export_id: str
+    kind: str
+    format: str
+    status: str # queued, running, succeeded, failed
+    rows: int = 0
+    files: List[str] = []
+    cursor: Optional[str] = None # Where a resumed export continues from
+    complete: bool = False
+    json_bytes: int = 0 # Size of the same rows as upstream JSON
+    output_bytes: int = 0
+    error: Optional[str] = None
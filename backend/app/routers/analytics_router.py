@@ -1,11 +1,16 @@
 # app/routers/analytics_router.py
 
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-from app.models import CallAnalytics, CallsList
-from app.config import logger
+from app.models import CallAnalytics, CallsList, LiveTranscript
+from app.config import settings, logger
 from app.services.vapi_client import VapiClient
+from app.services.scoring_service import score_calls
+from app.services.pagination import MAX_UPSTREAM_LIMIT, InvalidCursorError, iter_newest_first, keyset_calls
+from app.services.cache import TTLCache
+from app.services.response_encoding import encode_response
+from app.services.transcript_service import read_transcript
 import httpx
 
 router = APIRouter(
@@ -16,55 +21,108 @@ router = APIRouter(
 def get_vapi_client():
     return VapiClient()
 
+# Call counts per (tenant, assistant) from Vapi analytics; an estimate, so a short TTL is fine
+_call_counts: TTLCache[Optional[int]] = TTLCache(maxsize=1000, ttl=60)
+
+async def estimate_call_count(vapi_client: VapiClient, assistant_id: Optional[str]) -> Optional[int]:
+    """Cheap total for list_calls: Vapi's per-assistant analytics count, cached. None without an assistant."""
+    if not assistant_id:
+        return None
+    key = (vapi_client.tenant.id, assistant_id)
+    if key in _call_counts:
+        return _call_counts.get(key)
+    try:
+        analytics = await vapi_client.get_analytics(assistant_id)
+        count = analytics.get("totalCalls") if isinstance(analytics, dict) else None
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not estimate call count for assistant {assistant_id}: {e}")
+        return None
+    _call_counts.set(key, count)
+    return count
+
+def build_call_analytics(call: Dict[str, Any], score: Optional[Dict[str, Any]], include_transcript: bool = True) -> CallAnalytics:
+    start_time = datetime.fromisoformat(call["startTime"].replace("Z", "+00:00")) if call.get("startTime") else datetime.utcnow()
+    end_time = datetime.fromisoformat(call["endTime"].replace("Z", "+00:00")) if call.get("endTime") else None
+    return CallAnalytics(
+        call_id=call["id"],
+        assistant_id=call["assistantId"],
+        start_time=start_time,
+        end_time=end_time,
+        duration=call.get("duration"),
+        transcript=call.get("transcript") if include_transcript else None,
+        summary=call.get("analysis", {}).get("summary"),
+        success_metrics=call.get("analysis", {}).get("success"),
+        structured_data=call.get("analysis", {}).get("structuredData"),
+        conversation_score=score
+    )
+
+async def load_calls_page(
+    vapi_client: VapiClient,
+    assistant_id: Optional[str],
+    limit: int,
+    page: Optional[str] = None,
+    include_scores: bool = True,
+    include_total: bool = False,
+    include_transcripts: bool = True,
+) -> CallsList:
+    """One keyset page of calls. Raises InvalidCursorError for a bad `page`."""
+    calls_list, next_page = await keyset_calls(vapi_client, assistant_id, limit, page)
+    total_estimate = await estimate_call_count(vapi_client, assistant_id) if include_total else None
+
+    scores = await score_calls(calls_list) if include_scores else {}
+
+    calls = []
+    for call in calls_list:
+        try:
+            calls.append(build_call_analytics(call, scores.get(call["id"]), include_transcripts))
+        except Exception as e:
+            logger.error(f"Error parsing call data: {e}")
+
+    return CallsList(
+        data=calls,
+        next_page=next_page,
+        total_estimate=total_estimate
+    )
+
+def build_assistant_metrics(metrics: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The metrics response for Vapi's analytics payload, or None when there is none for the assistant."""
+    if not metrics or "assistantId" not in metrics:
+        return None
+    return {
+        "assistant_id": metrics.get("assistantId"),
+        "total_calls": metrics.get("totalCalls"),
+        "total_minutes": metrics.get("totalMinutes"),
+        "average_duration": metrics.get("averageDuration"),
+        "success_rate": metrics.get("successRate"),
+        "calls": metrics.get("calls", [])
+    }
+
 @router.get("/", response_model=CallsList)
 async def list_calls(
+    request: Request,
     assistant_id: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    page: Optional[str] = None,
+    page: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_page"),
+    include_scores: bool = Query(True, description="Attach locally computed conversation scores"),
+    include_total: bool = Query(False, description="Add total_estimate from Vapi analytics (needs assistant_id)"),
     vapi_client: VapiClient = Depends(get_vapi_client)
 ):
     """
-    List all calls with pagination support.
+    List calls newest first, ordered by (createdAt, id), with keyset pagination:
+    every page costs the same however deep it is.
     Optionally filter by assistant_id.
     """
     try:
-        calls_data = await vapi_client.list_calls(assistant_id, limit, page)
-        
-        # Handle both list and dictionary responses
-        calls_list = calls_data
-        next_page = None
-        total = len(calls_list) if isinstance(calls_list, list) else 0
-        
-        if isinstance(calls_data, dict):
-            calls_list = calls_data.get("data", [])
-            next_page = calls_data.get("next_page")
-            total = calls_data.get("total", len(calls_list))
-        
-        calls = []
-        for call in calls_list:
-            try:
-                start_time = datetime.fromisoformat(call["startTime"].replace("Z", "+00:00")) if call.get("startTime") else datetime.utcnow()
-                end_time = datetime.fromisoformat(call["endTime"].replace("Z", "+00:00")) if call.get("endTime") else None
-                
-                calls.append(CallAnalytics(
-                    call_id=call["id"],
-                    assistant_id=call["assistantId"],
-                    start_time=start_time,
-                    end_time=end_time,
-                    duration=call.get("duration"),
-                    transcript=call.get("transcript"),
-                    summary=call.get("analysis", {}).get("summary"),
-                    success_metrics=call.get("analysis", {}).get("success"),
-                    structured_data=call.get("analysis", {}).get("structuredData")
-                ))
-            except Exception as e:
-                logger.error(f"Error parsing call data: {e}")
-        
-        return CallsList(
-            data=calls,
-            next_page=next_page,
-            total=total
-        )
+        try:
+            calls_page = await load_calls_page(vapi_client, assistant_id, limit, page, include_scores, include_total)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid page cursor: {e}")
+        return await encode_response(request, calls_page)
+    except HTTPException:
+        raise
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
@@ -72,8 +130,75 @@ async def list_calls(
         logger.exception("Failed to list calls")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/scores/backfill")
+async def backfill_call_scores(
+    assistant_id: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=settings.SCORING_BACKFILL_MAX_CALLS),
+    vapi_client: VapiClient = Depends(get_vapi_client)
+):
+    """
+    Score up to `limit` past calls, newest first, so later reads hit the score cache.
+    Upstream pages are gathered into batches of SCORING_PROCESS_POOL_MIN_BATCH, which
+    go to the scoring process pool when one is configured.
+    """
+    def fetch_page(page_limit: int, created_at_le: Optional[str]):
+        return vapi_client.list_calls(assistant_id, page_limit, created_at_le=created_at_le)
+
+    async def score_batch(batch: List[Dict[str, Any]]) -> None:
+        nonlocal scored
+        scores = await score_calls(batch)
+        scored += len(scores)
+        values.extend(s["score"] for s in scores.values() if s and s.get("score") is not None)
+
+    try:
+        scored, seen = 0, 0
+        values: List[float] = []
+        batch: List[Dict[str, Any]] = []
+        pages = iter_newest_first(fetch_page, min(limit, MAX_UPSTREAM_LIMIT))
+        async for page in pages:
+            page = page[:limit - seen]
+            seen += len(page)
+            batch.extend(page)
+            if len(batch) >= settings.SCORING_PROCESS_POOL_MIN_BATCH:
+                await score_batch(batch)
+                batch = []
+            if seen >= limit:
+                break
+        await pages.aclose()
+        if batch:
+            await score_batch(batch)
+        return {
+            "scored": scored,
+            "average_score": sum(values) / len(values) if values else None
+        }
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to backfill call scores")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{call_id}/transcript", response_model=LiveTranscript)
+async def get_call_transcript(
+    call_id: str,
+    request: Request,
+    since: int = Query(0, ge=0, description="Offset of the first entry to return; pass the previous response's next_offset"),
+):
+    """
+    Transcript of a call assembled from webhook events, available while the call is
+    still going on. Poll with `since` to get only new turns; after the call it is
+    served from the local store.
+    """
+    transcript = await read_transcript(call_id, since)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="No transcript recorded for this call")
+    return await encode_response(request, LiveTranscript(**transcript), immutable=transcript["status"] == "ended")
+
 @router.get("/{call_id}", response_model=CallAnalytics)
-async def get_call_details(call_id: str, vapi_client: VapiClient = Depends(get_vapi_client)):
+async def get_call_details(call_id: str, request: Request, vapi_client: VapiClient = Depends(get_vapi_client)):
     """
     Get detailed analytics for a specific call
     """
@@ -94,7 +219,9 @@ async def get_call_details(call_id: str, vapi_client: VapiClient = Depends(get_v
         except Exception:
             pass
 
-        return CallAnalytics(
+        scores = await score_calls([call])
+
+        details = CallAnalytics(
             call_id=call.get("id", ""),
             assistant_id=call.get("assistantId", ""),
             start_time=start_time,
@@ -104,7 +231,15 @@ async def get_call_details(call_id: str, vapi_client: VapiClient = Depends(get_v
             summary=call.get("analysis", {}).get("summary"),
             success_metrics=call.get("analysis", {}).get("success"),
             structured_data=call.get("analysis", {}).get("structuredData"),
+            conversation_score=scores.get(call["id"]),
         )
+        # An ended call no longer changes, so clients may keep it
+        return await encode_response(request, details, immutable=call.get("status") == "ended")
+    except HTTPException:
+        raise
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Call not found")
@@ -115,23 +250,20 @@ async def get_call_details(call_id: str, vapi_client: VapiClient = Depends(get_v
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/assistant/{assistant_id}/metrics", response_model=dict)
-async def get_assistant_metrics(assistant_id: str, vapi_client: VapiClient = Depends(get_vapi_client)):
+async def get_assistant_metrics(assistant_id: str, request: Request, vapi_client: VapiClient = Depends(get_vapi_client)):
     """
     Get aggregated metrics for a specific assistant
     """
     try:
-        metrics = await vapi_client.get_analytics(assistant_id)
-        if not metrics or "assistantId" not in metrics:
+        metrics = build_assistant_metrics(await vapi_client.get_analytics(assistant_id))
+        if metrics is None:
             raise HTTPException(status_code=404, detail="No metrics found for this assistant")
-        # Optionally, transform or validate the response here
-        return {
-            "assistant_id": metrics.get("assistantId"),
-            "total_calls": metrics.get("totalCalls"),
-            "total_minutes": metrics.get("totalMinutes"),
-            "average_duration": metrics.get("averageDuration"),
-            "success_rate": metrics.get("successRate"),
-            "calls": metrics.get("calls", [])
-        }
+        return await encode_response(request, metrics)
+    except HTTPException:
+        raise
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
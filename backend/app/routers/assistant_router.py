@@ -1,13 +1,20 @@
 # app/routers/assistant_router.py
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
-from app.models import AssistantSummary, AssistantDetail, UpdateAssistantRequest, AssistantList, AssistantMetadata
-from app.config import logger
+from app.models import AssistantSummary, AssistantDetail, UpdateAssistantRequest, AssistantList, AssistantMetadata, BulkDeleteAssistantsRequest
+from app.config import settings, logger
 from app.services.vapi_client import VapiClient
-import re
-import os
-from datetime import datetime
+from app.services.prompt_service import CompiledTemplate, TemplateNotFoundError, parse_template_ref, render_prompt, resolve_template
+from app.services.assistant_parsing import get_assistant_details_from_vapi_object, process_assistant_item
+from app.services.assistant_cache import remember_assistant, cached_assistant, forget_assistant, forget_assistants, load_assistant_catalog, catalog_index, mirror_status
+from app.services.tenant_service import current_tenant
+from app.services.bulk_service import stream_bulk_delete
+from app.services.pagination import InvalidCursorError, decode_cursor, encode_cursor, iter_newest_first
+from app.services.response_encoding import encode_response
+import httpx
+from datetime import datetime, timezone
 
 router = APIRouter(
     prefix="/api/assistants",
@@ -15,7 +22,7 @@ router = APIRouter(
 )
 
 async def get_vapi_client() -> VapiClient:
-    VAPI_API_KEY = os.getenv("VAPI_API_KEY") # Good to check if the env var is set
+    VAPI_API_KEY = current_tenant().vapi_api_key # The request's tenant (default: VAPI_API_KEY env var)
     if not VAPI_API_KEY:
         # This check is important. If the key isn't in the environment,
         # settings.VAPI_API_KEY might also be None or raise an error depending on Pydantic settings.
@@ -26,158 +33,166 @@ async def get_vapi_client() -> VapiClient:
     # No need to pass api_key or call with_api_key().
     return VapiClient()
 
-def get_assistant_details_from_vapi_object(vapi_assistant_obj: Dict[str, Any]) -> Dict[str, Any]:
-    metadata_dict: Dict[str, Any] = {}
-    model_settings = vapi_assistant_obj.get("model", {})
-
-    vapi_name = vapi_assistant_obj.get("name", "Unknown Persona")
-    parsed_name = vapi_name
-    parsed_difficulty_from_name = "medium"
-
-    name_parts = vapi_name.split(" - ")
-    if len(name_parts) > 1:
-        potential_name_with_difficulty = name_parts[-1]
-        match = re.match(r"(.+?)\s*\((easy|medium|hard)\)", potential_name_with_difficulty, re.IGNORECASE)
-        if match:
-            parsed_name = match.group(1).strip()
-            parsed_difficulty_from_name = match.group(2).lower()
-        else:
-            parsed_name = potential_name_with_difficulty.strip()
-    elif "(" in vapi_name and ")" in vapi_name:
-        match = re.match(r"(.+?)\s*\((easy|medium|hard)\)", vapi_name, re.IGNORECASE)
-        if match:
-            parsed_name = match.group(1).strip()
-            parsed_difficulty_from_name = match.group(2).lower()
-    
-    metadata_dict["app_persona_name"] = parsed_name
-
-    system_prompt = ""
-    if isinstance(model_settings, dict) and "messages" in model_settings:
-        for message in model_settings.get("messages", []):
-            if message.get("role") == "system":
-                system_prompt = message.get("content", "")
-                break
-    
-    metadata_dict["app_age"] = 28
-    metadata_dict["app_personality"] = "friendly"
-    metadata_dict["app_setting"] = "a casual place"
-    metadata_dict["app_difficulty"] = parsed_difficulty_from_name
-    metadata_dict["app_short_description"] = f"Chat with {parsed_name}."
-
-    if system_prompt:
-        age_match = re.search(r"(\d+)\s*year-old", system_prompt, re.IGNORECASE)
-        if age_match:
-            metadata_dict["app_age"] = int(age_match.group(1))
-
-        personality_match = re.search(r"identifies as (\w+)|personality is (\w+)|is (\w+) and", system_prompt, re.IGNORECASE)
-        if personality_match:
-            metadata_dict["app_personality"] = next(filter(None, personality_match.groups()), "friendly").lower()
-
-        setting_match = re.search(r"at a (\w+\s*\w*)|in a (\w+\s*\w*)|setting is a (\w+\s*\w*)", system_prompt, re.IGNORECASE)
-        if setting_match:
-            metadata_dict["app_setting"] = next(filter(None, setting_match.groups()), "a casual place").strip()
-        
-        difficulty_match = re.search(r"difficulty is (easy|medium|hard)", system_prompt, re.IGNORECASE)
-        if difficulty_match:
-            metadata_dict["app_difficulty"] = difficulty_match.group(1).lower()
-
-        first_sentence_match = re.match(r"([^\.\!\?]+[\.\!\?])", system_prompt)
-        if first_sentence_match:
-            metadata_dict["app_short_description"] = first_sentence_match.group(1).strip()
-        elif len(system_prompt) > 0:
-            description_candidate = system_prompt.strip()
-            metadata_dict["app_short_description"] = description_candidate[:100] + ("..." if len(description_candidate) > 100 else "")
-    
-    return metadata_dict
-
-def process_assistant_item(item: Dict[str, Any]) -> AssistantSummary:
-    app_metadata_dict = get_assistant_details_from_vapi_object(item)
-    app_metadata_obj = AssistantMetadata(**app_metadata_dict)
-
-    created_at_str = item.get("createdAt")
-    creation_date_obj = datetime.utcnow()
-    if created_at_str:
-        try:
-            creation_date_obj = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-        except ValueError:
-            logger.warning(f"Could not parse createdAt '{created_at_str}' for assistant {item.get('id')}. Using current UTC time.")
-    
-    updated_at_str = item.get("updatedAt")
-    last_used_obj = None
-    if updated_at_str:
-        try:
-            last_used_obj = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
-        except ValueError:
-            logger.warning(f"Could not parse updatedAt '{updated_at_str}' for assistant {item.get('id')}. Setting last_used to None.")
-
-    return AssistantSummary(
-        id=item.get("id"),
-        name=item.get("name", "Unnamed Assistant"), # Vapi's name
-        personality=app_metadata_obj.app_personality, # From app metadata
-        creation_date=creation_date_obj,
-        voice_model=str(item.get("voice", {}).get("voiceId", "")), # Simplified, adjust as needed
-        difficulty=app_metadata_obj.app_difficulty, # From app metadata
-        last_used=last_used_obj,
-        metadata=app_metadata_obj
-    )
-
 @router.get("/", response_model=AssistantList)
 async def list_assistants(
+    request: Request,
     limit: int = Query(100, ge=1, le=100),
+    page_token: Optional[str] = Query(None, description="Opaque token from a previous page's next_page_token"),
+    difficulty: Optional[str] = None,
+    personality: Optional[str] = None,
+    setting: Optional[str] = None,
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    q: Optional[str] = Query(None, description="Persona name prefix"),
+    sort_by: str = Query("creation_date", pattern="^(creation_date|last_used|name)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    refresh: bool = Query(False, description="Reload the catalog from Vapi before answering"),
+    include_total: bool = Query(False, description="Add total_estimate, counted from the catalog indexes"),
     vapi_client: VapiClient = Depends(get_vapi_client)
 ):
+    """
+    List assistants with server-side filtering, sorting and name search,
+    served from the in-memory catalog index. Pages follow keyset cursors, so
+    deep pages cost the same as the first.
+    """
     try:
-        raw_response = await vapi_client.list_assistants(limit=limit)
-        
-        # Handle different response formats
-        if isinstance(raw_response, list):
-            assistants_data = raw_response
-            next_page_token = None
-        else:  # Assume paginated dict response
-            assistants_data = raw_response.get("data", [])
-            next_page_token = raw_response.get("nextPageToken")
-
-        processed = []
-        for item in assistants_data:
-            try:
-                processed.append(process_assistant_item(item))
-            except Exception as e:
-                logger.error(f"Skipping invalid item: {str(e)}")
-        
-        return AssistantList(data=processed, next_page_token=next_page_token)
-    
+        await load_assistant_catalog(vapi_client, force=refresh)
     except Exception as e:
         logger.error(f"API Error: {str(e)}")
         raise HTTPException(500, "Failed to load assistants")
 
+    scope = f"assistants:{sort_by}:{order}"
+    try:
+        after = decode_cursor(page_token, scope)[0] if page_token else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid page_token: {e}")
+
+    index = catalog_index()
+    page, has_more = index.query(
+        difficulty=difficulty,
+        personality=personality,
+        setting=setting,
+        min_age=min_age,
+        max_age=max_age,
+        name_prefix=q,
+        sort_by=sort_by,
+        descending=order == "desc",
+        after=after,
+        limit=limit,
+    )
+    next_page_token = encode_cursor(index.sort_key(page[-1].id, sort_by), scope) if has_more else None
+    total_estimate = index.count_estimate(difficulty=difficulty, personality=personality, name_prefix=q) if include_total else None
+    return await encode_response(request, AssistantList(
+        data=[record.to_summary() for record in page],
+        next_page_token=next_page_token,
+        total_estimate=total_estimate,
+    ))
+
+@router.get("/mirror/status")
+async def get_mirror_status() -> Dict[str, Any]:
+    """Size, sync cursor, last sync time and lag of the local assistant catalog mirror"""
+    return mirror_status()
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+@router.post("/bulk-delete")
+async def bulk_delete_assistants(
+    request: BulkDeleteAssistantsRequest,
+    vapi_client: VapiClient = Depends(get_vapi_client)
+):
+    """
+    Delete many assistants, given explicit IDs and/or filters (created_before, difficulty, personality).
+    Streams one NDJSON line per assistant as each delete completes.
+    """
+    has_filters = any([request.created_before, request.difficulty, request.personality])
+    if not request.ids and not has_filters:
+        raise HTTPException(status_code=400, detail="Provide ids and/or at least one filter")
+
+    target_ids: List[str] = list(request.ids or [])
+    if has_filters:
+        created_before = request.created_before.isoformat() if request.created_before else None
+
+        def fetch_page(limit: int, created_at_le: Optional[str]):
+            if created_at_le is None:
+                return vapi_client.list_assistants(limit=limit, created_before=created_before)
+            return vapi_client.list_assistants(limit=limit, created_at_le=created_at_le)
+
+        # Every assistant matching the filters, not just the first upstream page
+        matched: List[str] = []
+        try:
+            async for assistants_data in iter_newest_first(fetch_page, settings.BULK_DELETE_PAGE_SIZE):
+                for item in assistants_data:
+                    try:
+                        summary = process_assistant_item(item)
+                    except Exception as e:
+                        logger.error(f"Skipping invalid item: {str(e)}")
+                        continue
+                    if request.created_before and _as_utc(summary.creation_date) >= _as_utc(request.created_before):
+                        continue
+                    if request.difficulty and summary.difficulty != request.difficulty.lower():
+                        continue
+                    if request.personality and (summary.personality or "").lower() != request.personality.lower():
+                        continue
+                    matched.append(summary.id)
+                if not request.ids and len(matched) > settings.BULK_DELETE_MAX_MATCHES:
+                    raise HTTPException(status_code=400, detail=f"Filters match more than {settings.BULK_DELETE_MAX_MATCHES} assistants; narrow them")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=str(e))
+        matched_set = set(matched)
+        target_ids = [i for i in target_ids if i in matched_set] if request.ids else matched
+
+    if request.dry_run:
+        return {"matched": len(target_ids), "ids": target_ids}
+
+    logger.info(f"Bulk deleting {len(target_ids)} assistants")
+    return StreamingResponse(
+        stream_bulk_delete(target_ids, vapi_client.delete_assistant, on_complete=forget_assistants),
+        media_type="application/x-ndjson",
+    )
+
+def build_assistant_detail(asst: Dict[str, Any]) -> AssistantDetail:
+    # Retrieve application-specific data from metadata
+    metadata = asst.get("metadata") or {}
+    app_persona_name = metadata.get("app_persona_name", asst.get("name", "Unknown")) # Fallback to Vapi name
+    age = metadata.get("app_age", 25) # Default if not in metadata
+    app_personality = metadata.get("app_personality", "") # Default if not in metadata
+    app_setting = metadata.get("app_setting", "Unknown setting")
+    app_difficulty = metadata.get("app_difficulty", "easy")
+
+    return AssistantDetail(
+        id=asst["id"],
+        name=app_persona_name,             # Use the name from metadata
+        personality=app_personality,       # Use personality from metadata
+        creation_date=datetime.fromisoformat(asst["createdAt"].replace("Z", "+00:00")),
+        voice_model=asst.get("voice", {}).get("voiceId", ""),
+        difficulty=app_difficulty,         # Use difficulty from metadata
+        last_used=datetime.fromisoformat(asst["lastUsed"].replace("Z", "+00:00")) if asst.get("lastUsed") else None,
+        age=age,                           # Use age from metadata
+        setting=app_setting,               # Use setting from metadata
+        system_prompt=asst.get("model", {}).get("messages", [{}])[0].get("content", ""), 
+        total_calls=metadata.get("total_calls", 0), 
+        average_call_duration=metadata.get("average_call_duration", None) 
+    )
+
+async def load_assistant(vapi_client: VapiClient, assistant_id: str) -> Dict[str, Any]:
+    # Served from the mirror while it is within the staleness bound
+    asst = cached_assistant(assistant_id)
+    if asst is None:
+        asst = await vapi_client.get_assistant(assistant_id)
+        remember_assistant(asst)
+    return asst
+
 @router.get("/{assistant_id}", response_model=AssistantDetail) 
-async def get_assistant(assistant_id: str, vapi_client: VapiClient = Depends(get_vapi_client)):
+async def get_assistant(assistant_id: str, request: Request, vapi_client: VapiClient = Depends(get_vapi_client)):
     """Get details of a specific assistant"""
     try:
-        asst = await vapi_client.get_assistant(assistant_id)
-        
-        # Retrieve application-specific data from metadata
-        metadata = asst.get("metadata", {})
-        app_persona_name = metadata.get("app_persona_name", asst.get("name", "Unknown")) # Fallback to Vapi name
-        age = metadata.get("app_age", 25) # Default if not in metadata
-        app_personality = metadata.get("app_personality", "") # Default if not in metadata
-        app_setting = metadata.get("app_setting", "Unknown setting")
-        app_difficulty = metadata.get("app_difficulty", "easy")
-
-        return AssistantDetail(
-            id=asst["id"],
-            name=app_persona_name,             # Use the name from metadata
-            personality=app_personality,       # Use personality from metadata
-            creation_date=datetime.fromisoformat(asst["createdAt"].replace("Z", "+00:00")),
-            voice_model=asst.get("voice", {}).get("voiceId", ""),
-            difficulty=app_difficulty,         # Use difficulty from metadata
-            last_used=datetime.fromisoformat(asst["lastUsed"].replace("Z", "+00:00")) if asst.get("lastUsed") else None,
-            age=age,                           # Use age from metadata
-            setting=app_setting,               # Use setting from metadata
-            system_prompt=asst.get("model", {}).get("messages", [{}])[0].get("content", ""), 
-            total_calls=metadata.get("total_calls", 0), 
-            average_call_duration=metadata.get("average_call_duration", None) 
-        )
+        asst = await load_assistant(vapi_client, assistant_id)
+        return await encode_response(request, build_assistant_detail(asst))
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Assistant not found")
@@ -187,46 +202,118 @@ async def get_assistant(assistant_id: str, vapi_client: VapiClient = Depends(get
         logger.exception(f"Failed to get assistant {assistant_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# UpdateAssistantRequest fields that describe the persona, mapped to their metadata keys.
+# Changing any of them regenerates the system prompt.
+PERSONA_FIELDS = {
+    "name": "app_persona_name",
+    "personality": "app_personality",
+    "difficulty": "app_difficulty",
+    "setting": "app_setting",
+}
+
+def _as_int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def _update_template(ref: Optional[str]) -> CompiledTemplate:
+    """Latest version of the template the assistant was created from; the default one if unknown or gone."""
+    key = parse_template_ref(ref)
+    if key is not None:
+        try:
+            return resolve_template(key.name, key.language, key.variant)
+        except TemplateNotFoundError:
+            logger.warning(f"Prompt template {ref} is no longer available; using the default template")
+    return resolve_template()
+
+def build_assistant_patch(existing: Dict[str, Any], update_data: UpdateAssistantRequest) -> Dict[str, Any]:
+    """
+    Computes the minimal Vapi PATCH body turning `existing` into the requested state.
+    Returns an empty dict when nothing would change.
+    """
+    existing_metadata = existing.get("metadata") or {}
+    # Metadata wins; older assistants without it fall back to values parsed from name/prompt
+    current = {**get_assistant_details_from_vapi_object(existing), **{k: v for k, v in existing_metadata.items() if v is not None}}
+    changes = update_data.model_dump(exclude_unset=True, exclude_none=True)
+
+    persona = dict(current)
+    persona_changed = False
+    for field, metadata_key in PERSONA_FIELDS.items():
+        if field in changes and changes[field] != current.get(metadata_key):
+            persona[metadata_key] = changes[field]
+            persona_changed = True
+
+    patch: Dict[str, Any] = {}
+    if persona_changed:
+        difficulty = persona.get("app_difficulty") or "easy"
+        vapi_name = f"DateMate Persona - {persona['app_persona_name']} ({difficulty})"
+        if vapi_name != existing.get("name"):
+            patch["name"] = vapi_name
+
+        template = _update_template(persona.get("app_prompt_template"))
+        system_prompt = render_prompt(
+            template,
+            name=persona["app_persona_name"],
+            age=_as_int(persona.get("app_age"), 25),
+            personality=persona.get("app_personality") or "friendly",
+            setting=persona.get("app_setting") or "a casual place",
+            difficulty=difficulty,
+            interests=persona.get("app_interests"),
+            scenario_description=persona.get("app_scenario_description")
+        )
+        model = dict(existing.get("model") or {})
+        other_messages = [m for m in model.get("messages", []) if m.get("role") != "system"]
+        model["messages"] = [{"role": "system", "content": system_prompt}] + other_messages
+        if model != existing.get("model"):
+            patch["model"] = model # Vapi replaces nested objects, so send the whole model
+
+        patch["metadata"] = {
+            **existing_metadata,
+            **{key: persona.get(key) for key in (*PERSONA_FIELDS.values(), "app_age")},
+            "app_prompt_template": template.key.ref,
+        }
+
+    voice = existing.get("voice") or {}
+    if "voice_model" in changes and changes["voice_model"] != voice.get("voiceId"):
+        # Keep the provider the assistant already uses
+        patch["voice"] = {**voice, "provider": voice.get("provider", settings.DEFAULT_VOICE_PROVIDER), "voiceId": changes["voice_model"]}
+
+    return patch
+
+@router.patch("/{assistant_id}", response_model=AssistantDetail)
 @router.put("/{assistant_id}", response_model=AssistantDetail)
 async def update_assistant(
     assistant_id: str, 
     update_data: UpdateAssistantRequest,
     vapi_client: VapiClient = Depends(get_vapi_client)
 ):
-    """Update an existing assistant"""
+    """
+    Partially update an existing assistant. Only changed fields are sent upstream,
+    and no upstream call is made at all when nothing changed.
+    """
     try:
-        # First get the existing assistant
-        existing = await vapi_client.get_assistant(assistant_id)
-        
-        # Prepare update payload
-        update_payload = {
-            "name": update_data.name if update_data.name else existing["name"],
-            "description": update_data.personality if update_data.personality else existing.get("description", ""),
-            "voice": {
-                "provider": "11labs",
-                "voiceId": update_data.voice_model if update_data.voice_model else existing.get("voice", {}).get("voiceId", "")
-            }
-        }
-        
-        # Update the assistant
-        updated = await vapi_client.update_assistant(assistant_id, update_payload)
-        
-        return AssistantDetail(
-            id=updated["id"],
-            name=updated.get("name", "Unknown"),
-            personality=updated.get("description", ""),
-            creation_date=datetime.fromisoformat(updated["createdAt"].replace("Z", "+00:00")),
-            voice_model=updated.get("voice", {}).get("voiceId", ""),
-            difficulty=update_data.difficulty or "easy",
-            last_used=datetime.fromisoformat(updated["lastUsed"].replace("Z", "+00:00")) if updated.get("lastUsed") else None,
-            age=25,  # Default value
-            setting=updated.get("description", ""),
-            system_prompt=updated.get("model", {}).get("messages", [{}])[0].get("content", ""),
-            total_calls=0,
-            average_call_duration=None
-        )
+        # Diff against our cached copy; only fetch it on a cache miss
+        existing = cached_assistant(assistant_id)
+        if existing is None:
+            existing = await vapi_client.get_assistant(assistant_id)
+            remember_assistant(existing)
+
+        patch = build_assistant_patch(existing, update_data)
+        if not patch:
+            logger.info(f"No changes for assistant {assistant_id}; skipping upstream update")
+            return build_assistant_detail(existing)
+
+        logger.info(f"Patching assistant {assistant_id} fields: {sorted(patch)}")
+        updated = await vapi_client.patch_assistant(assistant_id, patch)
+        remember_assistant(updated)
+        return build_assistant_detail(updated)
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
+            forget_assistant(assistant_id)
             raise HTTPException(status_code=404, detail="Assistant not found")
         logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
@@ -242,12 +329,16 @@ async def delete_assistant(
     """Delete a specific Vapi assistant"""
     try:
         result = await vapi_client.delete_assistant(assistant_id)
+        forget_assistant(assistant_id)
         logger.info(f"Successfully deleted assistant {assistant_id}")
         return {
             "success": True,
             "message": f"Assistant {assistant_id} deleted successfully",
             "data": result
         }
+    except httpx.TimeoutException:
+        logger.error("Vapi API call timed out")
+        raise HTTPException(status_code=504, detail="Vapi API call timed out")
     except httpx.HTTPStatusError as e:
         logger.error(f"Failed to delete assistant {assistant_id}: {e.response.text}")
         raise HTTPException(
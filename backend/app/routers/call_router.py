@@ -1,10 +1,16 @@
 from fastapi import APIRouter, HTTPException , Depends
-from typing import Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
 import httpx
 
-from app.models import StartCallRequest, StartCallResponse
+from app.models import StartCallRequest, StartCallResponse, BulkDeleteCallsRequest
+from app.services.bulk_service import stream_bulk_delete
+from app.services.pagination import iter_newest_first
+from app.services.scoring_service import forget_scores
 from app.services.vapi_service import start_vapi_phone_call
 from app.services.vapi_client import VapiClient
+from app.services.tenant_service import current_tenant
 from app.config import settings, logger
 
 router = APIRouter(
@@ -21,11 +27,12 @@ async def start_call_endpoint(payload: StartCallRequest):
     """
     Initiates an outbound Vapi phone call using a pre-existing assistant.
     """
-    assistant_id_to_use = payload.assistant_id or settings.DEFAULT_VAPI_ASSISTANT_ID
+    tenant = current_tenant()
+    assistant_id_to_use = payload.assistant_id or tenant.default_assistant_id
     if not assistant_id_to_use:
         logger.error("Assistant ID is missing for /api/start-call (neither in payload nor default config).")
         raise HTTPException(status_code=400, detail="Missing Assistant ID")
-    if not settings.VAPI_PHONE_NUMBER_ID:
+    if not tenant.phone_number_id:
         logger.error("VAPI_PHONE_NUMBER_ID is not configured for /api/start-call.")
         raise HTTPException(status_code=500, detail="Server configuration error: Vapi Phone Number ID missing")
 
@@ -41,7 +48,7 @@ async def start_call_endpoint(payload: StartCallRequest):
         call_data = await start_vapi_phone_call(
             phone_number_to_call=payload.phone_number_to_call,
             assistant_id=assistant_id_to_use,
-            phone_number_id=settings.VAPI_PHONE_NUMBER_ID,
+            phone_number_id=tenant.phone_number_id,
             variable_values=variable_values if variable_values else None
         )
         logger.info(f"Successfully initiated Vapi call. Call ID: {call_data.get('id')}")
@@ -65,6 +72,67 @@ async def start_call_endpoint(payload: StartCallRequest):
     
 
 
+@router.post("/calls/bulk-delete")
+async def bulk_delete_calls(
+    request: BulkDeleteCallsRequest,
+    vapi_client: VapiClient = Depends(get_vapi_client)
+):
+    """
+    Delete many call records, given explicit IDs and/or filters (assistant_id, created_before).
+    Streams one NDJSON line per call as each delete completes.
+    """
+    has_filters = bool(request.assistant_id or request.created_before)
+    if not request.ids and not has_filters:
+        raise HTTPException(status_code=400, detail="Provide ids and/or at least one filter")
+
+    target_ids: List[str] = list(request.ids or [])
+    if has_filters:
+        created_before = request.created_before
+        if created_before and not created_before.tzinfo:
+            created_before = created_before.replace(tzinfo=timezone.utc)
+
+        def fetch_page(limit: int, created_at_le: Optional[str]):
+            if created_at_le is None:
+                return vapi_client.list_calls(
+                    assistant_id=request.assistant_id,
+                    limit=limit,
+                    created_before=created_before.isoformat() if created_before else None
+                )
+            return vapi_client.list_calls(assistant_id=request.assistant_id, limit=limit, created_at_le=created_at_le)
+
+        # Every call matching the filters, not just the first upstream page
+        matched: List[str] = []
+        try:
+            async for calls_list in iter_newest_first(fetch_page, settings.BULK_DELETE_PAGE_SIZE):
+                for call in calls_list:
+                    if request.assistant_id and call.get("assistantId") != request.assistant_id:
+                        continue
+                    if created_before:
+                        created_at = call.get("createdAt") or call.get("startTime")
+                        try:
+                            if not created_at or datetime.fromisoformat(created_at.replace("Z", "+00:00")) >= created_before:
+                                continue
+                        except ValueError:
+                            continue
+                    matched.append(call["id"])
+                if not request.ids and len(matched) > settings.BULK_DELETE_MAX_MATCHES:
+                    raise HTTPException(status_code=400, detail=f"Filters match more than {settings.BULK_DELETE_MAX_MATCHES} calls; narrow them")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Vapi API error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=str(e))
+        matched_set = set(matched)
+        target_ids = [i for i in target_ids if i in matched_set] if request.ids else matched
+
+    if request.dry_run:
+        return {"matched": len(target_ids), "ids": target_ids}
+
+    logger.info(f"Bulk deleting {len(target_ids)} calls")
+    return StreamingResponse(
+        stream_bulk_delete(target_ids, vapi_client.delete_call, on_complete=forget_scores),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.delete("/{call_id}", status_code=200)
 async def delete_call(
     call_id: str,
@@ -0,0 +1,81 @@
+# app/routers/dashboard_router.py
+import asyncio
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.config import logger
+from app.models import AssistantDashboard, DashboardError
+from app.services import metrics
+from app.services.response_encoding import encode_response
+from app.services.vapi_client import VapiClient
+from app.routers.assistant_router import build_assistant_detail, get_vapi_client, load_assistant
+from app.routers.analytics_router import build_assistant_metrics, load_calls_page
+
+router = APIRouter(
+    prefix="/api/dashboard",
+    tags=["Dashboard"],
+)
+
+# 404 details per section, matching the standalone endpoints
+NOT_FOUND = {
+    "assistant": "Assistant not found",
+    "metrics": "No metrics found for this assistant",
+}
+
+async def _section(name: str, work: Awaitable[Any]) -> Tuple[Any, Optional[DashboardError]]:
+    """Runs one section; a failure becomes that section's error instead of failing the page."""
+    try:
+        data = await work
+        if data is None and name in NOT_FOUND:
+            raise HTTPException(status_code=404, detail=NOT_FOUND[name])
+        return data, None
+    except HTTPException as e:
+        error = DashboardError(status_code=e.status_code, detail=str(e.detail))
+    except httpx.TimeoutException:
+        logger.error(f"Dashboard section {name}: Vapi API call timed out")
+        error = DashboardError(status_code=504, detail="Vapi API call timed out")
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        if status_code != 404:
+            logger.error(f"Dashboard section {name}: Vapi API error {status_code} - {e.response.text}")
+        error = DashboardError(status_code=status_code, detail=NOT_FOUND.get(name, "Not found") if status_code == 404 else str(e))
+    except Exception as e:
+        logger.exception(f"Dashboard section {name} failed")
+        error = DashboardError(status_code=500, detail=str(e))
+    metrics.incr(f"dashboard.section_failed.{name}")
+    return None, error
+
+async def _assistant(vapi_client: VapiClient, assistant_id: str):
+    return build_assistant_detail(await load_assistant(vapi_client, assistant_id))
+
+async def _metrics(vapi_client: VapiClient, assistant_id: str):
+    return build_assistant_metrics(await vapi_client.get_analytics(assistant_id))
+
+@router.get("/assistants/{assistant_id}", response_model=AssistantDashboard)
+async def get_assistant_dashboard(
+    assistant_id: str,
+    request: Request,
+    calls_limit: int = Query(10, ge=1, le=100),
+    include_scores: bool = Query(True, description="Attach locally computed conversation scores to recent calls"),
+    vapi_client: VapiClient = Depends(get_vapi_client)
+):
+    """
+    Everything a persona page needs in one request: the assistant, its metrics and its
+    most recent calls (without transcripts), fetched from Vapi concurrently. Always 200:
+    a section that fails is left empty and reported under `errors` with its own status.
+    """
+    sections = {
+        "assistant": _assistant(vapi_client, assistant_id),
+        "metrics": _metrics(vapi_client, assistant_id),
+        "recent_calls": load_calls_page(vapi_client, assistant_id, calls_limit, include_scores=include_scores, include_transcripts=False),
+    }
+    results = await asyncio.gather(*(_section(name, work) for name, work in sections.items()))
+
+    dashboard: Dict[str, Any] = {"assistant_id": assistant_id, "errors": {}}
+    for name, (data, error) in zip(sections, results):
+        dashboard[name] = data
+        if error is not None:
+            dashboard["errors"][name] = error
+    return await encode_response(request, AssistantDashboard(**dashboard))
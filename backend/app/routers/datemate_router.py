@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import JSONResponse
+from typing import Optional
 import httpx
 
-from app.models import CreateAgentRequest, CreateAgentResponse
-from app.services.prompt_service import generate_datemate_prompt
+from app.models import CreateAgentRequest, CreateAgentResponse, AgentJobStatus
+from app.services.prompt_service import CompiledTemplate, TemplateNotFoundError, render_prompt, resolve_template
 from app.services.vapi_service import create_vapi_assistant
+from app.services.assistant_cache import remember_assistant
+from app.services.job_service import JobQueue, JobQueueFullError
+from app.services.tenant_service import current_tenant
 from app.config import settings, logger
 
 router = APIRouter(
@@ -11,18 +16,27 @@ router = APIRouter(
     tags=["DateMate Agent Creation"],
 )
 
-@router.post("/create-agent", response_model=CreateAgentResponse, status_code=201)
-async def create_datemate_agent_endpoint(payload: CreateAgentRequest):
+def _prompt_template(payload: CreateAgentRequest) -> CompiledTemplate:
+    try:
+        return resolve_template(payload.prompt_template, payload.language, payload.prompt_variant, payload.prompt_version)
+    except TemplateNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def create_datemate_agent(payload: CreateAgentRequest) -> CreateAgentResponse:
     """
     Creates a new Vapi Assistant for DateMate based on the provided persona.
+    Upstream and configuration errors are raised as HTTPException.
     """
+    template = _prompt_template(payload)
     try:
-        system_prompt = generate_datemate_prompt(
+        system_prompt = render_prompt(
+            template,
             name=payload.name,
             age=payload.age,
             personality=payload.personality,
             setting=payload.setting,
             difficulty=payload.difficulty,
+            interests=payload.interests,
             scenario_description=payload.scenario_description
         )
         logger.info(f"Generated prompt for {payload.name}: {system_prompt[:200]}...")
@@ -40,19 +54,24 @@ async def create_datemate_agent_endpoint(payload: CreateAgentRequest):
             app_persona_name=payload.name,  # The actual character name for metadata
             age=payload.age,
             app_personality=payload.personality,
-            app_setting=payload.setting
+            app_setting=payload.setting,
+            scenario_description=payload.scenario_description,
+            interests=payload.interests,
+            prompt_template=template.key.ref
         )
 
         assistant_id = assistant_data.get("id")
         if not assistant_id:
             logger.error(f"Vapi assistant creation succeeded but no ID returned. Response: {assistant_data}")
             raise HTTPException(status_code=500, detail="Assistant created but ID missing in Vapi response.")
+        remember_assistant(assistant_data)
 
         logger.info(f"Successfully created Vapi assistant '{payload.name}'. Assistant ID: {assistant_id}")
         return CreateAgentResponse(
             assistant_id=assistant_id,
             name=payload.name,
-            prompt_used=system_prompt
+            prompt_used=system_prompt,
+            prompt_template=template.key.ref
         )
     except ValueError as ve: # Catch configuration errors from vapi_service
         logger.error(f"Configuration error during agent creation: {ve}")
@@ -66,4 +85,58 @@ async def create_datemate_agent_endpoint(payload: CreateAgentRequest):
         raise HTTPException(status_code=e.response.status_code, detail=error_detail)
     except Exception as e:
         logger.exception(f"An unexpected error occurred in /api/create-agent for {payload.name}")
-        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
+
+# Background workers for opt-in async creation (?async_mode=true)
+agent_jobs = JobQueue(
+    "create_agent",
+    create_datemate_agent,
+    workers=settings.AGENT_JOB_WORKERS,
+    max_queue=settings.AGENT_JOB_MAX_QUEUE,
+    result_ttl=settings.AGENT_JOB_RESULT_TTL_SECONDS,
+)
+
+def _job_status(job) -> AgentJobStatus:
+    return AgentJobStatus(
+        job_id=job.id,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        status_code=job.status_code,
+    )
+
+@router.post("/create-agent", response_model=CreateAgentResponse, status_code=201)
+async def create_datemate_agent_endpoint(
+    payload: CreateAgentRequest,
+    async_mode: bool = Query(False, description="Return 202 with a job id instead of waiting for Vapi"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Creates a new Vapi Assistant for DateMate based on the provided persona.
+    With async_mode the request is validated, queued, and answered with 202 right away;
+    poll GET /api/create-agent/jobs/{job_id} for the result.
+    """
+    if not async_mode:
+        return await create_datemate_agent(payload)
+
+    _prompt_template(payload) # Unknown templates are rejected now rather than failing the job
+    try:
+        job = agent_jobs.submit(payload, idempotency_key=idempotency_key)
+    except JobQueueFullError as e:
+        logger.warning(f"Rejecting async agent creation for {payload.name}: {e}")
+        raise HTTPException(status_code=503, detail="Too many pending agent creation jobs", headers={"Retry-After": "5"})
+
+    logger.info(f"Queued agent creation job {job.id} for {payload.name}")
+    return JSONResponse(
+        status_code=202,
+        content=_job_status(job).model_dump(),
+        headers={"Location": f"/api/create-agent/jobs/{job.id}"},
+    )
+
+@router.get("/create-agent/jobs/{job_id}", response_model=AgentJobStatus)
+async def get_agent_job(job_id: str):
+    """Status and, once finished, result or error of an async agent creation job."""
+    job = agent_jobs.get(job_id)
+    if job is None or job.tenant.id != current_tenant().id: # Another tenant's job is reported as missing
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return _job_status(job)
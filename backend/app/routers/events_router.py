@@ -0,0 +1,75 @@
+# app/routers/events_router.py
+
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.config import settings, logger
+from app.services.event_bus import call_event_bus
+from app.services.tenant_service import current_tenant
+
+router = APIRouter(
+    prefix="/api/events",
+    tags=["Call Events"],
+)
+
+async def _event_stream(request: Request, tenant_id: str, call_id: Optional[str], assistant_id: Optional[str]) -> AsyncIterator[str]:
+    # Subscribed here rather than in the endpoint: a client that disconnects before the
+    # stream starts never runs the generator, and would otherwise leave its queue behind
+    try:
+        subscriber = call_event_bus.subscribe(tenant_id, call_id=call_id, assistant_id=assistant_id)
+    except RuntimeError as e: # Filled up since the endpoint checked
+        logger.warning(f"Rejecting event subscription: {e}")
+        yield f"event: error\ndata: {json.dumps({'reason': str(e)})}\n\n"
+        return
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            get_event = asyncio.ensure_future(subscriber.queue.get())
+            evicted = asyncio.ensure_future(subscriber.evicted.wait())
+            try:
+                done, _ = await asyncio.wait(
+                    {get_event, evicted},
+                    timeout=settings.EVENTS_HEARTBEAT_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                for task in (get_event, evicted):
+                    if not task.done():
+                        task.cancel()
+
+            if get_event in done:
+                event = get_event.result()
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            elif evicted in done:
+                yield "event: evicted\ndata: {\"reason\": \"slow consumer\"}\n\n"
+                return
+            else:
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n" # Heartbeat keeps proxies from closing idle streams
+    finally:
+        call_event_bus.unsubscribe(subscriber)
+
+@router.get("/calls")
+async def stream_call_events(
+    request: Request,
+    call_id: Optional[str] = None,
+    assistant_id: Optional[str] = None,
+):
+    """
+    Server-sent events feed of call status changes, end-of-call reports and analysis
+    results, optionally filtered by call_id and/or assistant_id.
+    """
+    if call_event_bus.is_full():
+        logger.warning("Rejecting event subscription: too many event subscribers")
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+
+    return StreamingResponse(
+        _event_stream(request, current_tenant().id, call_id, assistant_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,117 @@
+# app/routers/export_router.py
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.config import settings, logger
+from app.models import ExportRequest, ExportStatus
+from app.services.export_service import create_manifest, export_file_path, exports_available, load_manifest, run_export
+from app.services.job_service import Job, JobQueue, JobQueueFullError
+from app.services.tenant_service import current_tenant
+from app.services.vapi_client import VapiClient
+
+router = APIRouter(
+    prefix="/api/exports",
+    tags=["Exports"],
+)
+
+MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+async def _run_export_job(export_id: str):
+    return await run_export(export_id, VapiClient())
+
+export_jobs = JobQueue(
+    "export",
+    _run_export_job,
+    workers=settings.EXPORT_WORKERS,
+    max_queue=settings.EXPORT_MAX_QUEUE,
+    result_ttl=settings.AGENT_JOB_RESULT_TTL_SECONDS,
+)
+
+# Latest job per export id (an export can be resumed several times)
+_export_jobs: Dict[str, Job] = {}
+
+def _status(manifest: dict) -> ExportStatus:
+    job = _export_jobs.get(manifest["export_id"])
+    if job is not None:
+        status = job.status
+    else: # No job in this process, e.g. after a restart
+        status = "succeeded" if manifest["complete"] else "failed" if manifest["error"] else "interrupted"
+    return ExportStatus(
+        export_id=manifest["export_id"],
+        kind=manifest["kind"],
+        format=manifest["format"],
+        status=status,
+        rows=manifest["rows"],
+        files=manifest["files"],
+        cursor=manifest["cursor"],
+        complete=manifest["complete"],
+        json_bytes=manifest["json_bytes"],
+        output_bytes=manifest["output_bytes"],
+        error=manifest["error"] or (job.error if job is not None else None),
+    )
+
+def _submit(manifest: dict) -> JSONResponse:
+    try:
+        _export_jobs[manifest["export_id"]] = export_jobs.submit(manifest["export_id"])
+    except JobQueueFullError:
+        raise HTTPException(status_code=503, detail="Too many pending exports", headers={"Retry-After": "30"})
+    return JSONResponse(
+        status_code=202,
+        content=_status(manifest).model_dump(),
+        headers={"Location": f"/api/exports/{manifest['export_id']}"},
+    )
+
+def _require_exports() -> None:
+    if not exports_available():
+        raise HTTPException(status_code=501, detail="Exports require the optional 'pyarrow' package on the server")
+    if not current_tenant().vapi_api_key:
+        raise HTTPException(status_code=500, detail="VAPI_API_KEY is not configured in the environment.")
+
+@router.post("", response_model=ExportStatus, status_code=202)
+async def start_export(request: ExportRequest):
+    """
+    Starts a background export of calls (newest first, paged from Vapi) or assistants
+    (from the local catalog mirror) to Parquet or Arrow IPC part files.
+    Poll GET /api/exports/{export_id}; download parts from /api/exports/{export_id}/files/{name}.
+    """
+    _require_exports()
+    created_before = request.created_before.isoformat() if request.created_before else None
+    manifest = create_manifest(request.kind, request.format, request.assistant_id, created_before)
+    logger.info(f"Starting {request.format} export {manifest['export_id']} of {request.kind}")
+    return _submit(manifest)
+
+@router.post("/{export_id}/resume", response_model=ExportStatus, status_code=202)
+async def resume_export(export_id: str):
+    """Continues an interrupted or failed export from its saved cursor."""
+    _require_exports()
+    manifest = load_manifest(export_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if manifest["complete"]:
+        raise HTTPException(status_code=409, detail="Export is already complete")
+    job = _export_jobs.get(export_id)
+    if job is not None and job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="Export is already running")
+    logger.info(f"Resuming export {export_id} from cursor {manifest['cursor']}")
+    return _submit(manifest)
+
+@router.get("/{export_id}", response_model=ExportStatus)
+async def get_export(export_id: str):
+    """Progress of an export: rows and part files written so far, and the resume cursor."""
+    manifest = load_manifest(export_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return _status(manifest)
+
+@router.get("/{export_id}/files/{name}")
+async def download_export_file(export_id: str, name: str):
+    """Downloads one finished part file of an export."""
+    path = export_file_path(export_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Export file not found")
+    return FileResponse(path, media_type=MEDIA_TYPES.get(name.rsplit(".", 1)[-1], "application/octet-stream"), filename=name)
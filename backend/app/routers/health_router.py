@@ -0,0 +1,24 @@
+# app/routers/health_router.py
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.warmup_service import warmup_status
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Health"],
+)
+
+@router.get("/health")
+async def liveness():
+    """Liveness probe: the process is up and serving."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until startup warm-up has finished (immediately ready without warm-up)."""
+    status = warmup_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status, headers={"Retry-After": "1"})
+    return status
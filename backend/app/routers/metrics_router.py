@@ -0,0 +1,19 @@
+# app/routers/metrics_router.py
+
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.services import metrics
+from app.services.logging_service import get_dropped_log_counts
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Metrics"],
+)
+
+metrics.register_gauge("logging.dropped", get_dropped_log_counts)
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Current in-process counters and gauges (executor queue depths, drops, ...)"""
+    return metrics.snapshot()
@@ -0,0 +1,30 @@
+# app/routers/prompt_router.py
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException
+
+from app.config import logger
+from app.services.prompt_service import TemplateError, reload_templates, template_registry
+
+router = APIRouter(
+    prefix="/api/prompts",
+    tags=["Prompt Templates"],
+)
+
+@router.get("/templates")
+async def list_templates() -> List[Dict[str, Any]]:
+    """Loaded persona prompt templates: name, language, variant and version."""
+    return template_registry().describe()
+
+@router.post("/reload")
+async def reload_prompt_templates() -> Dict[str, Any]:
+    """
+    Recompiles the template files without a deploy. If any file fails to compile,
+    nothing changes and the error is returned.
+    """
+    try:
+        keys = reload_templates()
+    except TemplateError as e:
+        logger.error(f"Prompt template reload failed: {e}")
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"loaded": [key.ref for key in keys]}
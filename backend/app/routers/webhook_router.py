@@ -1,30 +1,65 @@
 import json
-from fastapi import APIRouter, HTTPException, Depends, Request
+import logging
+from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any
+from pydantic import ValidationError
 
-from app.models import VapiWebhookPayload, VapiWebhookToolCall, VapiWebhookToolCallFunction, ToolResultOutput
+from app.models import VapiWebhookPayload, VapiWebhookMessage, VapiWebhookToolCall, VapiWebhookToolCallFunction, ToolResultOutput
 from app.dependencies.security import verify_vapi_signature_dependency
-# from app.tool_handlers.example_handlers import TOOL_HANDLERS_REGISTRY
+from app.tool_handlers.example_handlers import TOOL_HANDLERS_REGISTRY
+from app.tool_handlers.registry import dispatch_tool_call
 from app.config import logger
+from app.services.logging_service import truncate_payload
+from app.services.event_bus import call_event_bus
+from app.services.tenant_service import current_tenant
+from app.services.transcript_service import finish_call, record_transcript_event
+
+# High-volume receipt logs go through their own logger so they can be sampled (LOG_SAMPLE_RATES)
+webhook_logger = logging.getLogger("app.webhook")
 
 router = APIRouter(
     prefix="/api",
     tags=["Vapi Webhooks"],
 )
 
+# Message types forwarded to /api/events/calls subscribers
+CALL_EVENT_TYPES = {"status-update", "end-of-call-report"}
+# Message types assembled into live transcripts (/api/calls/{id}/transcript)
+TRANSCRIPT_EVENT_TYPES = {"transcript", "conversation-update"}
+
+def publish_call_event(message: VapiWebhookMessage) -> None:
+    call = message.call or {}
+    event = {
+        "tenant_id": current_tenant().id,
+        "type": message.type,
+        "call_id": call.get("id"),
+        "assistant_id": call.get("assistantId"),
+        "status": message.status or call.get("status"),
+        "ended_reason": message.endedReason or call.get("endedReason"),
+        "timestamp": message.timestamp,
+    }
+    call_event_bus.publish(event)
+    if message.type == "end-of-call-report" and message.analysis:
+        call_event_bus.publish({**event, "type": "analysis", "analysis": message.analysis})
+
 @router.post("/vapi-webhook", status_code=200)
 async def vapi_webhook_handler_endpoint(
-    payload: VapiWebhookPayload,
-    # request: Request, # Raw request if needed for manual signature verification
-    # Enable signature verification by uncommenting the next line
-    # _signature_check: Any = Depends(verify_vapi_signature_dependency)
+    body: bytes = Depends(verify_vapi_signature_dependency), # Verified, buffered once
 ):
     """
     Handles incoming webhooks from Vapi, primarily for tool/function calls.
     Vapi expects a specific response format for tool calls.
     """
-    logger.info(f"Received Vapi webhook. Message type: {payload.message.type}")
-    logger.debug(f"Webhook Payload Received: {payload.model_dump_json(indent=2)}")
+    # Parsed only after the signature / replay checks have passed
+    try:
+        payload = VapiWebhookPayload.model_validate_json(body)
+    except ValidationError as e:
+        logger.error(f"Invalid webhook payload: {e.error_count()} validation errors")
+        raise HTTPException(status_code=422, detail=e.errors())
+
+    webhook_logger.info("Received Vapi webhook. Message type: %s", payload.message.type)
+    if webhook_logger.isEnabledFor(logging.DEBUG):
+        webhook_logger.debug("Webhook Payload Received: %s", truncate_payload(payload))
 
     response_tool_results_list: List[Dict[str, Any]] = [] # Store as list of dicts for final JSON
 
@@ -50,7 +85,7 @@ async def vapi_webhook_handler_endpoint(
 
 
         if not tool_calls_to_process:
-            logger.info("Webhook: No tool calls to process in the message.")
+            webhook_logger.info("Webhook: No tool calls to process in the message.")
             return {"message": "Webhook received, no tool calls to process."}
 
         for tool_call in tool_calls_to_process:
@@ -59,15 +94,15 @@ async def vapi_webhook_handler_endpoint(
             try:
                 parameters = json.loads(tool_call.function.arguments)
             except json.JSONDecodeError:
-                logger.error(f"Could not parse params for tool '{tool_name}' (ID: {tool_call_id}). Args: {tool_call.function.arguments}")
+                logger.error("Could not parse params for tool '%s' (ID: %s). Args: %s", tool_name, tool_call_id, truncate_payload(tool_call.function.arguments))
                 error_result = ToolResultOutput(tool_call_id=tool_call_id, result={"success": False, "error": f"Invalid JSON args for tool {tool_name}"})
                 response_tool_results_list.append(error_result.model_dump())
                 continue
 
             if tool_name in TOOL_HANDLERS_REGISTRY:
-                handler_fn = TOOL_HANDLERS_REGISTRY[tool_name]
+                handler_entry = TOOL_HANDLERS_REGISTRY[tool_name]
                 try:
-                    tool_result_obj: ToolResultOutput = await handler_fn(parameters, tool_call_id)
+                    tool_result_obj: ToolResultOutput = await dispatch_tool_call(handler_entry, parameters, tool_call_id)
                     response_tool_results_list.append(tool_result_obj.model_dump())
                 except Exception as e:
                     logger.exception(f"Error executing tool handler for '{tool_name}' (ID: {tool_call_id})")
@@ -79,11 +114,19 @@ async def vapi_webhook_handler_endpoint(
                 response_tool_results_list.append(no_handler_result.model_dump())
 
         if response_tool_results_list:
-            logger.info(f"Responding to Vapi with tool results: {json.dumps(response_tool_results_list)}")
+            webhook_logger.info("Responding to Vapi with tool results: %s", truncate_payload(response_tool_results_list))
             return {"tool_results": response_tool_results_list} # Vapi expects this structure
         else:
             logger.info("No tool results to send, though tool_calls message type was received.")
             return {"message": "Webhook processed, no valid tool calls found or handled."}
+    elif payload.message.type.split("[", 1)[0] in TRANSCRIPT_EVENT_TYPES: # e.g. 'transcript[transcriptType="final"]'
+        await record_transcript_event(payload.message)
+        return {"message": f"Webhook type '{payload.message.type}' received and recorded."}
+    elif payload.message.type in CALL_EVENT_TYPES:
+        publish_call_event(payload.message)
+        if payload.message.type == "end-of-call-report":
+            await finish_call(payload.message) # Stores the live transcript and frees its buffer
+        return {"message": f"Webhook type '{payload.message.type}' received and published."}
     else:
-        logger.info(f"Received webhook type '{payload.message.type}', not a tool/function call. No action by default.")
+        webhook_logger.info("Received webhook type '%s', not a tool/function call. No action by default.", payload.message.type)
         return {"message": f"Webhook type '{payload.message.type}' received and acknowledged."}
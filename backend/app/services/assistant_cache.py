@@ -0,0 +1,52 @@
+# app/services/assistant_cache.py
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import settings
+from app.services.assistant_index import AssistantIndex
+from app.services.assistant_mirror import mirror_for
+
+# Single entry point for what this service knows locally about assistants.
+# Reads and writes go to the current tenant's assistant mirror, which also keeps
+# that tenant's catalog index current.
+
+
+def remember_assistant(assistant: Dict[str, Any]) -> None:
+    """Records an assistant we just read or wrote."""
+    mirror_for().apply(assistant)
+
+
+def cached_assistant(assistant_id: str, max_staleness: float = settings.ASSISTANT_MIRROR_MAX_STALENESS_SECONDS) -> Optional[Dict[str, Any]]:
+    """The mirrored copy of an assistant, or None if unknown or the mirror is too stale."""
+    mirror = mirror_for()
+    if not mirror.is_fresh(max_staleness):
+        return None
+    return mirror.get(assistant_id)
+
+
+def forget_assistant(assistant_id: str) -> None:
+    mirror_for().remove(assistant_id)
+
+
+def forget_assistants(assistant_ids: Iterable[str]) -> None:
+    """Batch removal, e.g. at the end of a bulk delete."""
+    mirror = mirror_for()
+    for assistant_id in assistant_ids:
+        mirror.remove(assistant_id)
+
+
+async def load_assistant_catalog(vapi_client, force: bool = False) -> None:
+    """Brings the mirror (and with it the catalog index) within the staleness bound."""
+    mirror = mirror_for(vapi_client.tenant)
+    if force:
+        await mirror.sync(vapi_client, full=True)
+    elif not mirror.is_fresh():
+        await mirror.sync(vapi_client)
+
+
+def catalog_index() -> AssistantIndex:
+    """The current tenant's in-memory catalog index."""
+    return mirror_for().index
+
+
+def mirror_status() -> Dict[str, Any]:
+    return mirror_for().status()
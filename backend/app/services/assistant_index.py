@@ -0,0 +1,193 @@
+# app/services/assistant_index.py
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.records import AssistantRecord
+
+SORT_FIELDS = ("creation_date", "last_used", "name")
+
+
+def _age(record: AssistantRecord) -> Optional[int]:
+    try:
+        return int(record.age) if record.age is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class AssistantIndex:
+    """
+    In-memory catalog of parsed assistants (compact records) with secondary indexes on difficulty and
+    personality, sorted views by creation date / last use / persona name, and
+    prefix search on persona name. Queries cost roughly O(page size), not O(catalog).
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, AssistantRecord] = {}
+        self._by_difficulty: Dict[str, Set[str]] = {}
+        self._by_personality: Dict[str, Set[str]] = {}
+        self._sorted: Dict[str, List[Tuple[Any, str]]] = {field: [] for field in SORT_FIELDS}
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, assistant_id: str) -> Optional[AssistantRecord]:
+        return self._records.get(assistant_id)
+
+    @staticmethod
+    def _sort_keys(record: AssistantRecord) -> Dict[str, Any]:
+        return {
+            "creation_date": record.created_ts,
+            "last_used": record.updated_ts if record.updated_ts is not None else float("-inf"),
+            "name": (record.persona_name or record.name).lower(),
+        }
+
+    @staticmethod
+    def _add_to(index: Dict[str, Set[str]], key: Optional[str], assistant_id: str) -> None:
+        if key:
+            index.setdefault(key.lower(), set()).add(assistant_id)
+
+    @staticmethod
+    def _remove_from(index: Dict[str, Set[str]], key: Optional[str], assistant_id: str) -> None:
+        if key and key.lower() in index:
+            bucket = index[key.lower()]
+            bucket.discard(assistant_id)
+            if not bucket:
+                del index[key.lower()]
+
+    def upsert(self, record: AssistantRecord) -> None:
+        self.remove(record.id)
+        self._records[record.id] = record
+        self._add_to(self._by_difficulty, record.difficulty, record.id)
+        self._add_to(self._by_personality, record.personality, record.id)
+        keys = self._sort_keys(record)
+        self._keys[record.id] = keys
+        for field, key in keys.items():
+            insort(self._sorted[field], (key, record.id))
+
+    def remove(self, assistant_id: str) -> bool:
+        record = self._records.pop(assistant_id, None)
+        if record is None:
+            return False
+        self._remove_from(self._by_difficulty, record.difficulty, assistant_id)
+        self._remove_from(self._by_personality, record.personality, assistant_id)
+        for field, key in self._keys.pop(assistant_id).items():
+            entries = self._sorted[field]
+            position = bisect_left(entries, (key, assistant_id))
+            if position < len(entries) and entries[position][1] == assistant_id:
+                del entries[position]
+        return True
+
+    def replace_all(self, records: List[AssistantRecord]) -> None:
+        self.__init__()
+        for record in records:
+            self.upsert(record)
+        self.loaded_at = time.monotonic()
+
+    def _prefix_ids(self, prefix: str) -> Set[str]:
+        entries = self._sorted["name"]
+        prefix = prefix.lower()
+        start = bisect_left(entries, (prefix,))
+        end = bisect_left(entries, (prefix + "\uffff",))
+        return {assistant_id for _, assistant_id in entries[start:end]}
+
+    def iter_by_creation(self, after: Optional[Tuple[float, str]] = None) -> Iterator[AssistantRecord]:
+        """Records oldest first, starting after the (created_ts, id) key `after`."""
+        entries = self._sorted["creation_date"]
+        start = bisect_right(entries, after) if after is not None else 0
+        for _, assistant_id in entries[start:]:
+            record = self._records.get(assistant_id)
+            if record is not None:
+                yield record
+
+    def sort_key(self, assistant_id: str, sort_by: str) -> Tuple[Any, str]:
+        """The (sort value, id) position of an assistant in a sorted view; used as a keyset cursor."""
+        return self._keys[assistant_id][sort_by], assistant_id
+
+    def _ordered_ids(
+        self,
+        candidates: Optional[Set[str]],
+        sort_by: str,
+        descending: bool,
+        after: Optional[Tuple[Any, str]] = None,
+    ) -> Iterator[str]:
+        entries = self._sorted[sort_by]
+        if candidates is not None and len(candidates) * 8 < len(entries):
+            # Small candidate set: sorting it is cheaper than walking the full view
+            keys = self._keys
+            ordered = sorted(((keys[i][sort_by], i) for i in candidates), reverse=descending)
+            for entry in ordered:
+                if after is None or (entry < after if descending else entry > after):
+                    yield entry[1]
+            return
+        # Start right after the cursor with a binary search, so deep pages cost the same as the first
+        if descending:
+            end = bisect_left(entries, after) if after is not None else len(entries)
+            positions = range(end - 1, -1, -1)
+        else:
+            start = bisect_right(entries, after) if after is not None else 0
+            positions = range(start, len(entries))
+        for position in positions:
+            assistant_id = entries[position][1]
+            if candidates is None or assistant_id in candidates:
+                yield assistant_id
+
+    def _candidates(self, difficulty: Optional[str], personality: Optional[str], name_prefix: Optional[str]) -> Optional[Set[str]]:
+        candidates: Optional[Set[str]] = None
+        for index, value in ((self._by_difficulty, difficulty), (self._by_personality, personality)):
+            if value:
+                bucket = index.get(value.lower(), set())
+                candidates = bucket if candidates is None else candidates & bucket
+        if name_prefix:
+            matches = self._prefix_ids(name_prefix)
+            candidates = matches if candidates is None else candidates & matches
+        return candidates
+
+    def count_estimate(
+        self,
+        difficulty: Optional[str] = None,
+        personality: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+    ) -> int:
+        """
+        Matches counted from the secondary indexes alone: exact for difficulty / personality /
+        name filters, an upper bound when setting or age filters also apply.
+        """
+        candidates = self._candidates(difficulty, personality, name_prefix)
+        return len(self._records) if candidates is None else len(candidates)
+
+    def query(
+        self,
+        difficulty: Optional[str] = None,
+        personality: Optional[str] = None,
+        setting: Optional[str] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        sort_by: str = "creation_date",
+        descending: bool = True,
+        after: Optional[Tuple[Any, str]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[AssistantRecord], bool]:
+        """
+        Returns one page of matching assistants, starting after the sort_key `after`,
+        and whether more matches follow it.
+        """
+        candidates = self._candidates(difficulty, personality, name_prefix)
+        setting = setting.lower() if setting else None
+        page: List[AssistantRecord] = []
+        for assistant_id in self._ordered_ids(candidates, sort_by, descending, after):
+            record = self._records[assistant_id]
+            if setting and (record.setting or "").lower() != setting:
+                continue
+            if min_age is not None or max_age is not None:
+                age = _age(record)
+                if age is None or (min_age is not None and age < min_age) or (max_age is not None and age > max_age):
+                    continue
+            if len(page) == limit:
+                return page, True
+            page.append(record)
+        return page, False
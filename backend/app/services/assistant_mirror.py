@@ -0,0 +1,303 @@
+# app/services/assistant_mirror.py
+import asyncio
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.config import settings, logger
+from app.services import metrics
+from app.services.assistant_index import AssistantIndex
+from app.services.pagination import iter_newest_first
+from app.services.records import AssistantRecord
+from app.services.tenant_service import Tenant, all_tenants, current_tenant
+
+# Page size used for sync requests against Vapi; syncs page until the listing is exhausted
+SYNC_PAGE_SIZE = 1000
+
+
+class AssistantMirror:
+    """
+    Local copy of the Vapi assistant catalog (raw objects), kept current by
+    delta syncs on the `updatedAt` cursor plus immediate application of writes
+    made through this service. Persisted to disk so restarts start warm.
+    Every change is mirrored into the in-memory catalog index.
+
+    Raw objects are held as zlib-compressed JSON (system prompts dominate their
+    size) and decoded on read; only single-assistant reads need them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = AssistantIndex()
+        self._records: Dict[str, bytes] = {}
+        self.cursor: Optional[str] = None # Highest updatedAt seen from upstream
+        self.last_sync_at: Optional[float] = None # Wall clock of the last successful sync
+        self.last_full_sync_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._dirty = False
+        self._sync_lock = asyncio.Lock()
+        # Local writes made while a sync is in flight (id -> assistant, None when removed);
+        # they win over the upstream pages fetched before them
+        self._local_writes: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # --- Reads ---
+
+    def lag_seconds(self) -> Optional[float]:
+        return None if self.last_sync_at is None else max(0.0, time.time() - self.last_sync_at)
+
+    def is_fresh(self, max_staleness: float = settings.ASSISTANT_MIRROR_MAX_STALENESS_SECONDS) -> bool:
+        lag = self.lag_seconds()
+        return lag is not None and lag <= max_staleness
+
+    @staticmethod
+    def _pack(assistant: Dict[str, Any]) -> bytes:
+        return zlib.compress(json.dumps(assistant, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _unpack(packed: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(packed))
+
+    def get(self, assistant_id: str) -> Optional[Dict[str, Any]]:
+        packed = self._records.get(assistant_id)
+        return None if packed is None else self._unpack(packed)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._records),
+            "cursor": self.cursor,
+            "last_sync_at": self.last_sync_at,
+            "last_full_sync_at": self.last_full_sync_at,
+            "lag_seconds": self.lag_seconds(),
+            "fresh": self.is_fresh(),
+            "last_error": self.last_error,
+        }
+
+    # --- Local writes ---
+
+    def _store(self, assistant: Dict[str, Any]) -> None:
+        self._records[assistant["id"]] = self._pack(assistant)
+        self._dirty = True
+        try:
+            self.index.upsert(AssistantRecord.from_vapi(assistant))
+        except Exception as e:
+            logger.error(f"Could not index assistant {assistant.get('id')}: {e}")
+
+    def _drop(self, assistant_id: str) -> None:
+        if self._records.pop(assistant_id, None) is not None:
+            self._dirty = True
+        self.index.remove(assistant_id)
+
+    def apply(self, assistant: Dict[str, Any]) -> None:
+        if not assistant or not assistant.get("id"):
+            return
+        self._store(assistant)
+        if self._local_writes is not None:
+            self._local_writes[assistant["id"]] = assistant
+
+    def remove(self, assistant_id: str) -> None:
+        self._drop(assistant_id)
+        if self._local_writes is not None:
+            self._local_writes[assistant_id] = None
+
+    def _superseded(self, item: Dict[str, Any]) -> bool:
+        """True when a local write made during this sync is newer than the upstream `item`."""
+        if self._local_writes is None or item["id"] not in self._local_writes:
+            return False
+        local = self._local_writes[item["id"]]
+        return local is None or (local.get("updatedAt") or "") > (item.get("updatedAt") or "")
+
+    def _replace_all(self, items: List[Dict[str, Any]]) -> None:
+        valid = [item for item in items if item.get("id")]
+        self._records = {item["id"]: self._pack(item) for item in valid}
+        records = []
+        for item in valid:
+            try:
+                records.append(AssistantRecord.from_vapi(item))
+            except Exception as e:
+                logger.error(f"Skipping invalid item: {str(e)}")
+        self.index.replace_all(records)
+        self._dirty = True
+
+    def _reapply_local_writes(self, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        """After a full replace: puts back local writes that are newer than the fetched snapshot."""
+        for assistant_id, local in (self._local_writes or {}).items():
+            if local is None:
+                self._drop(assistant_id)
+            elif assistant_id not in snapshot or self._superseded(snapshot[assistant_id]):
+                self._store(local)
+
+    # --- Upstream sync ---
+
+    @staticmethod
+    def _items(raw_response: Any) -> List[Dict[str, Any]]:
+        return raw_response if isinstance(raw_response, list) else raw_response.get("data", [])
+
+    @staticmethod
+    def _max_updated(items: List[Dict[str, Any]], current: Optional[str]) -> Optional[str]:
+        # ISO-8601 UTC timestamps from Vapi compare correctly as strings
+        stamps = [item["updatedAt"] for item in items if item.get("updatedAt")]
+        if stamps and (current is None or max(stamps) > current):
+            return max(stamps)
+        return current
+
+    async def sync(self, vapi_client, full: bool = False) -> int:
+        """
+        Pulls changes since the cursor (or the whole catalog when `full` or never synced).
+        Both walk every page: Vapi lists in createdAt order, so the updatedAt cursor only
+        moves once the whole delta has been read. Returns the number of records received.
+        """
+        async with self._sync_lock:
+            self._local_writes = {}
+            try:
+                if full or self.cursor is None:
+                    items: List[Dict[str, Any]] = []
+                    pages = iter_newest_first(
+                        lambda limit, created_at_le: vapi_client.list_assistants(limit=limit, created_at_le=created_at_le),
+                        SYNC_PAGE_SIZE,
+                    )
+                    async for page in pages:
+                        items.extend(page)
+                    self._replace_all(items)
+                    self._reapply_local_writes({item["id"]: item for item in items})
+                    self.cursor = self._max_updated(items, None)
+                    self.last_full_sync_at = time.time()
+                    received = len(items)
+                else:
+                    received = 0
+                    since = cursor = self.cursor
+                    # Inclusive bound so records sharing the cursor timestamp are not missed
+                    pages = iter_newest_first(
+                        lambda limit, created_at_le: vapi_client.list_assistants(limit=limit, updated_since=since, created_at_le=created_at_le),
+                        SYNC_PAGE_SIZE,
+                    )
+                    async for page in pages:
+                        for item in page:
+                            if not self._superseded(item):
+                                self._store(item)
+                        received += len(page)
+                        cursor = self._max_updated(page, cursor)
+                    self.cursor = cursor
+                self.last_sync_at = time.time()
+                self.last_error = None
+                metrics.incr("assistant_mirror.synced_records", received)
+            except Exception as e:
+                self.last_error = str(e)
+                metrics.incr("assistant_mirror.sync_errors")
+                raise
+            finally:
+                self._local_writes = None
+        await self.save()
+        return received
+
+    # --- Persistence ---
+
+    def load_from_disk(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read assistant mirror from {self.path}: {e}")
+            return False
+        self._replace_all(snapshot.get("assistants", []))
+        self.cursor = snapshot.get("cursor")
+        self.last_sync_at = snapshot.get("last_sync_at")
+        self.last_full_sync_at = snapshot.get("last_full_sync_at")
+        self._dirty = False
+        logger.info(f"Loaded {len(self._records)} assistants from mirror snapshot {self.path}")
+        return True
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        snapshot["assistants"] = [self._unpack(packed) for packed in snapshot["assistants"]]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path) # Atomic, so a crash never leaves a half-written snapshot
+
+    async def save(self) -> None:
+        """Writes the snapshot off the event loop, if anything changed."""
+        if not self._dirty:
+            return
+        snapshot = {
+            "cursor": self.cursor,
+            "last_sync_at": self.last_sync_at,
+            "last_full_sync_at": self.last_full_sync_at,
+            "assistants": list(self._records.values()),
+        }
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError as e:
+            self._dirty = True
+            logger.error(f"Could not persist assistant mirror to {self.path}: {e}")
+
+
+# One mirror (and catalog index) per tenant, since each tenant is a separate Vapi account
+_mirrors: Dict[str, AssistantMirror] = {}
+
+
+def mirror_for(tenant: Optional[Tenant] = None) -> AssistantMirror:
+    tenant = tenant or current_tenant()
+    mirror = _mirrors.get(tenant.id)
+    if mirror is None:
+        name = "assistant_mirror.json" if tenant.id == settings.DEFAULT_TENANT_ID else f"assistant_mirror.{tenant.id}.json"
+        mirror = _mirrors[tenant.id] = AssistantMirror(os.path.join(settings.DATA_DIR, name))
+        mirror.load_from_disk()
+    return mirror
+
+
+metrics.register_gauge("assistant_mirror", lambda: {tenant_id: mirror.status() for tenant_id, mirror in _mirrors.items()})
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _sync_loop(client_factory) -> None:
+    while True:
+        for tenant in all_tenants():
+            if not tenant.vapi_api_key:
+                continue
+            mirror = mirror_for(tenant)
+            try:
+                due_full = (
+                    mirror.last_full_sync_at is None
+                    or time.time() - mirror.last_full_sync_at > settings.ASSISTANT_MIRROR_FULL_SYNC_SECONDS
+                )
+                # Full resyncs also pick up assistants deleted outside this service
+                await mirror.sync(client_factory(tenant), full=due_full)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Assistant mirror sync failed for tenant '{tenant.id}': {e}")
+        await asyncio.sleep(settings.ASSISTANT_MIRROR_SYNC_INTERVAL_SECONDS)
+
+
+def start_mirror_sync(client_factory) -> None:
+    """
+    Loads the on-disk snapshots and starts the background delta sync of every tenant.
+    `client_factory(tenant)` returns a Vapi client for that tenant. Called on startup.
+    """
+    global _sync_task
+    for tenant in all_tenants():
+        mirror_for(tenant)
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop(client_factory))
+
+
+async def stop_mirror_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
+    for mirror in _mirrors.values():
+        await mirror.save()
@@ -0,0 +1,105 @@
+# app/services/assistant_parsing.py
+import re
+from datetime import datetime
+from typing import Any, Dict
+
+from app.models import AssistantMetadata, AssistantSummary
+from app.config import logger
+
+def get_assistant_details_from_vapi_object(vapi_assistant_obj: Dict[str, Any]) -> Dict[str, Any]:
+    metadata_dict: Dict[str, Any] = {}
+    model_settings = vapi_assistant_obj.get("model", {})
+
+    vapi_name = vapi_assistant_obj.get("name", "Unknown Persona")
+    parsed_name = vapi_name
+    parsed_difficulty_from_name = "medium"
+
+    name_parts = vapi_name.split(" - ")
+    if len(name_parts) > 1:
+        potential_name_with_difficulty = name_parts[-1]
+        match = re.match(r"(.+?)\s*\((easy|medium|hard)\)", potential_name_with_difficulty, re.IGNORECASE)
+        if match:
+            parsed_name = match.group(1).strip()
+            parsed_difficulty_from_name = match.group(2).lower()
+        else:
+            parsed_name = potential_name_with_difficulty.strip()
+    elif "(" in vapi_name and ")" in vapi_name:
+        match = re.match(r"(.+?)\s*\((easy|medium|hard)\)", vapi_name, re.IGNORECASE)
+        if match:
+            parsed_name = match.group(1).strip()
+            parsed_difficulty_from_name = match.group(2).lower()
+    
+    metadata_dict["app_persona_name"] = parsed_name
+
+    system_prompt = ""
+    if isinstance(model_settings, dict) and "messages" in model_settings:
+        for message in model_settings.get("messages", []):
+            if message.get("role") == "system":
+                system_prompt = message.get("content", "")
+                break
+    
+    metadata_dict["app_age"] = 28
+    metadata_dict["app_personality"] = "friendly"
+    metadata_dict["app_setting"] = "a casual place"
+    metadata_dict["app_difficulty"] = parsed_difficulty_from_name
+    metadata_dict["app_short_description"] = f"Chat with {parsed_name}."
+
+    if system_prompt:
+        age_match = re.search(r"(\d+)\s*year-old", system_prompt, re.IGNORECASE)
+        if age_match:
+            metadata_dict["app_age"] = int(age_match.group(1))
+
+        personality_match = re.search(r"identifies as (\w+)|personality is (\w+)|is (\w+) and", system_prompt, re.IGNORECASE)
+        if personality_match:
+            metadata_dict["app_personality"] = next(filter(None, personality_match.groups()), "friendly").lower()
+
+        setting_match = re.search(r"at a (\w+\s*\w*)|in a (\w+\s*\w*)|setting is a (\w+\s*\w*)", system_prompt, re.IGNORECASE)
+        if setting_match:
+            metadata_dict["app_setting"] = next(filter(None, setting_match.groups()), "a casual place").strip()
+        
+        difficulty_match = re.search(r"difficulty is (easy|medium|hard)", system_prompt, re.IGNORECASE)
+        if difficulty_match:
+            metadata_dict["app_difficulty"] = difficulty_match.group(1).lower()
+
+        first_sentence_match = re.match(r"([^\.\!\?]+[\.\!\?])", system_prompt)
+        if first_sentence_match:
+            metadata_dict["app_short_description"] = first_sentence_match.group(1).strip()
+        elif len(system_prompt) > 0:
+            description_candidate = system_prompt.strip()
+            metadata_dict["app_short_description"] = description_candidate[:100] + ("..." if len(description_candidate) > 100 else "")
+    
+    return metadata_dict
+
+def process_assistant_item(item: Dict[str, Any]) -> AssistantSummary:
+    app_metadata_dict = get_assistant_details_from_vapi_object(item)
+    # Metadata written by this service is authoritative over values parsed from name/prompt
+    stored_metadata = item.get("metadata") or {}
+    app_metadata_dict.update({k: v for k, v in stored_metadata.items() if k in AssistantMetadata.model_fields and v is not None})
+    app_metadata_obj = AssistantMetadata(**app_metadata_dict)
+
+    created_at_str = item.get("createdAt")
+    creation_date_obj = datetime.utcnow()
+    if created_at_str:
+        try:
+            creation_date_obj = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
+        except ValueError:
+            logger.warning(f"Could not parse createdAt '{created_at_str}' for assistant {item.get('id')}. Using current UTC time.")
+    
+    updated_at_str = item.get("updatedAt")
+    last_used_obj = None
+    if updated_at_str:
+        try:
+            last_used_obj = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
+        except ValueError:
+            logger.warning(f"Could not parse updatedAt '{updated_at_str}' for assistant {item.get('id')}. Setting last_used to None.")
+
+    return AssistantSummary(
+        id=item.get("id"),
+        name=item.get("name", "Unnamed Assistant"), # Vapi's name
+        personality=app_metadata_obj.app_personality, # From app metadata
+        creation_date=creation_date_obj,
+        voice_model=str(item.get("voice", {}).get("voiceId", "")), # Simplified, adjust as needed
+        difficulty=app_metadata_obj.app_difficulty, # From app metadata
+        last_used=last_used_obj,
+        metadata=app_metadata_obj
+    )
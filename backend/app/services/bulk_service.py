@@ -0,0 +1,109 @@
+# app/services/bulk_service.py
+import asyncio
+import json
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.config import settings, logger
+from app.services import metrics
+
+
+def _retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Parses a Retry-After header (seconds or HTTP date)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class BulkDeleter:
+    """
+    Deletes many upstream records with a concurrency cap. A 429 from Vapi pauses
+    every worker until the Retry-After time has passed, instead of each worker
+    hammering the API independently.
+    """
+
+    def __init__(
+        self,
+        delete_fn: Callable[[str], Awaitable[Any]],
+        concurrency: int = settings.BULK_DELETE_CONCURRENCY,
+        max_retries: int = settings.BULK_DELETE_MAX_RETRIES,
+    ):
+        self.delete_fn = delete_fn
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._resume_at = 0.0
+
+    async def _wait_for_rate_limit(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = self._resume_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _delete_one(self, record_id: str) -> Dict[str, Any]:
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_for_rate_limit()
+                try:
+                    await self.delete_fn(record_id)
+                    return {"id": record_id, "status": "deleted"}
+                except httpx.HTTPStatusError as e:
+                    status_code = e.response.status_code
+                    if status_code == 429 and attempt < self.max_retries:
+                        delay = _retry_after_seconds(e.response, default=2 ** attempt)
+                        loop = asyncio.get_running_loop()
+                        self._resume_at = max(self._resume_at, loop.time() + delay)
+                        metrics.incr("bulk_delete.rate_limited")
+                        continue
+                    if status_code == 404:
+                        return {"id": record_id, "status": "not_found"}
+                    return {"id": record_id, "status": "error", "status_code": status_code, "error": e.response.text}
+                except Exception as e:
+                    logger.error(f"Bulk delete failed for {record_id}: {e}")
+                    return {"id": record_id, "status": "error", "error": str(e)}
+            return {"id": record_id, "status": "error", "status_code": 429, "error": "Rate limited"}
+
+    async def run(self, record_ids: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Yields one outcome per id, in completion order."""
+        tasks = [asyncio.create_task(self._delete_one(record_id)) for record_id in dict.fromkeys(record_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks: # Client went away; stop issuing deletes
+                task.cancel()
+
+
+async def stream_bulk_delete(
+    record_ids: List[str],
+    delete_fn: Callable[[str], Awaitable[Any]],
+    on_complete: Optional[Callable[[List[str]], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    NDJSON stream: a header line, one line per id, then a summary line.
+    `on_complete` receives every id that is gone upstream, once, at the end.
+    """
+    yield json.dumps({"matched": len(record_ids)}) + "\n"
+    removed: List[str] = []
+    summary = {"deleted": 0, "not_found": 0, "error": 0}
+    try:
+        async for outcome in BulkDeleter(delete_fn).run(record_ids):
+            summary[outcome["status"]] += 1
+            if outcome["status"] in ("deleted", "not_found"):
+                removed.append(outcome["id"])
+            yield json.dumps(outcome) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+    finally:
+        if on_complete and removed:
+            on_complete(removed) # Batch invalidation, even if the stream was cut short
+        metrics.incr("bulk_delete.deleted", summary["deleted"])
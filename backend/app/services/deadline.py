@@ -0,0 +1,84 @@
+# app/services/deadline.py
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+from app.services import metrics
+
+# Absolute deadline (time.monotonic()) of the request being served, if any.
+# Set by DeadlineMiddleware; read by every upstream call and tool handler.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """
+    The request's time budget ran out. Subclasses httpx.TimeoutException so the
+    routers' existing timeout handling turns it into a 504.
+    """
+
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+
+
+def set_deadline(budget_seconds: Optional[float]):
+    """Starts a deadline `budget_seconds` from now (None clears it). Returns a token for reset_deadline."""
+    return _deadline.set(None if budget_seconds is None else time.monotonic() + budget_seconds)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def clear_deadline() -> None:
+    """For background tasks that inherited a request's context but must not share its budget."""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when there is no deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def timeout_for(default: float, where: str = "upstream") -> float:
+    """
+    The timeout an operation should use: its own default, capped by the remaining
+    budget. Raises DeadlineExceeded right away if the budget is already spent.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        metrics.incr(f"deadline.exceeded.{where}")
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+def exceeded(where: str = "upstream") -> DeadlineExceeded:
+    """Records and returns a DeadlineExceeded, for timeouts caused by the budget running out."""
+    metrics.incr(f"deadline.exceeded.{where}")
+    return DeadlineExceeded()
+
+
+def check_budget(where: str = "upstream") -> None:
+    """After a timeout: raises (and records) DeadlineExceeded if the budget is what ran out."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise exceeded(where)
+
+
+async def run_within_deadline(awaitable: Awaitable[Any], default: float, where: str) -> Any:
+    """Awaits with the remaining budget as timeout."""
+    try:
+        timeout = timeout_for(default, where)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close() # Never started; avoids a "never awaited" warning
+        raise
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise exceeded(where)
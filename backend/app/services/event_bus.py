@@ -0,0 +1,98 @@
+# app/services/event_bus.py
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from app.config import settings, logger
+from app.services import metrics
+
+
+class Subscriber:
+    """One connected event-stream client with its own bounded buffer."""
+
+    def __init__(self, tenant_id: str, call_id: Optional[str], assistant_id: Optional[str], buffer_size: int):
+        self.tenant_id = tenant_id
+        self.call_id = call_id
+        self.assistant_id = assistant_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.evicted = asyncio.Event()
+
+
+class CallEventBus:
+    """
+    Fans out call events received via webhook to subscribers of the same tenant,
+    filtered by call id and/or assistant id. Publishing never blocks: a subscriber whose buffer is full
+    is evicted rather than slowing down the webhook path.
+    """
+
+    def __init__(self, buffer_size: int, max_subscribers: int):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._all: Set[Subscriber] = set()
+        self._by_call: Dict[str, Set[Subscriber]] = {}
+        self._by_assistant: Dict[str, Set[Subscriber]] = {}
+        self._unfiltered: Set[Subscriber] = set()
+        self.evictions = 0
+
+    def is_full(self) -> bool:
+        return len(self._all) >= self.max_subscribers
+
+    def subscribe(self, tenant_id: str, call_id: Optional[str] = None, assistant_id: Optional[str] = None) -> Subscriber:
+        if self.is_full():
+            raise RuntimeError("Too many event subscribers")
+        subscriber = Subscriber(tenant_id, call_id, assistant_id, self.buffer_size)
+        self._all.add(subscriber)
+        # Index by the most selective filter; the other one is checked on publish
+        if call_id:
+            self._by_call.setdefault(call_id, set()).add(subscriber)
+        elif assistant_id:
+            self._by_assistant.setdefault(assistant_id, set()).add(subscriber)
+        else:
+            self._unfiltered.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._all.discard(subscriber)
+        self._unfiltered.discard(subscriber)
+        for index, key in ((self._by_call, subscriber.call_id), (self._by_assistant, subscriber.assistant_id)):
+            if key and key in index:
+                index[key].discard(subscriber)
+                if not index[key]:
+                    del index[key]
+
+    def publish(self, event: Dict[str, Any]) -> int:
+        """Delivers the event to every matching subscriber. Returns the number of deliveries."""
+        tenant_id = event.get("tenant_id")
+        call_id = event.get("call_id")
+        assistant_id = event.get("assistant_id")
+        candidates = set(self._unfiltered)
+        if call_id:
+            candidates |= self._by_call.get(call_id, set())
+        if assistant_id:
+            candidates |= self._by_assistant.get(assistant_id, set())
+
+        delivered = 0
+        for subscriber in candidates:
+            if subscriber.tenant_id != tenant_id or (subscriber.assistant_id and subscriber.assistant_id != assistant_id):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+                delivered += 1
+            except asyncio.QueueFull:
+                self.evictions += 1
+                metrics.incr("events.evicted_slow_consumers")
+                logger.warning(f"Evicting slow event subscriber (call_id={subscriber.call_id}, assistant_id={subscriber.assistant_id})")
+                subscriber.evicted.set()
+                self.unsubscribe(subscriber)
+        metrics.incr("events.published")
+        return delivered
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._all), "evictions": self.evictions}
+
+
+call_event_bus = CallEventBus(
+    buffer_size=settings.EVENTS_SUBSCRIBER_BUFFER,
+    max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+)
+
+metrics.register_gauge("events", call_event_bus.stats)
@@ -0,0 +1,123 @@
+# app/services/executor_service.py
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings, logger
+from app.services import metrics
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when an executor already has its maximum number of queued jobs."""
+
+
+class BoundedExecutor:
+    """
+    Wraps a thread or process pool with a cap on queued work, so a burst of
+    blocking tool calls is rejected instead of piling up behind the workers.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_workers: int, max_queue: int):
+        self.name = name
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet picked up by a worker (approximation)."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                metrics.incr(f"executor.{self.name}.rejected")
+                raise ExecutorSaturatedError(f"Executor '{self.name}' is saturated ({self._in_flight} jobs in flight)")
+            self._in_flight += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is held until the job itself finishes: a caller that stops waiting
+        # (e.g. a deadline) cancels only its await, not a job a worker already runs
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+
+
+def start_executors() -> None:
+    """Create the shared thread and process pools. Called from the app startup event."""
+    if _executors:
+        return
+    _executors["thread"] = BoundedExecutor(
+        "thread",
+        ThreadPoolExecutor(max_workers=settings.TOOL_THREAD_WORKERS, thread_name_prefix="tool-handler"),
+        settings.TOOL_THREAD_WORKERS,
+        settings.TOOL_EXECUTOR_MAX_QUEUE,
+    )
+    _executors["process"] = BoundedExecutor(
+        "process",
+        ProcessPoolExecutor(max_workers=settings.TOOL_PROCESS_WORKERS),
+        settings.TOOL_PROCESS_WORKERS,
+        settings.TOOL_EXECUTOR_MAX_QUEUE,
+    )
+    logger.info(f"Started tool executors: {settings.TOOL_THREAD_WORKERS} threads, {settings.TOOL_PROCESS_WORKERS} processes")
+    if settings.SCORING_PROCESS_WORKERS > 0:
+        # Scoring gets its own pool so large batches never queue PROCESS tool handlers behind them
+        _executors["scoring"] = BoundedExecutor(
+            "scoring",
+            ProcessPoolExecutor(max_workers=settings.SCORING_PROCESS_WORKERS),
+            settings.SCORING_PROCESS_WORKERS,
+            settings.TOOL_EXECUTOR_MAX_QUEUE,
+        )
+
+
+def shutdown_executors() -> None:
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Returns the shared executor ('thread', 'process' or 'scoring'), creating the pools on first use."""
+    if not _executors:
+        start_executors()
+    return _executors[name]
+
+
+def executor_stats() -> Dict[str, Optional[Dict[str, int]]]:
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+metrics.register_gauge("executors", executor_stats)
@@ -0,0 +1,363 @@
+# app/services/export_service.py
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings, logger
+from app.services import metrics
+from app.services.assistant_cache import load_assistant_catalog, catalog_index
+from app.services.assistant_mirror import mirror_for
+from app.services.pagination import resume_newest_first
+from app.services.tenant_service import current_tenant
+from app.services.records import AssistantRecord
+
+# Columnar exports of calls and assistants for offline analysis. An export is a
+# directory of part files plus a manifest; rows are written one upstream page
+# (row group / record batch) at a time, so memory stays bounded by the batch size.
+# The manifest cursor only advances when a part file is closed, so an interrupted
+# export can be resumed from it without duplicate or corrupt parts.
+
+EXPORT_DIR = os.path.join(settings.DATA_DIR, "exports")
+
+
+class ExportUnavailableError(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ExportUnavailableError("Exports require the optional 'pyarrow' package") from e
+    return pyarrow
+
+
+def exports_available() -> bool:
+    try:
+        _arrow()
+    except ExportUnavailableError:
+        return False
+    return True
+
+
+# --- Manifests ---
+
+def _export_path(export_id: str, name: str = "") -> str:
+    return os.path.join(EXPORT_DIR, export_id, name)
+
+
+def load_manifest(export_id: str) -> Optional[Dict[str, Any]]:
+    """The export's manifest, if it exists and belongs to the current tenant."""
+    # Export ids are generated hex strings; anything else cannot name a directory of ours
+    if not export_id.isalnum():
+        return None
+    try:
+        with open(_export_path(export_id, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("tenant_id") == current_tenant().id else None
+
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    path = _export_path(manifest["export_id"], "manifest.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def create_manifest(kind: str, fmt: str, assistant_id: Optional[str], created_before: Optional[str]) -> Dict[str, Any]:
+    manifest = {
+        "export_id": uuid.uuid4().hex,
+        "tenant_id": current_tenant().id,
+        "kind": kind,
+        "format": fmt,
+        "assistant_id": assistant_id,
+        "cursor": created_before if kind == "calls" else None,
+        "structured_keys": None, # Fixed by the first batch so every part shares one schema
+        "files": [],
+        "rows": 0,
+        "json_bytes": 0,
+        "output_bytes": 0,
+        "complete": False,
+        "error": None,
+    }
+    os.makedirs(_export_path(manifest["export_id"]), exist_ok=True)
+    _save_manifest(manifest)
+    return manifest
+
+
+def export_file_path(export_id: str, name: str) -> Optional[str]:
+    """Path of a finished part file, or None if it is not part of the export."""
+    manifest = load_manifest(export_id)
+    if manifest is None or name not in manifest["files"]:
+        return None
+    return _export_path(export_id, name)
+
+
+# --- Row conversion ---
+
+def _flatten_structured(data: Optional[dict], keys: List[str]) -> Tuple[Dict[str, Optional[str]], Optional[str]]:
+    """Known keys become string columns; anything else is kept as JSON in `structured_data_extra`."""
+    data = data or {}
+    columns = {}
+    for key in keys:
+        value = data.get(key)
+        columns[key] = value if value is None or isinstance(value, str) else json.dumps(value)
+    extra = {k: v for k, v in data.items() if k not in columns}
+    return columns, json.dumps(extra) if extra else None
+
+
+# Low-cardinality columns (assistant ids, voices, persona attributes) are dictionary-encoded
+
+def _call_schema(pa, structured_keys: List[str]):
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp("ms", tz="UTC")
+    fields = [
+        pa.field("call_id", pa.string()),
+        pa.field("assistant_id", categorical),
+        pa.field("start_time", timestamp),
+        pa.field("end_time", timestamp),
+        pa.field("duration", pa.int64()),
+        pa.field("transcript", pa.string()),
+        pa.field("summary", pa.string()),
+        pa.field("success_metrics", pa.bool_()),
+    ]
+    fields += [pa.field(f"structured_data.{key}", pa.string()) for key in structured_keys]
+    fields.append(pa.field("structured_data_extra", pa.string()))
+    return pa.schema(fields)
+
+
+def _epoch_ms(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def _call_columns(calls: List[Dict[str, Any]], structured_keys: List[str]) -> Dict[str, list]:
+    """Columns straight from the upstream call objects; transcripts go to Arrow as they came."""
+    columns: Dict[str, list] = {
+        "call_id": [], "assistant_id": [], "start_time": [], "end_time": [], "duration": [],
+        "transcript": [], "summary": [], "success_metrics": [],
+    }
+    for key in structured_keys:
+        columns[f"structured_data.{key}"] = []
+    columns["structured_data_extra"] = []
+    for call in calls:
+        analysis = call.get("analysis") or {}
+        columns["call_id"].append(call.get("id", ""))
+        columns["assistant_id"].append(call.get("assistantId"))
+        columns["start_time"].append(_epoch_ms(call.get("startTime") or call.get("startedAt")))
+        columns["end_time"].append(_epoch_ms(call.get("endTime") or call.get("endedAt")))
+        columns["duration"].append(call.get("duration"))
+        columns["transcript"].append(call.get("transcript") or (call.get("artifact") or {}).get("transcript"))
+        columns["summary"].append(analysis.get("summary"))
+        columns["success_metrics"].append(analysis.get("success"))
+        flattened, extra = _flatten_structured(analysis.get("structuredData"), structured_keys)
+        for key, value in flattened.items():
+            columns[f"structured_data.{key}"].append(value)
+        columns["structured_data_extra"].append(extra)
+    return columns
+
+
+def _assistant_schema(pa):
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp("ms", tz="UTC")
+    return pa.schema([
+        pa.field("id", pa.string()),
+        pa.field("name", pa.string()),
+        pa.field("voice_model", categorical),
+        pa.field("creation_date", timestamp),
+        pa.field("last_used", timestamp),
+        pa.field("app_persona_name", pa.string()),
+        pa.field("app_age", pa.int64()),
+        pa.field("app_personality", categorical),
+        pa.field("app_setting", categorical),
+        pa.field("app_difficulty", categorical),
+        pa.field("app_short_description", pa.string()),
+    ])
+
+
+def _age(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _assistant_columns(records: List[AssistantRecord]) -> Dict[str, list]:
+    return {
+        "id": [r.id for r in records],
+        "name": [r.name for r in records],
+        "voice_model": [r.voice_model for r in records],
+        "creation_date": [int(r.created_ts * 1000) for r in records],
+        "last_used": [None if r.updated_ts is None else int(r.updated_ts * 1000) for r in records],
+        "app_persona_name": [r.persona_name for r in records],
+        "app_age": [_age(r.age) for r in records],
+        "app_personality": [r.personality for r in records],
+        "app_setting": [r.setting for r in records],
+        "app_difficulty": [r.difficulty for r in records],
+        "app_short_description": [r.short_description for r in records],
+    }
+
+
+def _to_table(pa, columns: Dict[str, list], schema):
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# --- Writers ---
+
+class _PartWriter:
+    """One part file; each write() adds a Parquet row group or an Arrow record batch."""
+
+    def __init__(self, pa, fmt: str, path: str, schema):
+        self.path = path
+        self.rows = 0
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, schema, compression=settings.EXPORT_COMPRESSION, use_dictionary=True)
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema, options=pa.ipc.IpcWriteOptions(compression=settings.EXPORT_COMPRESSION))
+        self._fmt = fmt
+
+    def write(self, table) -> None:
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self) -> int:
+        self._writer.close()
+        if self._fmt != "parquet":
+            self._sink.close()
+        return os.path.getsize(self.path)
+
+
+# --- Sources ---
+
+async def _call_batches(manifest: Dict[str, Any], vapi_client) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """
+    Upstream pages of calls, newest first, with the cursor that resumes after each page:
+    the page's oldest createdAt and the ids already exported at it, as JSON. A fresh
+    export's cursor is its plain `created_before` bound (exclusive).
+    """
+    cursor = manifest["cursor"]
+    created_before, boundary, seen = None, None, []
+    if cursor and cursor.startswith("["):
+        boundary, seen = json.loads(cursor)
+    else:
+        created_before = cursor
+
+    def fetch_page(limit: int, created_at_le: Optional[str]):
+        if created_at_le is None:
+            return vapi_client.list_calls(manifest["assistant_id"], limit, created_before=created_before)
+        return vapi_client.list_calls(manifest["assistant_id"], limit, created_at_le=created_at_le)
+
+    async for calls, position in resume_newest_first(fetch_page, settings.EXPORT_BATCH_SIZE, boundary, seen):
+        yield calls, json.dumps(position)
+
+
+async def _assistant_batches(manifest: Dict[str, Any], vapi_client) -> AsyncIterator[Tuple[List[AssistantRecord], Optional[str]]]:
+    """Batches of mirrored assistants, oldest first; the cursor is the last (created_ts, id)."""
+    await load_assistant_catalog(vapi_client)
+    after = tuple(json.loads(manifest["cursor"])) if manifest["cursor"] else None
+    batch: List[AssistantRecord] = []
+    for record in catalog_index().iter_by_creation(after):
+        batch.append(record)
+        if len(batch) == settings.EXPORT_BATCH_SIZE:
+            yield batch, json.dumps([batch[-1].created_ts, batch[-1].id])
+            batch = []
+    if batch:
+        yield batch, json.dumps([batch[-1].created_ts, batch[-1].id])
+
+
+# --- Runner ---
+
+async def run_export(export_id: str, vapi_client) -> Dict[str, Any]:
+    """Writes the remaining rows of an export from its manifest cursor. Returns the manifest."""
+    pa = _arrow()
+    manifest = load_manifest(export_id)
+    if manifest is None:
+        raise ValueError(f"Unknown export {export_id}")
+    manifest["error"] = None
+    extension = "parquet" if manifest["format"] == "parquet" else "arrow"
+    writer: Optional[_PartWriter] = None
+    pending_cursor = manifest["cursor"]
+    pending_json_bytes = 0
+
+    def close_part() -> None:
+        nonlocal writer, pending_json_bytes
+        size = writer.close()
+        manifest["files"].append(os.path.basename(writer.path))
+        manifest["rows"] += writer.rows
+        manifest["output_bytes"] += size
+        manifest["json_bytes"] += pending_json_bytes
+        manifest["cursor"] = pending_cursor
+        pending_json_bytes = 0
+        _save_manifest(manifest)
+        writer = None
+
+    try:
+        if manifest["kind"] == "calls":
+            batches = _call_batches(manifest, vapi_client)
+        else:
+            batches = _assistant_batches(manifest, vapi_client)
+
+        async for batch, cursor in batches:
+            if manifest["kind"] == "calls":
+                pending_json_bytes += len(json.dumps(batch))
+                if manifest["structured_keys"] is None:
+                    manifest["structured_keys"] = sorted({k for call in batch for k in ((call.get("analysis") or {}).get("structuredData") or {})})
+                schema = _call_schema(pa, manifest["structured_keys"])
+                columns = _call_columns(batch, manifest["structured_keys"])
+            else:
+                # Size of the upstream objects, as for calls, from the mirror's raw copies
+                mirror = mirror_for()
+                pending_json_bytes += len(json.dumps([mirror.get(record.id) for record in batch]))
+                schema = _assistant_schema(pa)
+                columns = _assistant_columns(batch)
+
+            if writer is None:
+                name = f"part-{len(manifest['files']):05d}.{extension}"
+                writer = await asyncio.to_thread(_PartWriter, pa, manifest["format"], _export_path(export_id, name), schema)
+            part = writer
+            rows = len(columns[schema[0].name])
+            await asyncio.to_thread(lambda: part.write(_to_table(pa, columns, schema)))
+            pending_cursor = cursor
+            metrics.incr(f"exports.{manifest['kind']}.rows", rows)
+
+            if writer.rows >= settings.EXPORT_ROWS_PER_FILE:
+                await asyncio.to_thread(close_part)
+
+        if writer is not None:
+            await asyncio.to_thread(close_part)
+        manifest["complete"] = True
+        _save_manifest(manifest)
+        logger.info(f"Export {export_id} complete: {manifest['rows']} rows, {manifest['output_bytes']} bytes (JSON {manifest['json_bytes']} bytes)")
+        return manifest
+    except Exception as e:
+        # Rows of the unfinished part are dropped; a resume restarts them from the saved cursor
+        if writer is not None:
+            try:
+                writer.close()
+                os.remove(writer.path)
+            except Exception:
+                pass
+        manifest["error"] = str(e)
+        _save_manifest(manifest)
+        metrics.incr("exports.failed")
+        raise
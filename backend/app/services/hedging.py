@@ -0,0 +1,144 @@
+# app/services/hedging.py
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.services import metrics
+
+# Latency samples kept for the percentile, and how often (in samples) it is recomputed
+SAMPLE_WINDOW = 512
+RECOMPUTE_EVERY = 32
+# Samples needed before the observed percentile replaces the initial delay
+MIN_SAMPLES = 50
+# Unused budget that can accumulate, in hedges
+MAX_BUDGET_TOKENS = 10.0
+
+
+class Hedger:
+    """
+    Hedged requests for idempotent reads. If the first attempt has not answered
+    after the current latency percentile, an identical second attempt is sent;
+    whichever succeeds first wins and the other is cancelled.
+
+    Every primary request earns `budget_ratio` tokens and every hedge spends one,
+    so hedges never exceed that fraction of traffic (plus a small burst).
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        budget_ratio: float,
+        min_delay: float,
+        initial_delay: float,
+    ):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_delay = min_delay
+        self._delay = max(min_delay, initial_delay)
+        self._samples: deque = deque(maxlen=SAMPLE_WINDOW)
+        self._since_recompute = 0
+        self._tokens = 1.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def delay(self) -> float:
+        """Seconds to wait for the first attempt before hedging."""
+        return self._delay
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._since_recompute += 1
+            if self._since_recompute >= RECOMPUTE_EVERY and len(self._samples) >= MIN_SAMPLES:
+                ordered = sorted(self._samples)
+                rank = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self._delay = max(self.min_delay, ordered[rank])
+                self._since_recompute = 0
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.budget_denied += 1
+            return False
+
+    def _record_primary(self, primary: asyncio.Task, winner: asyncio.Task, started: float) -> None:
+        # Latency is always the first attempt's: the hedge's own time would pull the
+        # percentile down. When the hedge wins, the primary took at least this long.
+        if winner is primary or not primary.done():
+            self.record_latency(time.monotonic() - started)
+
+    async def run(self, attempt: Callable[[], Awaitable[Any]], is_failure: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Runs `attempt` (a factory for one request), hedging it if it is slow. A result
+        rejected by `is_failure` (e.g. a 5xx response) is a failed attempt, as an exception is.
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(MAX_BUDGET_TOKENS, self._tokens + self.budget_ratio)
+
+        started = time.monotonic()
+        primary = asyncio.create_task(attempt())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._delay)
+            if not done and self._take_token():
+                with self._lock:
+                    self.hedged += 1
+                tasks.add(asyncio.create_task(attempt()))
+
+            # First success wins; a failure only counts once no attempt is left
+            error: Optional[BaseException] = None
+            failed: Optional[asyncio.Task] = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif is_failure is not None and is_failure(task.result()):
+                        failed = failed or task
+                    else:
+                        if task is not primary:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        self._record_primary(primary, task, started)
+                        return task.result()
+            if failed is not None:
+                return failed.result() # The caller handles it like any unhedged failure
+            raise error
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delay_ms": round(self._delay * 1000, 1),
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+            "win_rate": self.hedge_wins / self.hedged if self.hedged else 0.0,
+        }
+
+
+# Shared by all VapiClient instances; latency is a property of the upstream, not the caller
+vapi_hedger = Hedger(
+    percentile=settings.VAPI_HEDGE_PERCENTILE,
+    budget_ratio=settings.VAPI_HEDGE_BUDGET_RATIO,
+    min_delay=settings.VAPI_HEDGE_MIN_DELAY_MS / 1000,
+    initial_delay=settings.VAPI_HEDGE_INITIAL_DELAY_MS / 1000,
+)
+
+metrics.register_gauge("upstream.hedging", vapi_hedger.stats)
@@ -0,0 +1,138 @@
+# app/services/job_service.py
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import logger
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.deadline import clear_deadline
+from app.services.tenant_service import Tenant, current_tenant, use_tenant, reset_tenant
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job queue already holds its maximum number of pending jobs."""
+
+
+class Job:
+    __slots__ = ("id", "tenant", "payload", "idempotency_key", "status", "result", "error", "status_code", "created_at", "finished_at")
+
+    def __init__(self, payload: Any, idempotency_key: Optional[str], tenant: Tenant):
+        self.id = uuid.uuid4().hex
+        self.tenant = tenant # Jobs run as the tenant that submitted them
+        self.payload = payload
+        self.idempotency_key = idempotency_key
+        self.status = "queued" # queued -> running -> succeeded | failed
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+
+class JobQueue:
+    """
+    Bounded background worker pool for slow upstream operations. Pending and
+    running jobs are kept until they finish; finished jobs are retained for
+    `result_ttl` seconds so clients can poll for the outcome.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int,
+        max_queue: int,
+        result_ttl: float,
+        max_retained: int = 10000,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self.max_queue = max_queue
+        self._active: Dict[str, Job] = {}
+        self._finished: TTLCache[Job] = TTLCache(maxsize=max_retained, ttl=result_ttl)
+        self._by_idempotency_key: TTLCache[str] = TTLCache(maxsize=max_retained, ttl=result_ttl)
+        self._tasks: List[asyncio.Task] = []
+        _job_queues.append(self)
+        metrics.register_gauge(f"jobs.{name}", self.stats)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Any, idempotency_key: Optional[str] = None) -> Job:
+        """Enqueues a job, or returns the existing one for a repeated idempotency key."""
+        tenant = current_tenant()
+        if idempotency_key:
+            idempotency_key = f"{tenant.id}:{idempotency_key}" # Keys are only unique per tenant
+            existing = self.get(self._by_idempotency_key.get(idempotency_key) or "")
+            if existing is not None:
+                metrics.incr(f"jobs.{self.name}.deduplicated")
+                return existing
+
+        self.start()
+        job = Job(payload, idempotency_key, tenant)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            metrics.incr(f"jobs.{self.name}.rejected")
+            raise JobQueueFullError(f"Job queue '{self.name}' is full")
+        self._active[job.id] = job
+        if idempotency_key:
+            self._by_idempotency_key.set(idempotency_key, job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._active.get(job_id) or self._finished.get(job_id)
+
+    async def _worker(self) -> None:
+        clear_deadline() # Started from a request; jobs must not inherit its budget
+        while True:
+            job: Job = await self._queue.get()
+            job.status = "running"
+            token = use_tenant(job.tenant)
+            try:
+                job.result = await self.handler(job.payload)
+                job.status = "succeeded"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.status_code = getattr(e, "status_code", 500)
+                job.error = str(getattr(e, "detail", e))
+                logger.error(f"Job {job.id} in '{self.name}' failed: {job.error}")
+            finally:
+                reset_tenant(token)
+                job.finished_at = time.time()
+                self._active.pop(job.id, None)
+                self._finished.set(job.id, job)
+                metrics.incr(f"jobs.{self.name}.{job.status}")
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "active": len(self._active),
+            "retained": len(self._finished),
+            "workers": len(self._tasks),
+        }
+
+
+_job_queues: List[JobQueue] = []
+
+
+async def stop_job_queues() -> None:
+    """Cancels all job workers. Called from the app shutdown event."""
+    for job_queue in _job_queues:
+        await job_queue.stop()
@@ -0,0 +1,193 @@
+# app/services/logging_service.py
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Attributes every LogRecord carries; anything else on a record came from `extra=`
+_RESERVED_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_max_payload_chars: int = 2000
+_dropped_lock = threading.Lock()
+_dropped_counts: Dict[str, int] = {"queue_full": 0, "sampled_out": 0}
+
+
+def _count_dropped(reason: str) -> None:
+    with _dropped_lock:
+        _dropped_counts[reason] += 1
+
+
+def get_dropped_log_counts() -> Dict[str, int]:
+    """Number of records dropped because the queue was full or sampling discarded them."""
+    with _dropped_lock:
+        return dict(_dropped_counts)
+
+
+class TruncatedPayload:
+    """
+    Wraps a payload passed as a logging argument. Serialization and truncation
+    only happen if the record is actually emitted. The value may be a pydantic
+    model or a zero-argument callable, so callers never serialize up front.
+    """
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        limit = self.limit if self.limit is not None else _max_payload_chars
+        value = self.value() if callable(self.value) else self.value
+        if hasattr(value, "model_dump_json"):
+            value = value.model_dump_json()
+        if isinstance(value, (str, bytes)):
+            text = value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+        else:
+            try:
+                text = json.dumps(value, default=str, separators=(",", ":"))
+            except (TypeError, ValueError):
+                text = repr(value)
+        if len(text) > limit:
+            return f"{text[:limit]}...<truncated {len(text) - limit} chars>"
+        return text
+
+
+def truncate_payload(value: Any, limit: Optional[int] = None) -> TruncatedPayload:
+    """Use as a logging argument: logger.info("Result: %s", truncate_payload(result))"""
+    return TruncatedPayload(value, limit)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps roughly `rate` of the INFO/DEBUG records for each configured logger
+    (e.g. {"app.webhook": 0.1} keeps 1 in 10 webhook receipts).
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, logger_name: str) -> float:
+        name = logger_name
+        while name:
+            if name in self.sample_rates:
+                return self.sample_rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            _count_dropped("sampled_out")
+            return False
+        # Deterministic 1-in-N sampling, cheaper and steadier than random()
+        every = max(1, round(1 / rate))
+        with self._lock:
+            count = self._counters.get(record.name, 0)
+            self._counters[record.name] = count + 1
+        if count % every == 0:
+            return True
+        _count_dropped("sampled_out")
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count_dropped("queue_full")
+
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    """Parses "app.webhook=0.1,app.other=0.5" into a dict, ignoring malformed entries."""
+    rates: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, sep, value = part.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_output: bool = True,
+    queue_size: int = 10000,
+    sample_rates: Optional[Dict[str, float]] = None,
+    max_payload_chars: int = 2000,
+) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a bounded in-memory queue drained by a background
+    thread, so request handlers never wait on log I/O.
+    """
+    global _listener, _max_payload_chars
+    _max_payload_chars = max_payload_chars
+
+    if _listener is not None:
+        stop_logging()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if json_output:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,38 @@
+# app/services/metrics.py
+import threading
+from typing import Any, Callable, Dict
+
+# Simple in-process metrics registry, exposed via GET /api/metrics.
+# Counters are incremented at the call site; gauges are callables read at snapshot time.
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, Callable[[], Any]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Increment a named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def get_counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def register_gauge(name: str, fn: Callable[[], Any]) -> None:
+    """Register a callable whose current value is reported under `name`."""
+    _gauges[name] = fn
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        data: Dict[str, Any] = {"counters": dict(_counters)}
+    gauges: Dict[str, Any] = {}
+    for name, fn in list(_gauges.items()):
+        try:
+            gauges[name] = fn()
+        except Exception as e: # A broken gauge must not break the metrics endpoint
+            gauges[name] = f"error: {e}"
+    data["gauges"] = gauges
+    return data
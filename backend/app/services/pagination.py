@@ -0,0 +1,124 @@
+# app/services/pagination.py
+import base64
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# Opaque keyset cursors. A cursor holds the sort key of the last row served, e.g.
+# (createdAt, id), so the next page starts right after it at the same cost on every
+# page instead of re-reading everything before it. The scope ties a cursor to the
+# list, sort order and filters it came from.
+CURSOR_VERSION = 1
+# Largest page Vapi's list endpoints serve
+MAX_UPSTREAM_LIMIT = 1000
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(key: Tuple[Any, ...], scope: str, ties: int = 0) -> str:
+    payload = {"v": CURSOR_VERSION, "s": scope, "k": list(key)}
+    if ties:
+        payload["n"] = ties
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, scope: str) -> Tuple[Tuple[Any, ...], int]:
+    """Returns (key, ties). Raises InvalidCursorError for malformed or foreign cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key, ties = tuple(payload["k"]), int(payload.get("n", 0))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Malformed cursor")
+    if payload.get("v") != CURSOR_VERSION or payload.get("s") != scope:
+        raise InvalidCursorError("Cursor does not belong to this listing")
+    return key, ties
+
+
+def _call_key(call: Dict[str, Any]) -> Tuple[str, str]:
+    return call["createdAt"], call["id"]
+
+
+async def iter_newest_first(
+    fetch_page: Callable[[int, Optional[str]], Awaitable[Any]],
+    page_size: int,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Walks a whole Vapi listing newest first, one page at a time, for scans that must not
+    stop at the upstream page limit (bulk deletes, exports). `fetch_page(limit, created_at_le)`
+    returns rows created at or before `created_at_le` (no bound when None). Each page starts
+    at the previous page's oldest createdAt and skips the rows already yielded there, so
+    rows sharing a timestamp across a page boundary are neither lost nor repeated.
+    """
+    async for page, _ in resume_newest_first(fetch_page, page_size):
+        yield page
+
+
+async def resume_newest_first(
+    fetch_page: Callable[[int, Optional[str]], Awaitable[Any]],
+    page_size: int,
+    boundary: Optional[str] = None,
+    seen_at_boundary: Sequence[str] = (),
+) -> AsyncIterator[Tuple[List[Dict[str, Any]], Tuple[str, List[str]]]]:
+    """
+    iter_newest_first from a saved position: yields each page with the position after it,
+    (boundary createdAt, ids already yielded at that createdAt), to pass back in later.
+    """
+    seen: Set[str] = set(seen_at_boundary)
+    while True:
+        limit = page_size + len(seen) # Room for the already-yielded ties plus a full page
+        raw = await fetch_page(limit, boundary)
+        raw_rows = raw if isinstance(raw, list) else raw.get("data", [])
+        rows = [row for row in raw_rows if row.get("createdAt") and row.get("id")]
+        rows.sort(key=_call_key, reverse=True)
+        page = [row for row in rows if not (row["createdAt"] == boundary and row["id"] in seen)]
+        if not page:
+            return
+        oldest = rows[-1]["createdAt"]
+        tied = {row["id"] for row in rows if row["createdAt"] == oldest}
+        seen = seen | tied if oldest == boundary else tied
+        boundary = oldest
+        yield page, (boundary, sorted(seen))
+        if len(raw_rows) < limit:
+            return
+
+
+async def keyset_calls(vapi_client, assistant_id: Optional[str], limit: int, cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of calls, newest first, ordered by (createdAt, id) descending, and the cursor of
+    the next page (None on the last one). Vapi only filters on createdAt, so a page asks for
+    calls at or before the cursor's createdAt and skips the ones already served. The cursor
+    counts how many of those share that createdAt, so each request is usually limit + ties + 1.
+    Pages can come back shorter than `limit` when timestamps tie at the end of the window.
+    """
+    scope = f"calls:{assistant_id or ''}"
+    after, ties = decode_cursor(cursor, scope) if cursor else (None, 0)
+    fetch = limit + ties + 1 # One extra row tells whether another page follows
+    while True:
+        raw = await vapi_client.list_calls(assistant_id, fetch, created_at_le=after[0] if after else None)
+        rows = raw if isinstance(raw, list) else raw.get("data", [])
+        calls = [call for call in rows if call.get("createdAt") and call.get("id")]
+        calls.sort(key=_call_key, reverse=True) # ISO timestamps in one format sort as strings
+        full = len(rows) >= fetch
+        if full and calls:
+            # A full window may cut through calls sharing its oldest createdAt, and Vapi picks
+            # which of those it returns; leave them all to a later page
+            oldest = calls[-1]["createdAt"]
+            calls = [call for call in calls if call["createdAt"] != oldest]
+        if after is not None:
+            calls = [call for call in calls if _call_key(call) < after]
+        if calls or not full or fetch >= MAX_UPSTREAM_LIMIT:
+            break
+        # Nothing complete in the window (a tie group larger than it): widen until one fits
+        fetch = min(MAX_UPSTREAM_LIMIT, fetch * 2)
+
+    page = calls[:limit]
+    if not page or not (full or len(calls) > limit):
+        return page, None
+    last_created = page[-1]["createdAt"]
+    next_ties = sum(1 for call in page if call["createdAt"] == last_created)
+    if after is not None and after[0] == last_created:
+        next_ties += ties
+    return page, encode_cursor(_call_key(page[-1]), scope, next_ties)
\ No newline at end of file
@@ -1,4 +1,249 @@
-from typing import List, Optional
+import json
+import os
+import string
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.config import settings, logger
+from app.services import metrics
+from app.services.cache import TTLCache
+
+# Persona prompts come from versioned JSON templates in PROMPT_TEMPLATES_DIR. A template is
+# identified by (name, language, variant, version); its "parts" are joined with "separator":
+#   "text with {field} or {field|filter}"                  always rendered
+#   {"if": field, "then": text, "else": text}              "else" is optional
+#   {"switch": field, "cases": {value: text}, "default": text}
+# Templates are compiled once into literal/field segments, so a render is a single join.
+
+FIELDS = {"name", "age", "personality", "setting", "difficulty", "interests", "scenario_description"}
+FILTERS = {"lower": str.lower, "upper": str.upper, "title": str.title}
+
+Segment = Tuple[str, Optional[str], Optional[str]] # (literal, field, filter)
+
+
+class TemplateError(ValueError):
+    """A template file that cannot be compiled."""
+
+
+class TemplateNotFoundError(LookupError):
+    pass
+
+
+class TemplateKey(NamedTuple):
+    name: str
+    language: str
+    variant: str
+    version: int
+
+    @property
+    def ref(self) -> str:
+        """Stored in assistant metadata, e.g. "datemate/en/default@1"."""
+        return f"{self.name}/{self.language}/{self.variant}@{self.version}"
+
+
+def parse_template_ref(ref: Optional[str]) -> Optional[TemplateKey]:
+    try:
+        path, version = ref.rsplit("@", 1)
+        name, language, variant = path.split("/")
+        return TemplateKey(name, language, variant, int(version))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _compile_text(text: str, source: str) -> Tuple[Segment, ...]:
+    segments = []
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise TemplateError(f"{source}: {e}")
+    for literal, field, _, _ in parsed:
+        filter_name = None
+        if field is not None:
+            field, _, filter_name = field.partition("|")
+            filter_name = filter_name or None
+            if field not in FIELDS:
+                raise TemplateError(f"{source}: unknown field '{field}'")
+            if filter_name is not None and filter_name not in FILTERS:
+                raise TemplateError(f"{source}: unknown filter '{filter_name}'")
+        segments.append((literal, field, filter_name))
+    return tuple(segments)
+
+
+class CompiledTemplate:
+    """A template ready to render: every text is pre-split into literal/field segments."""
+
+    __slots__ = ("key", "description", "separator", "list_separator", "list_last_separator", "parts")
+
+    def __init__(self, spec: Dict[str, Any], source: str):
+        try:
+            self.key = TemplateKey(spec["name"], spec["language"], spec.get("variant", "default"), int(spec["version"]))
+            raw_parts = spec["parts"]
+        except (KeyError, TypeError, ValueError) as e:
+            raise TemplateError(f"{source}: missing or invalid name/language/version/parts ({e})")
+        self.description = spec.get("description", "")
+        self.separator = spec.get("separator", " ")
+        self.list_separator = spec.get("list_separator", ", ")
+        self.list_last_separator = spec.get("list_last_separator", " and ")
+        self.parts = tuple(self._compile_part(part, f"{source} part {i}") for i, part in enumerate(raw_parts))
+
+    @staticmethod
+    def _compile_part(part: Any, source: str) -> tuple:
+        if isinstance(part, str):
+            return ("text", _compile_text(part, source))
+        if isinstance(part, dict) and part.get("if") in FIELDS:
+            otherwise = part.get("else")
+            return ("if", part["if"], _compile_text(part.get("then", ""), source), _compile_text(otherwise, source) if otherwise is not None else None)
+        if isinstance(part, dict) and part.get("switch") in FIELDS:
+            cases = {value: _compile_text(text, source) for value, text in (part.get("cases") or {}).items()}
+            default = part.get("default")
+            return ("switch", part["switch"], cases, _compile_text(default, source) if default is not None else None)
+        raise TemplateError(f"{source}: expected a string, an 'if' or a 'switch' on one of {sorted(FIELDS)}")
+
+    def _join_list(self, items: List[str]) -> str:
+        if len(items) == 1:
+            return items[0]
+        return self.list_separator.join(items[:-1]) + self.list_last_separator + items[-1]
+
+    def render(self, values: Dict[str, Any]) -> str:
+        context = {field: value for field, value in values.items() if value not in (None, "", [], ())}
+        if "interests" in context:
+            context["interests"] = self._join_list(list(context["interests"]))
+        rendered = []
+        for part in self.parts:
+            kind = part[0]
+            if kind == "text":
+                segments = part[1]
+            elif kind == "if":
+                segments = part[2] if part[1] in context else part[3]
+            else:
+                segments = part[2].get(context.get(part[1]), part[3])
+            if segments is None:
+                continue
+            pieces = []
+            for literal, field, filter_name in segments:
+                pieces.append(literal)
+                if field is not None:
+                    value = str(context.get(field, ""))
+                    pieces.append(FILTERS[filter_name](value) if filter_name else value)
+            rendered.append("".join(pieces))
+        return self.separator.join(rendered)
+
+
+class TemplateRegistry:
+    """Compiled templates by (name, language, variant), each with all its versions."""
+
+    def __init__(self, templates: Iterable[CompiledTemplate] = ()):
+        self._versions: Dict[Tuple[str, str, str], Dict[int, CompiledTemplate]] = {}
+        for template in templates:
+            name, language, variant, version = template.key
+            self._versions.setdefault((name, language, variant), {})[version] = template
+
+    @classmethod
+    def from_directory(cls, path: str, strict: bool = False) -> "TemplateRegistry":
+        """
+        Compiles every *.json template in `path`. Broken files are logged and skipped,
+        or raised when `strict` (reloads keep the previous registry on any error).
+        """
+        templates = []
+        for filename in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+            if not filename.endswith(".json"):
+                continue
+            source = os.path.join(path, filename)
+            try:
+                with open(source, "r", encoding="utf-8") as f:
+                    templates.append(CompiledTemplate(json.load(f), filename))
+            except TemplateError as e:
+                if strict:
+                    raise
+                logger.error(f"Skipping prompt template {filename}: {e}")
+            except (OSError, ValueError) as e: # Unreadable file or invalid JSON
+                if strict:
+                    raise TemplateError(f"{filename}: {e}")
+                logger.error(f"Skipping prompt template {filename}: {e}")
+        return cls(templates)
+
+    def get(self, name: str, language: str, variant: str = "default", version: Optional[int] = None) -> CompiledTemplate:
+        """The requested version, or the latest one when `version` is None."""
+        versions = self._versions.get((name, language, variant))
+        if not versions:
+            raise TemplateNotFoundError(f"No prompt template '{name}' for language '{language}' and variant '{variant}'")
+        if version is None:
+            return versions[max(versions)]
+        if version not in versions:
+            raise TemplateNotFoundError(f"Prompt template '{name}/{language}/{variant}' has no version {version}")
+        return versions[version]
+
+    def keys(self) -> List[TemplateKey]:
+        return sorted(template.key for versions in self._versions.values() for template in versions.values())
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [
+            {**key._asdict(), "ref": key.ref, "description": self.get(key.name, key.language, key.variant, key.version).description}
+            for key in self.keys()
+        ]
+
+
+_registry = TemplateRegistry.from_directory(settings.PROMPT_TEMPLATES_DIR)
+logger.info(f"Loaded {len(_registry.keys())} prompt templates from {settings.PROMPT_TEMPLATES_DIR}")
+
+# Rendered prompts by (template version, persona fields); identical personas are common
+# (presets, retries, async job replays), and a hit skips rendering entirely
+_render_cache: TTLCache[str] = TTLCache(maxsize=settings.PROMPT_RENDER_CACHE_SIZE)
+
+metrics.register_gauge("prompts.render_cache", _render_cache.stats)
+
+
+def template_registry() -> TemplateRegistry:
+    return _registry
+
+
+def reload_templates() -> List[TemplateKey]:
+    """Recompiles the template directory; on any error the current templates stay in use."""
+    global _registry
+    _registry = TemplateRegistry.from_directory(settings.PROMPT_TEMPLATES_DIR, strict=True)
+    _render_cache.clear() # A file may have been edited in place without a version bump
+    logger.info(f"Reloaded {len(_registry.keys())} prompt templates")
+    return _registry.keys()
+
+
+def resolve_template(
+    template: Optional[str] = None,
+    language: Optional[str] = None,
+    variant: Optional[str] = None,
+    version: Optional[int] = None,
+) -> CompiledTemplate:
+    return _registry.get(
+        template or settings.PROMPT_DEFAULT_TEMPLATE,
+        language or settings.PROMPT_DEFAULT_LANGUAGE,
+        variant or "default",
+        version,
+    )
+
+
+def render_prompt(
+    compiled: CompiledTemplate,
+    name: str,
+    age: int,
+    personality: str,
+    setting: str,
+    difficulty: Optional[str],
+    interests: Optional[List[str]] = None,
+    scenario_description: Optional[str] = None,
+) -> str:
+    key = (compiled.key, name, age, personality, setting, difficulty, tuple(interests) if interests else None, scenario_description)
+    prompt = _render_cache.get(key)
+    if prompt is None:
+        prompt = compiled.render({
+            "name": name,
+            "age": age,
+            "personality": personality,
+            "setting": setting,
+            "difficulty": difficulty,
+            "interests": interests,
+            "scenario_description": scenario_description,
+        })
+        _render_cache.set(key, prompt)
+    return prompt
+
 
 def generate_datemate_prompt(
     name: str,
@@ -7,40 +252,16 @@ def generate_datemate_prompt(
     setting: str,
     difficulty: str,
     interests: Optional[List[str]] = None,
-    scenario_description: Optional[str] = None
+    scenario_description: Optional[str] = None,
+    template: Optional[str] = None,
+    language: Optional[str] = None,
+    variant: Optional[str] = None,
+    version: Optional[int] = None,
 ) -> str:
     """
-    The function generates a prompt for the DateMate agent based on user inputs
+    The function generates a prompt for the DateMate agent based on user inputs,
+    from the selected template (default: latest PROMPT_DEFAULT_TEMPLATE in PROMPT_DEFAULT_LANGUAGE).
+    Raises TemplateNotFoundError for an unknown template, language, variant or version.
     """
-    prompt_lines = [
-        f"You are impersonating {name}, a {age}-year-old who identifies as {personality.lower()}.",
-        f"The current setting for your conversation is a first date at a {setting}.",
-        "You are designed to help users practice their dating conversation skills.",
-        "Your primary goal is to engage in a natural, flowing conversation, making the user feel comfortable and confident.",
-        "Maintain a friendly, warm, and engaging tone throughout the conversation."
-    ]
-
-    if difficulty == "easy":
-        prompt_lines.append("You are very receptive, ask leading questions, and try to keep the conversation going smoothly. Be very forgiving of awkward pauses from the user.")
-    elif difficulty == "medium":
-        prompt_lines.append("You expect a bit more effort from the user to carry the conversation. You can be a little playful or challenging at times, but still aim to be supportive.")
-    elif difficulty == "hard":
-        prompt_lines.append("You are more discerning and might test the user's conversational skills. You might be a bit reserved initially or bring up more complex topics. The user needs to impress you.")
-    else: # Default to easy
-        prompt_lines.append("You are very receptive and try to keep the conversation going smoothly.")
-
-    if interests:
-        interest_string = ", ".join(interests[:-1]) + (' and ' + interests[-1] if len(interests) > 1 else interests[0])
-        prompt_lines.append(f"You particularly enjoy talking about {interest_string}.")
-    else:
-        # Default interests if none provided, or remove this line if not desired
-        prompt_lines.append("You have a keen interest in travel, movies, and good food.")
-    if scenario_description:
-        prompt_lines.append(f"Additional context for this scenario: {scenario_description}")
-    prompt_lines.extend([
-        "Do not break character under any circumstances.",
-        "Never reveal that you are an AI or a language model.",
-        f"Respond naturally as {name} would, drawing upon the described personality and setting."
-    ])
-
-    return " ".join(prompt_lines)
\ No newline at end of file
+    compiled = resolve_template(template, language, variant, version)
+    return render_prompt(compiled, name, age, personality, setting, difficulty, interests, scenario_description)
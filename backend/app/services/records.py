@@ -0,0 +1,102 @@
+# app/services/records.py
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Union
+
+from app.models import AssistantMetadata, AssistantSummary
+from app.services.assistant_parsing import process_assistant_item
+
+# Compact in-memory rows for the locally held assistant catalog (mirror and index).
+# Pydantic summaries cost several KB per row; these use __slots__ and share
+# repeated strings via sys.intern. Convert to the response model only at the
+# edge (to_summary).
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def _ts(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _dt(ts: Optional[float]) -> Optional[datetime]:
+    return None if ts is None else datetime.fromtimestamp(ts, timezone.utc)
+
+
+class AssistantRecord:
+    __slots__ = (
+        "id", "name", "persona_name", "personality", "difficulty", "setting", "age",
+        "short_description", "voice_model", "created_ts", "updated_ts",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        persona_name: Optional[str],
+        personality: Optional[str],
+        difficulty: Optional[str],
+        setting: Optional[str],
+        age: Optional[Union[int, str]],
+        short_description: Optional[str],
+        voice_model: Optional[str],
+        created_ts: float,
+        updated_ts: Optional[float],
+    ):
+        self.id = _intern(id)
+        self.name = name
+        self.persona_name = persona_name
+        self.personality = _intern(personality)
+        self.difficulty = _intern(difficulty)
+        self.setting = _intern(setting)
+        self.age = age
+        self.short_description = short_description
+        self.voice_model = _intern(voice_model)
+        self.created_ts = created_ts
+        self.updated_ts = updated_ts
+
+    @classmethod
+    def from_summary(cls, summary: AssistantSummary) -> "AssistantRecord":
+        metadata = summary.metadata or AssistantMetadata()
+        return cls(
+            id=summary.id,
+            name=summary.name,
+            persona_name=metadata.app_persona_name,
+            personality=summary.personality,
+            difficulty=summary.difficulty,
+            setting=metadata.app_setting,
+            age=metadata.app_age,
+            short_description=metadata.app_short_description,
+            voice_model=summary.voice_model,
+            created_ts=_ts(summary.creation_date),
+            updated_ts=_ts(summary.last_used),
+        )
+
+    @classmethod
+    def from_vapi(cls, item: Dict[str, Any]) -> "AssistantRecord":
+        return cls.from_summary(process_assistant_item(item))
+
+    def to_summary(self) -> AssistantSummary:
+        return AssistantSummary(
+            id=self.id,
+            name=self.name,
+            personality=self.personality,
+            creation_date=_dt(self.created_ts),
+            voice_model=self.voice_model,
+            difficulty=self.difficulty,
+            last_used=_dt(self.updated_ts),
+            metadata=AssistantMetadata(
+                app_persona_name=self.persona_name,
+                app_age=self.age,
+                app_personality=self.personality,
+                app_setting=self.setting,
+                app_difficulty=self.difficulty,
+                app_short_description=self.short_description,
+            ),
+        )
+
@@ -0,0 +1,170 @@
+# app/services/response_encoding.py
+import gzip
+import hashlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic_core import to_json, to_jsonable_python
+
+from app.config import settings
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.executor_service import ExecutorSaturatedError, get_executor
+
+# Content negotiation for the list/detail endpoints. The body is serialized once
+# (JSON, or MessagePack when the client asks for it and the optional 'msgpack'
+# package is installed), tagged with a strong ETag of its bytes, and compressed
+# with brotli (optional 'brotli' package) or gzip above RESPONSE_COMPRESS_MIN_BYTES.
+# Compressed bodies are cached by (ETag, encoding): the ETag is a hash of the exact
+# bytes, so a hit is always safe, and hot responses are compressed only once.
+
+JSON = "application/json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def available_encodings() -> Dict[str, bool]:
+    return {"gzip": True, "br": _brotli() is not None, "msgpack": _msgpack() is not None}
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def _br(body: bytes) -> bytes:
+    return _brotli().compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"br": _br, "gzip": _gzip}
+
+_compressed: TTLCache[bytes] = TTLCache(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+metrics.register_gauge("responses.compression_cache", _compressed.stats)
+
+
+def _qvalues(header: Optional[str]) -> Dict[str, float]:
+    """{"gzip": 1.0, "br": 0.5} for "gzip, br;q=0.5". Malformed q-values count as 0."""
+    values: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        token, *params = (part.strip() for part in item.split(";"))
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        values[token.lower()] = q
+    return values
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack only when the client ranks it above JSON and msgpack is installed."""
+    if not accept or _msgpack() is None:
+        return JSON
+    q = _qvalues(accept)
+    fallback = max(q.get("*/*", 0.0), q.get("application/*", 0.0))
+    json_q = q.get(JSON, fallback)
+    msgpack_type = max(MSGPACK_TYPES, key=lambda t: q.get(t, 0.0))
+    return msgpack_type if q.get(msgpack_type, 0.0) > json_q else JSON
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """The compression to apply, or None for small bodies or clients that accept neither."""
+    if size < settings.RESPONSE_COMPRESS_MIN_BYTES:
+        return None
+    q = _qvalues(accept_encoding)
+    candidates = ["br", "gzip"] if _brotli() is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in candidates: # On equal q-values brotli wins: smaller at the same CPU cost
+        encoding_q = q.get(encoding, q.get("*", 0.0))
+        if encoding_q > best_q:
+            best, best_q = encoding, encoding_q
+    return best
+
+
+def serialize(content: Any, media_type: str) -> bytes:
+    if media_type == JSON:
+        return to_json(content)
+    return _msgpack().packb(to_jsonable_python(content))
+
+
+def make_etag(media_type: str, body: bytes) -> str:
+    digest = hashlib.blake2b(body, digest_size=16)
+    digest.update(media_type.encode("ascii"))
+    return digest.hexdigest()
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compares against the base tag, so "<etag>-gzip" from a compressed response still matches."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"').split("-", 1)[0] == etag:
+            return True
+    return False
+
+
+async def _compress(etag: str, encoding: str, body: bytes) -> bytes:
+    key: Tuple[str, str] = (etag, encoding)
+    compressed = _compressed.get(key)
+    if compressed is not None:
+        return compressed
+    compress = COMPRESSORS[encoding]
+    if len(body) >= settings.RESPONSE_COMPRESS_OFFLOAD_BYTES:
+        try:
+            compressed = await get_executor("thread").run(compress, body)
+        except ExecutorSaturatedError:
+            compressed = compress(body) # Slower for this request, but never fail it over compression
+    else:
+        compressed = compress(body)
+    if len(compressed) <= settings.RESPONSE_CACHE_MAX_ITEM_BYTES:
+        _compressed.set(key, compressed)
+    metrics.incr(f"responses.compressed.{encoding}")
+    return compressed
+
+
+async def encode_response(request: Request, content: Any, immutable: bool = False, status_code: int = 200) -> Response:
+    """
+    Serializes `content` (a pydantic model or plain data) for the client's Accept and
+    Accept-Encoding headers. Answers 304 when If-None-Match already holds this body.
+    `immutable` responses (e.g. ended calls) may also be cached by the client.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    body = serialize(content, media_type)
+    etag = make_etag(media_type, body)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if immutable:
+        headers["Cache-Control"] = "private, max-age=86400, immutable"
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(body))
+    headers["ETag"] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        body = await _compress(etag, encoding, body)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
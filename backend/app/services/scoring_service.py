@@ -0,0 +1,192 @@
+# app/services/scoring_service.py
+import asyncio
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.executor_service import ExecutorSaturatedError, get_executor
+
+# A turn is (speaker, text, start_seconds, end_seconds); speaker is "user" or "ai".
+# Plain tuples keep batches cheap to pickle for the process pool.
+Turn = Tuple[str, str, Optional[float], Optional[float]]
+
+FILLER_WORDS = ("um", "uh", "erm", "hmm", "like", "you know", "i mean", "sort of", "kind of", "basically", "actually", "literally")
+
+# Compiled once; each pass runs over a whole call's user text rather than per turn
+_WORD_RE = re.compile(r"[A-Za-z']+")
+_QUESTION_RE = re.compile(r"\?")
+_FILLER_RE = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in sorted(FILLER_WORDS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+_TRANSCRIPT_LINE_RE = re.compile(r"^(AI|Assistant|Bot|User|Customer)\s*:\s*(.*)$", re.IGNORECASE | re.MULTILINE)
+
+_USER_ROLES = {"user", "customer"}
+_AI_ROLES = {"bot", "assistant", "ai"}
+
+
+def extract_turns(call: Dict[str, Any]) -> List[Turn]:
+    """Turns from a Vapi call object: timed `messages` when available, else the plain transcript."""
+    messages = call.get("messages") or (call.get("artifact") or {}).get("messages") or []
+    turns: List[Turn] = []
+    for message in messages:
+        role = (message.get("role") or "").lower()
+        speaker = "user" if role in _USER_ROLES else "ai" if role in _AI_ROLES else None
+        text = message.get("message") or message.get("content") or ""
+        if speaker is None or not text:
+            continue
+        if message.get("time") is not None and message.get("endTime") is not None:
+            start, end = message["time"] / 1000, message["endTime"] / 1000 # epoch ms
+        elif message.get("secondsFromStart") is not None:
+            start = float(message["secondsFromStart"])
+            end = start + (message.get("duration") or 0) / 1000
+        else:
+            start = end = None
+        turns.append((speaker, text, start, end))
+    if turns:
+        return turns
+
+    for match in _TRANSCRIPT_LINE_RE.finditer(call.get("transcript") or ""):
+        speaker = "user" if match.group(1).lower() in _USER_ROLES else "ai"
+        turns.append((speaker, match.group(2).strip(), None, None))
+    return turns
+
+
+def _mean(values: Sequence[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def score_turns(turns: List[Turn]) -> Dict[str, Any]:
+    """Conversation-quality features and an overall 0-100 score for one call."""
+    user_texts = [text for speaker, text, _, _ in turns if speaker == "user"]
+    ai_texts = [text for speaker, text, _, _ in turns if speaker == "ai"]
+
+    # One regex pass per feature over the joined user text
+    user_blob = "\n".join(user_texts)
+    user_words = len(_WORD_RE.findall(user_blob))
+    ai_words = len(_WORD_RE.findall("\n".join(ai_texts)))
+    questions = len(_QUESTION_RE.findall(user_blob))
+    fillers = len(_FILLER_RE.findall(user_blob))
+
+    user_time = sum(end - start for speaker, _, start, end in turns if speaker == "user" and start is not None)
+    ai_time = sum(end - start for speaker, _, start, end in turns if speaker == "ai" and start is not None)
+    if user_time + ai_time > 0:
+        talk_time_ratio = user_time / (user_time + ai_time)
+    else: # No timings; approximate speaking time by word count
+        talk_time_ratio = user_words / (user_words + ai_words) if user_words + ai_words else None
+
+    latencies = []
+    for previous, current in zip(turns, turns[1:]):
+        if previous[0] == "ai" and current[0] == "user" and previous[3] is not None and current[2] is not None:
+            latencies.append(max(0.0, current[2] - previous[3]))
+
+    question_rate = questions / len(user_texts) if user_texts else None
+    filler_rate = fillers * 100 / user_words if user_words else None
+    avg_response_latency = _mean(latencies)
+
+    # Each component is 0..1; balanced talk time, some curiosity, few fillers, quick replies
+    components = []
+    if talk_time_ratio is not None:
+        components.append(1 - min(1.0, abs(talk_time_ratio - 0.5) * 2))
+    if question_rate is not None:
+        components.append(min(1.0, question_rate / 0.3))
+    if filler_rate is not None:
+        components.append(max(0.0, 1 - filler_rate / 10))
+    if avg_response_latency is not None:
+        components.append(max(0.0, 1 - max(0.0, avg_response_latency - 1) / 4))
+
+    return {
+        "score": round(100 * _mean(components), 1) if components else None,
+        "talk_time_ratio": talk_time_ratio,
+        "question_rate": question_rate,
+        "avg_response_latency": avg_response_latency,
+        "filler_rate": filler_rate,
+        "avg_user_turn_words": user_words / len(user_texts) if user_texts else None,
+        "avg_assistant_turn_words": ai_words / len(ai_texts) if ai_texts else None,
+        "user_turns": len(user_texts),
+    }
+
+
+def score_turn_batch(batch: List[List[Turn]]) -> List[Dict[str, Any]]:
+    """Scores many calls in one go. Top-level so it can run in the process pool."""
+    return [score_turns(turns) for turns in batch]
+
+
+# Scores of finished calls never change, so they are cached by call id
+score_cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=settings.SCORING_CACHE_SIZE)
+
+metrics.register_gauge("scoring.cache", score_cache.stats)
+
+
+def _is_final(call: Dict[str, Any]) -> bool:
+    return bool(call.get("endedAt") or call.get("endTime")) or call.get("status") == "ended"
+
+
+async def _score_inline(batch: List[List[Turn]]) -> List[Dict[str, Any]]:
+    """Scores on the event loop in small chunks, yielding between them so requests keep flowing."""
+    chunk_size = settings.SCORING_INLINE_CHUNK_SIZE
+    scored: List[Dict[str, Any]] = []
+    for i in range(0, len(batch), chunk_size):
+        if i:
+            await asyncio.sleep(0)
+        scored.extend(score_turn_batch(batch[i:i + chunk_size]))
+    return scored
+
+
+async def _score_in_pool(batch: List[List[Turn]]) -> List[Dict[str, Any]]:
+    chunk_size = settings.SCORING_CHUNK_SIZE
+    chunks = [batch[i:i + chunk_size] for i in range(0, len(batch), chunk_size)]
+    executor = get_executor("scoring")
+    scored: List[Dict[str, Any]] = []
+    # One chunk per worker at a time keeps us within the executor's queue bound
+    for i in range(0, len(chunks), executor.max_workers):
+        window = chunks[i:i + executor.max_workers]
+        for chunk_scores in await asyncio.gather(*(executor.run(score_turn_batch, chunk) for chunk in window)):
+            scored.extend(chunk_scores)
+    return scored
+
+
+async def score_calls(calls: List[Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Scores for a batch of raw Vapi calls, keyed by call id. Cached scores are reused;
+    misses are scored in yielding chunks on the loop, or in the scoring process pool
+    for batches large enough to be worth the pickling.
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending_ids: List[str] = []
+    pending_turns: List[List[Turn]] = []
+    finals = set()
+    for call in calls:
+        call_id = call.get("id")
+        if not call_id:
+            continue
+        cached = score_cache.get(call_id)
+        if cached is not None:
+            results[call_id] = cached
+            continue
+        pending_ids.append(call_id)
+        pending_turns.append(extract_turns(call))
+        if _is_final(call):
+            finals.add(call_id)
+
+    if not pending_ids:
+        return results
+
+    scored: Optional[List[Dict[str, Any]]] = None
+    if settings.SCORING_PROCESS_WORKERS > 0 and len(pending_turns) >= settings.SCORING_PROCESS_POOL_MIN_BATCH:
+        try:
+            scored = await _score_in_pool(pending_turns)
+        except ExecutorSaturatedError:
+            metrics.incr("scoring.pool_saturated")
+    if scored is None:
+        scored = await _score_inline(pending_turns)
+
+    for call_id, score in zip(pending_ids, scored):
+        results[call_id] = score
+        if call_id in finals:
+            score_cache.set(call_id, score)
+    metrics.incr("scoring.scored_calls", len(scored))
+    return results
+
+
+def forget_scores(call_ids: List[str]) -> None:
+    score_cache.invalidate_many(call_ids)
@@ -0,0 +1,153 @@
+# app/services/tenant_service.py
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.config import settings, logger
+from app.services import metrics
+
+
+class Tenant(NamedTuple):
+    """A partner brand with its own Vapi account."""
+    id: str
+    vapi_api_key: str
+    default_assistant_id: Optional[str] = None
+    phone_number_id: Optional[str] = None
+    webhook_secret: Optional[str] = None
+    max_concurrency: int = settings.TENANT_MAX_CONCURRENCY
+    api_keys: tuple = () # Client API keys (X-API-Key) that select this tenant
+
+
+class TenantUsage:
+    """Per-tenant upstream concurrency quota and counters."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.requests = 0
+        self.upstream_calls = 0
+        self.quota_waits = 0 # Upstream calls that had to wait for a free slot
+        self.quota_timeouts = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "quota_waits": self.quota_waits,
+            "quota_timeouts": self.quota_timeouts,
+        }
+
+
+def _default_tenant() -> Tenant:
+    # The single-account settings keep working as the default tenant
+    return Tenant(
+        id=settings.DEFAULT_TENANT_ID,
+        vapi_api_key=settings.VAPI_API_KEY,
+        default_assistant_id=settings.DEFAULT_VAPI_ASSISTANT_ID,
+        phone_number_id=settings.VAPI_PHONE_NUMBER_ID,
+        webhook_secret=settings.VAPI_WEBHOOK_SECRET,
+    )
+
+
+def _load_tenants(path: str) -> List[Tenant]:
+    """
+    Reads tenants from a JSON file: {"tenants": [{"id": ..., "vapi_api_key": ...,
+    "default_assistant_id": ..., "phone_number_id": ..., "webhook_secret": ...,
+    "max_concurrency": ..., "api_keys": [...]}, ...]}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f).get("tenants", [])
+    tenants = []
+    for entry in entries:
+        entry = {k: v for k, v in entry.items() if k in Tenant._fields}
+        entry["api_keys"] = tuple(entry.get("api_keys") or ())
+        tenants.append(Tenant(**entry))
+    return tenants
+
+
+_tenants: Dict[str, Tenant] = {}
+_by_api_key: Dict[str, str] = {}
+_usage: Dict[str, TenantUsage] = {}
+
+
+def register_tenant(tenant: Tenant) -> None:
+    _tenants[tenant.id] = tenant
+    _usage[tenant.id] = TenantUsage(tenant.max_concurrency)
+    for api_key in tenant.api_keys:
+        _by_api_key[api_key] = tenant.id
+
+
+register_tenant(_default_tenant())
+if settings.TENANTS_FILE:
+    try:
+        for loaded in _load_tenants(settings.TENANTS_FILE):
+            register_tenant(loaded)
+        logger.info(f"Loaded {len(_tenants)} tenants from {settings.TENANTS_FILE}")
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Could not load tenants from {settings.TENANTS_FILE}: {e}")
+
+
+def get_tenant(tenant_id: str) -> Optional[Tenant]:
+    return _tenants.get(tenant_id)
+
+
+def all_tenants() -> List[Tenant]:
+    return list(_tenants.values())
+
+
+def tenant_usage(tenant_id: str) -> TenantUsage:
+    return _usage[tenant_id]
+
+
+def tenant_for_api_key(api_key: Optional[str]) -> Optional[Tenant]:
+    """The tenant a client API key belongs to, or None for unknown keys."""
+    tenant_id = _by_api_key.get(api_key) if api_key else None
+    return _tenants[tenant_id] if tenant_id is not None else None
+
+
+def resolve_tenant(tenant_id: Optional[str], api_key: Optional[str], trust_header: bool = False) -> Optional[Tenant]:
+    """
+    The tenant a request acts for, or None if the credentials do not name one.
+    An API key selects its tenant; an unknown key is rejected rather than falling
+    back to the default tenant. A bare tenant id header is only honoured for
+    tenants without API keys, or when `trust_header` (signed webhooks).
+    """
+    if api_key:
+        key_tenant = _by_api_key.get(api_key)
+        if key_tenant is None or (tenant_id and tenant_id != key_tenant):
+            return None
+        return _tenants[key_tenant]
+    if tenant_id:
+        tenant = _tenants.get(tenant_id)
+        if tenant is None or (tenant.api_keys and not trust_header):
+            return None
+        return tenant
+    return _tenants[settings.DEFAULT_TENANT_ID]
+
+
+# Tenant of the request being served; set by TenantMiddleware, copied into job workers
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+
+def current_tenant() -> Tenant:
+    return _current_tenant.get() or _tenants[settings.DEFAULT_TENANT_ID]
+
+
+def use_tenant(tenant: Tenant):
+    """Makes `tenant` current. Returns a token for reset_tenant."""
+    return _current_tenant.set(tenant)
+
+
+def reset_tenant(token) -> None:
+    _current_tenant.reset(token)
+
+
+def tenant_stats() -> Dict[str, Any]:
+    return {tenant_id: usage.stats() for tenant_id, usage in _usage.items()}
+
+
+metrics.register_gauge("tenants", tenant_stats)
@@ -0,0 +1,340 @@
+# app/services/transcript_service.py
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings, logger
+from app.models import VapiWebhookMessage
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.tenant_service import current_tenant
+
+# Live transcripts of calls in progress, assembled from the transcript and
+# conversation-update webhooks. Each call has an append-only list of finished
+# turns, so an entry's offset never changes and clients tail a call with
+# ?since=<next_offset>. Partial utterances are kept aside as "pending" until final.
+#
+# Vapi can send both event kinds for the same turns, so a call takes its turns from
+# whichever kind arrives first; the other only updates "pending". When the call
+# ends, its buffer is written to TRANSCRIPT_DIR and leaves memory; events arriving
+# after that are dropped, and a complete copy is never replaced by a partial one.
+
+TRANSCRIPT_DIR = os.path.join(settings.DATA_DIR, "transcripts")
+
+# Vapi roles in conversation messages; system prompts and tool traffic are not transcript
+ROLES = {"user": "user", "assistant": "assistant", "bot": "assistant"}
+
+# Vapi call ids are UUIDs; anything else cannot name a file of ours
+_CALL_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class TranscriptBuffer:
+    __slots__ = ("tenant_id", "call_id", "assistant_id", "entries", "pending", "source", "seen_messages", "truncated", "active_at")
+
+    def __init__(self, tenant_id: str, call_id: str, assistant_id: Optional[str], now: float):
+        self.tenant_id = tenant_id
+        self.call_id = call_id
+        self.assistant_id = assistant_id
+        self.entries: List[Dict[str, Any]] = []
+        self.pending: Dict[str, str] = {}
+        self.source: Optional[str] = None # "transcript" or "conversation-update", fixed by the first turn
+        self.seen_messages = 0 # conversation-update: messages already consumed
+        self.truncated = False
+        self.active_at = now
+
+    def append(self, role: str, text: str, seconds_from_start: Optional[float] = None) -> None:
+        if len(self.entries) >= settings.LIVE_TRANSCRIPT_MAX_ENTRIES:
+            self.truncated = True
+            return
+        self.entries.append({"offset": len(self.entries), "role": role, "text": text, "seconds_from_start": seconds_from_start})
+        self.pending.pop(role, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tenant_id": self.tenant_id,
+            "call_id": self.call_id,
+            "assistant_id": self.assistant_id,
+            "entries": self.entries,
+            "truncated": self.truncated,
+            "source": self.source,
+            "seen_messages": self.seen_messages,
+        }
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any], now: float) -> "TranscriptBuffer":
+        buffer = cls(record["tenant_id"], record["call_id"], record.get("assistant_id"), now)
+        buffer.entries = record.get("entries", [])
+        buffer.truncated = record.get("truncated", False)
+        buffer.source = record.get("source")
+        buffer.seen_messages = record.get("seen_messages", 0)
+        return buffer
+
+
+def _message_entries(messages: List[Dict[str, Any]]) -> List[Tuple[str, str, Optional[float]]]:
+    """(role, text, seconds from start) for the spoken turns of a Vapi message list."""
+    turns = []
+    for message in messages:
+        role = ROLES.get(message.get("role"))
+        text = message.get("message") or message.get("content")
+        if role and isinstance(text, str) and text.strip():
+            turns.append((role, text.strip(), message.get("secondsFromStart")))
+    return turns
+
+
+class LiveTranscripts:
+    """
+    Buffers by (tenant, call) in least-recently-active order. Bounded by call count and
+    idle time: evicted buffers are returned to the caller to be written out, not lost.
+    """
+
+    def __init__(self, max_calls: int, idle_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_calls = max_calls
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._buffers: "OrderedDict[Tuple[str, str], TranscriptBuffer]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, tenant_id: str, call_id: str) -> Optional[TranscriptBuffer]:
+        return self._buffers.get((tenant_id, call_id))
+
+    def pop(self, tenant_id: str, call_id: str) -> Optional[TranscriptBuffer]:
+        return self._buffers.pop((tenant_id, call_id), None)
+
+    def restore(self, record: Dict[str, Any]) -> None:
+        """Brings back a buffer that was evicted while its call was still going on."""
+        key = (record["tenant_id"], record["call_id"])
+        if key not in self._buffers:
+            self._buffers[key] = TranscriptBuffer.from_dict(record, self._clock())
+
+    def pop_all(self) -> List[TranscriptBuffer]:
+        buffers = list(self._buffers.values())
+        self._buffers.clear()
+        return buffers
+
+    def _touch(self, tenant_id: str, call_id: str, assistant_id: Optional[str]) -> TranscriptBuffer:
+        key = (tenant_id, call_id)
+        now = self._clock()
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = TranscriptBuffer(tenant_id, call_id, assistant_id, now)
+        else:
+            self._buffers.move_to_end(key)
+            buffer.active_at = now
+            buffer.assistant_id = buffer.assistant_id or assistant_id
+        return buffer
+
+    def _evict(self) -> List[TranscriptBuffer]:
+        evicted = []
+        idle_before = self._clock() - self.idle_seconds
+        while self._buffers:
+            oldest = next(iter(self._buffers.values()))
+            if len(self._buffers) <= self.max_calls and oldest.active_at > idle_before:
+                break
+            evicted.append(self._buffers.popitem(last=False)[1])
+        self.evictions += len(evicted)
+        return evicted
+
+    def record(self, tenant_id: str, message: VapiWebhookMessage) -> List[TranscriptBuffer]:
+        """Applies one transcript / conversation-update message. Returns buffers evicted to make room."""
+        call = message.call or {}
+        call_id = call.get("id")
+        if not call_id:
+            return []
+        kind = message.type.split("[", 1)[0] # Vapi may send e.g. 'transcript[transcriptType="final"]'
+        buffer = self._touch(tenant_id, call_id, call.get("assistantId"))
+
+        if kind == "transcript":
+            role = ROLES.get(message.role or "")
+            text = (message.transcript or "").strip()
+            if role and text:
+                if message.transcriptType == "final" and buffer.source in (None, "transcript"):
+                    buffer.source = "transcript"
+                    buffer.append(role, text)
+                else:
+                    buffer.pending[role] = text
+        elif kind == "conversation-update" and message.messages is not None:
+            turns = _message_entries(message.messages)
+            if buffer.source in (None, "conversation-update"):
+                new_turns = turns[buffer.seen_messages:]
+                if new_turns:
+                    buffer.source = "conversation-update"
+                for role, text, seconds in new_turns:
+                    buffer.append(role, text, seconds)
+            buffer.seen_messages = len(turns)
+        return self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": len(self._buffers), "max_calls": self.max_calls, "evictions": self.evictions}
+
+
+live_transcripts = LiveTranscripts(settings.LIVE_TRANSCRIPT_MAX_CALLS, settings.LIVE_TRANSCRIPT_IDLE_SECONDS)
+
+metrics.register_gauge("live_transcripts", live_transcripts.stats)
+
+# Calls whose end-of-call report is being stored: their buffer is already gone but the
+# complete copy is not on disk yet, so events for them must not start a new buffer.
+# Recently ended calls are remembered a little longer, for events whose load of the
+# stored copy started before the report was written.
+_finishing: Set[Tuple[str, str]] = set()
+_recently_ended: TTLCache[bool] = TTLCache(maxsize=settings.LIVE_TRANSCRIPT_MAX_CALLS, ttl=60)
+
+
+def _has_ended(tenant_id: str, call_id: str) -> bool:
+    key = (tenant_id, call_id)
+    return key in _finishing or _recently_ended.get(key) is not None
+
+
+# --- Local store ---
+
+def _store_path(tenant_id: str, call_id: str) -> str:
+    return os.path.join(TRANSCRIPT_DIR, tenant_id, f"{call_id}.json")
+
+
+# Serializes writers, so the check for a complete copy and the replace are one step
+_write_lock = threading.Lock()
+
+
+def _read(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(record: Dict[str, Any]) -> bool:
+    """Stores a transcript. A partial one never replaces a complete one; returns False then."""
+    path = _store_path(record["tenant_id"], record["call_id"])
+    with _write_lock:
+        if not record.get("complete"):
+            stored = _read(path)
+            if stored is not None and stored.get("complete"):
+                return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path) # Atomic, so readers never see a half-written transcript
+    return True
+
+
+async def _flush(record: Dict[str, Any]) -> None:
+    if not _CALL_ID.match(record["call_id"]):
+        logger.warning(f"Not storing transcript of call with unexpected id {record['call_id']!r}")
+        return
+    try:
+        if await asyncio.to_thread(_write, record):
+            metrics.incr("live_transcripts.flushed")
+        else:
+            metrics.incr("live_transcripts.partial_after_complete")
+    except OSError as e:
+        logger.error(f"Could not store transcript of call {record['call_id']}: {e}")
+
+
+def load_stored_transcript(call_id: str, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The stored transcript of a call of the current tenant, if any. Blocking; see read_transcript."""
+    if not _CALL_ID.match(call_id):
+        return None
+    return _read(_store_path(tenant_id or current_tenant().id, call_id))
+
+
+# --- Webhook entry points ---
+
+async def _resume_evicted(tenant_id: str, call_id: str, ending: bool = False) -> bool:
+    """
+    Restores a call evicted mid-call, so it continues at the same offsets instead of
+    restarting. Returns True if the call has already ended: its stored copy is complete,
+    or (unless this is the `ending` report itself) its end-of-call report is being stored.
+    """
+    if live_transcripts.get(tenant_id, call_id) is not None:
+        return False
+    stored = await asyncio.to_thread(load_stored_transcript, call_id, tenant_id)
+    if not ending and _has_ended(tenant_id, call_id): # The report arrived during the load
+        return True
+    if stored is None:
+        return False
+    if stored.get("complete"):
+        return True
+    live_transcripts.restore(stored)
+    return False
+
+
+async def record_transcript_event(message: VapiWebhookMessage) -> None:
+    tenant_id = current_tenant().id
+    call_id = (message.call or {}).get("id")
+    if call_id and _CALL_ID.match(call_id):
+        # Delivered after the end-of-call report (retries, reordering): the stored copy is final
+        if _has_ended(tenant_id, call_id) or await _resume_evicted(tenant_id, call_id):
+            metrics.incr("live_transcripts.late_events")
+            return
+    for buffer in live_transcripts.record(tenant_id, message):
+        # An evicted call may still end later; its end-of-call report then replaces this copy
+        logger.info(f"Evicting live transcript of inactive call {buffer.call_id}")
+        await _flush({**buffer.to_dict(), "complete": False})
+
+
+async def finish_call(message: VapiWebhookMessage) -> None:
+    """End of call: stores the buffered transcript (or the report's own, if nothing was buffered)."""
+    call = message.call or {}
+    call_id = call.get("id")
+    if not call_id:
+        return
+    tenant_id = current_tenant().id
+    key = (tenant_id, call_id)
+    _finishing.add(key) # Before the first await, so no event slips in between
+    try:
+        if _CALL_ID.match(call_id):
+            await _resume_evicted(tenant_id, call_id, ending=True)
+        buffer = live_transcripts.pop(tenant_id, call_id)
+        if buffer is None or not buffer.entries:
+            # Nothing heard live (e.g. after a restart): take the turns from the report's artifact
+            buffer = buffer or TranscriptBuffer(tenant_id, call_id, call.get("assistantId"), time.monotonic())
+            for role, text, seconds in _message_entries((message.artifact or {}).get("messages") or []):
+                buffer.append(role, text, seconds)
+        await _flush({
+            **buffer.to_dict(),
+            "complete": True,
+            "ended_reason": message.endedReason or call.get("endedReason"),
+            "summary": (message.analysis or {}).get("summary"),
+        })
+    finally:
+        _recently_ended.set(key, True)
+        _finishing.discard(key)
+
+
+async def flush_live_transcripts() -> None:
+    """On shutdown: stores every call still in progress, marked incomplete."""
+    for buffer in live_transcripts.pop_all():
+        await _flush({**buffer.to_dict(), "complete": False})
+
+
+async def read_transcript(call_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+    """Entries from `since` on, from the live buffer or else the local store. None if unknown."""
+    tenant_id = current_tenant().id
+    buffer = live_transcripts.get(tenant_id, call_id)
+    if buffer is not None:
+        return {
+            "call_id": call_id,
+            "status": "live",
+            "entries": buffer.entries[since:],
+            "next_offset": len(buffer.entries),
+            "pending": dict(buffer.pending),
+            "truncated": buffer.truncated,
+        }
+    stored = await asyncio.to_thread(load_stored_transcript, call_id, tenant_id)
+    if stored is None:
+        return None
+    entries = stored.get("entries", [])
+    return {
+        "call_id": call_id,
+        # An incomplete copy was evicted or left at shutdown; the call may still be going on
+        "status": "ended" if stored.get("complete") else "live",
+        "entries": entries[since:],
+        "next_offset": len(entries),
+        "truncated": stored.get("truncated", False),
+    }
@@ -1,103 +1,198 @@
 # app/services/vapi_client.py
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
 from typing import Dict, Any, Optional, List
 import httpx
 from app.config import settings, logger
+from app.services import metrics
+from app.services.logging_service import truncate_payload
+from app.services.deadline import check_budget, timeout_for
+from app.services.hedging import vapi_hedger
+from app.services.tenant_service import Tenant, current_tenant, tenant_usage
+
+# One connection pool per tenant for upstream Vapi traffic, created lazily. The least
+# recently used idle pools are closed beyond TENANT_MAX_CLIENTS; all are closed on shutdown.
+_http_clients: "OrderedDict[str, httpx.AsyncClient]" = OrderedDict()
+
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.VAPI_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.VAPI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.VAPI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.VAPI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+def _evict_idle_clients() -> None:
+    for tenant_id in list(_http_clients):
+        if len(_http_clients) <= settings.TENANT_MAX_CLIENTS:
+            return
+        if tenant_usage(tenant_id).in_flight: # Never close a pool with requests on it
+            continue
+        client = _http_clients.pop(tenant_id)
+        metrics.incr("upstream.clients.evicted")
+        asyncio.get_running_loop().create_task(client.aclose())
+
+def get_http_client(tenant: Optional[Tenant] = None) -> httpx.AsyncClient:
+    tenant_id = (tenant or current_tenant()).id
+    client = _http_clients.get(tenant_id)
+    if client is None or client.is_closed:
+        client = _http_clients[tenant_id] = _new_http_client()
+        _evict_idle_clients()
+    _http_clients.move_to_end(tenant_id)
+    return client
+
+async def close_http_client() -> None:
+    while _http_clients:
+        _, client = _http_clients.popitem()
+        await client.aclose()
+
+# Number of upstream Vapi requests currently awaiting a response (used for admission control)
+_in_flight = 0
+
+def upstream_in_flight() -> int:
+    return _in_flight
+
+@contextmanager
+def track_upstream():
+    global _in_flight
+    _in_flight += 1
+    try:
+        yield
+    finally:
+        _in_flight -= 1
+
+# Slot acquisitions slower than this count as having waited for the tenant's quota
+QUOTA_WAIT_THRESHOLD = 0.005
+
+@asynccontextmanager
+async def upstream_slot(tenant: Tenant):
+    """
+    Holds one of the tenant's upstream concurrency slots for the duration of a request,
+    so a noisy tenant queues behind its own quota instead of everyone's connections.
+    """
+    usage = tenant_usage(tenant.id)
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(usage.semaphore.acquire(), timeout_for(settings.VAPI_TIMEOUT_SECONDS, "tenant_quota"))
+    except asyncio.TimeoutError:
+        usage.quota_timeouts += 1
+        raise httpx.PoolTimeout(f"Upstream concurrency quota of tenant '{tenant.id}' exhausted")
+    if time.monotonic() - started > QUOTA_WAIT_THRESHOLD:
+        usage.quota_waits += 1
+    usage.in_flight += 1
+    usage.upstream_calls += 1
+    try:
+        with track_upstream():
+            yield
+    finally:
+        usage.in_flight -= 1
+        usage.semaphore.release()
+
+metrics.register_gauge("upstream.in_flight", upstream_in_flight)
+metrics.register_gauge("upstream.clients", lambda: len(_http_clients))
+
+def _is_upstream_failure(response: httpx.Response) -> bool:
+    """Responses a hedged attempt must not win with: server errors and rate limiting."""
+    return response.status_code >= 500 or response.status_code == 429
 
 class VapiClient:
     """Client for interacting with the Vapi API"""
-    
-    def __init__(self):
-        self.base_url = "https://api.vapi.ai"
+
+    def __init__(self, tenant: Optional[Tenant] = None):
+        self.tenant = tenant or current_tenant()
+        self.base_url = settings.VAPI_API_URL
         self.headers = {
-            "Authorization": f"Bearer {settings.VAPI_API_KEY}",
+            "Authorization": f"Bearer {self.tenant.vapi_api_key}",
             "Content-Type": "application/json"
         }
-    
-    async def list_assistants(self, limit: int = 10, page_token: Optional[str] = None):
+        self.client = get_http_client(self.tenant)
+
+    def get_headers(self) -> Dict[str, str]:
+        return self.headers
+
+    async def _attempt(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with upstream_slot(self.tenant):
+            return await self.client.request(method, url, headers=self.headers, **kwargs)
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        # Each call gets what is left of the request's deadline as its timeout
+        timeout = timeout_for(settings.VAPI_TIMEOUT_SECONDS)
+        url = f"{self.base_url}{path}"
+        try:
+            if method == "GET" and settings.VAPI_HEDGING_ENABLED: # Only idempotent reads are hedged
+                return await vapi_hedger.run(lambda: self._attempt(method, url, timeout=timeout, **kwargs), is_failure=_is_upstream_failure)
+            return await self._attempt(method, url, timeout=timeout, **kwargs)
+        except httpx.TimeoutException:
+            check_budget()
+            raise
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = await self._send(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    async def list_assistants(
+        self,
+        limit: int = 10,
+        page_token: Optional[str] = None,
+        created_before: Optional[str] = None,
+        updated_since: Optional[str] = None,
+        created_at_le: Optional[str] = None
+    ):
         params = {"limit": limit}
         if page_token:
             params["pageToken"] = page_token
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/assistant",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
-    
+        if created_before:
+            params["createdAtLt"] = created_before
+        if created_at_le:
+            params["createdAtLe"] = created_at_le
+        if updated_since:
+            params["updatedAtGe"] = updated_since
+        return await self._request("GET", "/assistant", params=params)
+
     async def get_assistant(self, assistant_id):
         """Get a specific assistant by ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/assistant/{assistant_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-    
+        return await self._request("GET", f"/assistant/{assistant_id}")
+
     async def update_assistant(self, assistant_id, data):
         """Update an assistant"""
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/assistant/{assistant_id}",
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
-    
-    async def list_calls(self, assistant_id=None, limit=100, page=None):
+        return await self._request("PUT", f"/assistant/{assistant_id}", json=data)
+
+    async def patch_assistant(self, assistant_id, data):
+        """Partially update an assistant; only the fields in `data` are changed"""
+        return await self._request("PATCH", f"/assistant/{assistant_id}", json=data)
+
+    async def list_calls(self, assistant_id=None, limit=100, page=None, created_before: Optional[str] = None, created_at_le: Optional[str] = None):
         """List all calls with optional filtering"""
         params = {"limit": limit}
         if assistant_id:
             params["assistantId"] = assistant_id
         if page:
             params["page"] = page
-            
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/call",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
-    
+        if created_before:
+            params["createdAtLt"] = created_before
+        if created_at_le:
+            params["createdAtLe"] = created_at_le
+        return await self._request("GET", "/call", params=params)
+
     async def get_call(self, call_id):
         """Get a specific call by ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/call/{call_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-    
+        return await self._request("GET", f"/call/{call_id}")
+
     async def get_analytics(self, assistant_id: str):
-        url = "https://api.vapi.ai/analytics"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        params = {"assistantId": assistant_id}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            print("Vapi analytics response:", response.status_code, response.text)
-            response.raise_for_status()
-            return response.json()
-        
+        response = await self._send("GET", "/analytics", params={"assistantId": assistant_id})
+        logger.debug("Vapi analytics response: %s %s", response.status_code, truncate_payload(response.text))
+        response.raise_for_status()
+        return response.json()
+
     async def delete_assistant(self, assistant_id: str) -> Dict[str, Any]:
         """Delete a Vapi assistant by ID"""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.base_url}/assistant/{assistant_id}"
-            headers = self.get_headers()
-            response = await client.delete(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._request("DELETE", f"/assistant/{assistant_id}")
 
     async def delete_call(self, call_id: str) -> Dict[str, Any]:
         """Delete/archive a call record by ID"""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.base_url}/call/{call_id}"
-            headers = self.get_headers()
-            response = await client.delete(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
\ No newline at end of file
+        return await self._request("DELETE", f"/call/{call_id}")
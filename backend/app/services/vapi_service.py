@@ -1,14 +1,14 @@
 import httpx
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from app.config import settings, logger
 from app.models import CreateAgentRequest # For type hinting if needed
+from app.services.vapi_client import get_http_client, upstream_slot
+from app.services.deadline import check_budget, timeout_for
+from app.services.tenant_service import current_tenant
 
-# Asynchronous HTTP client, initialized once and reused
-# Consider managing the client lifecycle with FastAPI lifespan events for production
-# For simplicity here, a global client is used.
-# async_client = httpx.AsyncClient(timeout=20.0)
+# Requests use the current tenant's Vapi key and pooled client from vapi_client (closed on app shutdown)
 
 async def create_vapi_assistant(
     persona_name: str, # This will be used in Vapi's assistant name, e.g., "DateMate Scenario - Sofia"
@@ -22,13 +22,17 @@ async def create_vapi_assistant(
     app_setting: str,
     # ---- End of new parameters ----
     first_message: Optional[str] = None,
-    difficulty: Optional[str] = "unknown"
+    difficulty: Optional[str] = "unknown",
+    scenario_description: Optional[str] = None,
+    interests: Optional[List[str]] = None,
+    prompt_template: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Calls the Vapi API to create a new assistant.
     """
-    if not settings.VAPI_API_KEY:
-        logger.error("VAPI_API_KEY not available for Vapi service.")
+    tenant = current_tenant()
+    if not tenant.vapi_api_key:
+        logger.error(f"VAPI_API_KEY not available for Vapi service (tenant '{tenant.id}').")
         raise ValueError("VAPI_API_KEY is not configured.")
 
     # Construct metadata for application-specific details
@@ -37,7 +41,10 @@ async def create_vapi_assistant(
         "app_age": age,
         "app_personality": app_personality,
         "app_setting": app_setting,
-        "app_difficulty": difficulty # Also store difficulty here for consistency
+        "app_difficulty": difficulty, # Also store difficulty here for consistency
+        "app_scenario_description": scenario_description, # Needed to regenerate the prompt on updates
+        "app_interests": interests,
+        "app_prompt_template": prompt_template # Updates re-render with the latest version of this template
     }
 
     vapi_assistant_payload = {
@@ -64,27 +71,29 @@ async def create_vapi_assistant(
 
 
     headers = {
-        "Authorization": f"Bearer {settings.VAPI_API_KEY}",
+        "Authorization": f"Bearer {tenant.vapi_api_key}",
         "Content-Type": "application/json"
     }
     api_endpoint = f"{settings.VAPI_API_URL}/assistant"
 
-    async with httpx.AsyncClient(timeout=20.0) as client: # Client per request
-        try:
-            logger.info(f"Creating Vapi assistant for {persona_name} via Vapi API...")
-            logger.debug(f"Vapi Assistant Creation Payload: {json.dumps(vapi_assistant_payload, indent=2)}")
-            response = await client.post(api_endpoint, json=vapi_assistant_payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except httpx.TimeoutException as e:
-            logger.error(f"Timeout error calling Vapi API to create assistant: {api_endpoint} - {e}")
-            raise
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Vapi API Error creating assistant: {e.response.status_code} - {e.response.text}")
-            raise
-        except Exception as e:
-            logger.exception(f"Unexpected error in create_vapi_assistant for {persona_name}")
-            raise
+    client = get_http_client(tenant) # Tenant's pooled connections
+    try:
+        logger.info(f"Creating Vapi assistant for {persona_name} via Vapi API...")
+        logger.debug(f"Vapi Assistant Creation Payload: {json.dumps(vapi_assistant_payload, indent=2)}")
+        async with upstream_slot(tenant):
+            response = await client.post(api_endpoint, json=vapi_assistant_payload, headers=headers, timeout=timeout_for(settings.VAPI_TIMEOUT_SECONDS))
+        response.raise_for_status()
+        return response.json()
+    except httpx.TimeoutException as e:
+        logger.error(f"Timeout error calling Vapi API to create assistant: {api_endpoint} - {e}")
+        check_budget()
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Vapi API Error creating assistant: {e.response.status_code} - {e.response.text}")
+        raise
+    except Exception as e:
+        logger.exception(f"Unexpected error in create_vapi_assistant for {persona_name}")
+        raise
 
 async def start_vapi_phone_call(
     phone_number_to_call: str,
@@ -95,8 +104,9 @@ async def start_vapi_phone_call(
     """
     Calls the Vapi API to start an outbound phone call.
     """
-    if not settings.VAPI_API_KEY:
-        logger.error("VAPI_API_KEY not available for Vapi service.")
+    tenant = current_tenant()
+    if not tenant.vapi_api_key:
+        logger.error(f"VAPI_API_KEY not available for Vapi service (tenant '{tenant.id}').")
         raise ValueError("VAPI_API_KEY is not configured.")
     if not phone_number_id:
         logger.error("VAPI_PHONE_NUMBER_ID not available for starting call.")
@@ -112,24 +122,26 @@ async def start_vapi_phone_call(
         vapi_call_payload["assistantOverrides"] = {"variableValues": variable_values}
 
     headers = {
-        "Authorization": f"Bearer {settings.VAPI_API_KEY}",
+        "Authorization": f"Bearer {tenant.vapi_api_key}",
         "Content-Type": "application/json"
     }
     api_endpoint = f"{settings.VAPI_API_URL}/call/phone"
 
-    async with httpx.AsyncClient(timeout=20.0) as client: # Client per request
-        try:
-            logger.info(f"Starting Vapi call to {phone_number_to_call} using Assistant {assistant_id}")
-            logger.debug(f"Vapi Call Payload: {json.dumps(vapi_call_payload)}")
-            response = await client.post(api_endpoint, json=vapi_call_payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except httpx.TimeoutException as e:
-            logger.error(f"Timeout error calling Vapi API to start call: {api_endpoint} - {e}")
-            raise
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Vapi API Error starting call: {e.response.status_code} - {e.response.text}")
-            raise
-        except Exception as e:
-            logger.exception("Unexpected error in start_vapi_phone_call")
-            raise
\ No newline at end of file
+    client = get_http_client(tenant) # Tenant's pooled connections
+    try:
+        logger.info(f"Starting Vapi call to {phone_number_to_call} using Assistant {assistant_id}")
+        logger.debug(f"Vapi Call Payload: {json.dumps(vapi_call_payload)}")
+        async with upstream_slot(tenant):
+            response = await client.post(api_endpoint, json=vapi_call_payload, headers=headers, timeout=timeout_for(settings.VAPI_TIMEOUT_SECONDS))
+        response.raise_for_status()
+        return response.json()
+    except httpx.TimeoutException as e:
+        logger.error(f"Timeout error calling Vapi API to start call: {api_endpoint} - {e}")
+        check_budget()
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Vapi API Error starting call: {e.response.status_code} - {e.response.text}")
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error in start_vapi_phone_call")
+        raise
\ No newline at end of file
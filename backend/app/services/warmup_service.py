@@ -0,0 +1,150 @@
+# app/services/warmup_service.py
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.config import settings, logger
+from app.dependencies.security import compute_signature
+from app.models import ToolResultOutput
+from app.services import metrics
+from app.services.assistant_cache import load_assistant_catalog
+from app.services.assistant_mirror import mirror_for
+from app.services.tenant_service import Tenant, all_tenants, current_tenant, use_tenant, reset_tenant
+from app.services.vapi_client import VapiClient, get_http_client
+
+# Readiness of this instance. Without warm-up it is ready as soon as startup finishes.
+_state: Dict[str, Any] = {
+    "status": "pending", # pending -> running -> ready
+    "started_at": None,
+    "finished_at": None,
+    "duration_ms": None,
+    "timed_out": False,
+    "steps": {},
+}
+_task: Optional[asyncio.Task] = None
+
+
+def is_ready() -> bool:
+    return _state["status"] == "ready"
+
+
+def warmup_status() -> Dict[str, Any]:
+    return {"ready": is_ready(), **_state, "steps": dict(_state["steps"])}
+
+
+async def _step(name: str, run: Callable[[], Awaitable[None]]) -> None:
+    """Runs one warm-up step. A failed step is recorded but never blocks readiness."""
+    started = time.perf_counter()
+    try:
+        await run()
+        _state["steps"][name] = {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        metrics.incr("warmup.step_failed")
+        logger.warning(f"Warm-up step '{name}' failed: {type(e).__name__}: {e}")
+        _state["steps"][name] = {
+            "ok": False,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": str(e) or type(e).__name__,
+        }
+
+
+async def _open_connections(tenant: Tenant) -> None:
+    # Concurrent requests make the pool open one connection each (TCP + TLS); they stay
+    # in the pool afterwards. Any HTTP response will do, so no key or quota is involved.
+    count = min(settings.WARMUP_CONNECTIONS, settings.VAPI_MAX_KEEPALIVE_CONNECTIONS)
+    client = get_http_client(tenant)
+    await asyncio.gather(*(client.head(settings.VAPI_API_URL) for _ in range(count)))
+
+
+async def _prefetch_default_assistant(vapi_client: VapiClient) -> None:
+    assistant = await vapi_client.get_assistant(vapi_client.tenant.default_assistant_id)
+    mirror_for(vapi_client.tenant).apply(assistant)
+
+
+async def _warm_tenant(tenant: Tenant) -> None:
+    token = use_tenant(tenant)
+    try:
+        await _step(f"{tenant.id}.connections", lambda: _open_connections(tenant))
+        vapi_client = VapiClient(tenant)
+        steps = [_step(f"{tenant.id}.catalog", lambda: load_assistant_catalog(vapi_client))]
+        if tenant.default_assistant_id:
+            steps.append(_step(f"{tenant.id}.default_assistant", lambda: _prefetch_default_assistant(vapi_client)))
+        await asyncio.gather(*steps)
+    finally:
+        reset_tenant(token)
+
+
+async def _exercise_routes(app) -> None:
+    """
+    Sends one signed webhook and a few reads through the app in-process, so routing,
+    middleware, signature checks, pydantic validation and response serialization
+    have all run once before real traffic arrives.
+    """
+    tenant = current_tenant()
+    body = json.dumps({"message": {"type": "warmup"}}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    secret = tenant.webhook_secret or settings.VAPI_WEBHOOK_SECRET
+    if secret:
+        timestamp = str(int(time.time()))
+        headers["x-vapi-timestamp"] = timestamp
+        headers["x-vapi-signature"] = compute_signature(secret, body, timestamp)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://warmup") as client:
+        response = await client.post("/api/vapi-webhook", content=body, headers=headers)
+        response.raise_for_status()
+        if tenant.vapi_api_key:
+            response = await client.get("/api/assistants/", params={"limit": 1})
+            response.raise_for_status()
+            if tenant.default_assistant_id:
+                response = await client.get(f"/api/assistants/{tenant.default_assistant_id}")
+                response.raise_for_status()
+    ToolResultOutput(tool_call_id="warmup", result={"success": True}).model_dump_json()
+
+
+async def _warm(app) -> None:
+    # Only as many tenants as keep an open pool; more would just evict each other
+    tenants = [tenant for tenant in all_tenants() if tenant.vapi_api_key][:settings.TENANT_MAX_CLIENTS]
+    await asyncio.gather(*(_warm_tenant(tenant) for tenant in tenants))
+    await _step("routes", lambda: _exercise_routes(app))
+
+
+async def run_warmup(app) -> None:
+    _state["status"] = "running"
+    _state["started_at"] = time.time()
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_warm(app), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        _state["timed_out"] = True
+        metrics.incr("warmup.timed_out")
+        logger.warning(f"Warm-up did not finish within {settings.WARMUP_TIMEOUT_SECONDS}s; reporting ready anyway")
+    finally:
+        _state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _state["finished_at"] = time.time()
+        _state["status"] = "ready"
+    failed = [name for name, step in _state["steps"].items() if not step["ok"]]
+    logger.info(f"Warm-up finished in {_state['duration_ms']}ms" + (f"; failed steps: {', '.join(failed)}" if failed else ""))
+
+
+def start_warmup(app) -> None:
+    """Starts warm-up in the background; /api/ready reports 503 until it has finished."""
+    global _task
+    if not settings.WARMUP_ENABLED:
+        _state["status"] = "ready"
+        return
+    _task = asyncio.get_running_loop().create_task(run_warmup(app))
+
+
+async def stop_warmup() -> None:
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+
+
+metrics.register_gauge("warmup", lambda: {"ready": is_ready(), "duration_ms": _state["duration_ms"], "timed_out": _state["timed_out"]})
@@ -1,11 +1,14 @@
 import asyncio
 import hashlib
+import time
 from typing import Dict
 from app.models import ToolResultOutput # Use the renamed model
 from app.config import logger # Use the configured logger
+from app.services.logging_service import truncate_payload
+from app.tool_handlers.registry import ExecutionMode, tool_handler
 
 async def handle_check_availability(parameters: dict, tool_call_id: str) -> ToolResultOutput:
-    logger.info(f"Executing tool 'check_availability' (ID: {tool_call_id}) with parameters: {parameters}")
+    logger.info("Executing tool 'check_availability' (ID: %s) with parameters: %s", tool_call_id, truncate_payload(parameters))
     item_id = parameters.get('itemId')
     requested_date = parameters.get('date')
 
@@ -27,7 +30,7 @@ async def handle_check_availability(parameters: dict, tool_call_id: str) -> Tool
     )
 
 async def handle_book_appointment(parameters: dict, tool_call_id: str) -> ToolResultOutput:
-    logger.info(f"Executing tool 'book_appointment' (ID: {tool_call_id}) with parameters: {parameters}")
+    logger.info("Executing tool 'book_appointment' (ID: %s) with parameters: %s", tool_call_id, truncate_payload(parameters))
     name = parameters.get('name')
     phone = parameters.get('phone')
     slot_datetime_iso = parameters.get('slot_datetime_iso')
@@ -44,10 +47,35 @@ async def handle_book_appointment(parameters: dict, tool_call_id: str) -> ToolRe
         result={"success": success, "booking_id": booking_id, "name": name, "slot_booked": slot_datetime_iso}
     )
 
-# Mapping of tool names to their handler functions
+def handle_lookup_venue(parameters: dict, tool_call_id: str) -> ToolResultOutput:
+    # Synchronous handler doing blocking I/O; runs on the shared thread pool
+    logger.info("Executing tool 'lookup_venue' (ID: %s) with parameters: %s", tool_call_id, truncate_payload(parameters))
+    venue = parameters.get('venue')
+    if not venue:
+        return ToolResultOutput(tool_call_id=tool_call_id, result={"success": False, "error": "Missing venue parameter."})
+
+    time.sleep(0.1) # Simulate a blocking driver call
+    return ToolResultOutput(tool_call_id=tool_call_id, result={"success": True, "venue": venue, "open_now": True})
+
+def handle_fingerprint_document(parameters: dict, tool_call_id: str) -> ToolResultOutput:
+    # CPU-bound handler; runs in the process pool, so it must stay a picklable
+    # top-level function and should not rely on the parent's logging setup
+    document = parameters.get('document')
+    if not document:
+        return ToolResultOutput(tool_call_id=tool_call_id, result={"success": False, "error": "Missing document parameter."})
+
+    digest = hashlib.sha256(document.encode()).digest()
+    for _ in range(10000): # Key stretching, deliberately CPU heavy
+        digest = hashlib.sha256(digest).digest()
+    return ToolResultOutput(tool_call_id=tool_call_id, result={"success": True, "fingerprint": digest.hex()})
+
+# Mapping of tool names to their handlers and how each one runs
+# (ASYNC on the event loop, THREAD for blocking I/O, PROCESS for CPU work).
 # This can be imported and used in the webhook router
 TOOL_HANDLERS_REGISTRY = {
-    "check_availability": handle_check_availability,
-    "book_appointment": handle_book_appointment,
+    "check_availability": tool_handler(handle_check_availability),
+    "book_appointment": tool_handler(handle_book_appointment),
+    "lookup_venue": tool_handler(handle_lookup_venue, ExecutionMode.THREAD),
+    "fingerprint_document": tool_handler(handle_fingerprint_document, ExecutionMode.PROCESS),
     # Add more tool handlers here
 }
\ No newline at end of file
@@ -0,0 +1,47 @@
+# app/tool_handlers/registry.py
+import inspect
+from enum import Enum
+from typing import Any, Callable, NamedTuple, Union
+
+from app.config import settings
+from app.models import ToolResultOutput
+from app.services.executor_service import get_executor
+from app.services.deadline import run_within_deadline
+
+
+class ExecutionMode(str, Enum):
+    ASYNC = "async"      # Coroutine run directly on the event loop (non-blocking I/O only)
+    THREAD = "thread"    # Sync function run on the shared thread pool (blocking I/O)
+    PROCESS = "process"  # Sync, picklable top-level function run on the process pool (CPU work)
+
+
+class ToolHandler(NamedTuple):
+    handler: Callable[..., Any]
+    mode: ExecutionMode = ExecutionMode.ASYNC
+
+
+def tool_handler(handler: Callable[..., Any], mode: ExecutionMode = ExecutionMode.ASYNC) -> ToolHandler:
+    """Declares how a handler runs. Sync handlers must use THREAD or PROCESS mode."""
+    is_async = inspect.iscoroutinefunction(handler)
+    if mode == ExecutionMode.ASYNC and not is_async:
+        raise ValueError(f"Handler '{handler.__name__}' is synchronous; register it with THREAD or PROCESS mode.")
+    if mode != ExecutionMode.ASYNC and is_async:
+        raise ValueError(f"Handler '{handler.__name__}' is a coroutine; register it with ASYNC mode.")
+    return ToolHandler(handler, mode)
+
+
+async def dispatch_tool_call(
+    entry: Union[ToolHandler, Callable[..., Any]],
+    parameters: dict,
+    tool_call_id: str,
+) -> ToolResultOutput:
+    """Runs a registry entry according to its execution mode."""
+    if not isinstance(entry, ToolHandler): # Bare coroutine functions are treated as ASYNC
+        entry = ToolHandler(entry)
+
+    if entry.mode == ExecutionMode.ASYNC:
+        call = entry.handler(parameters, tool_call_id)
+    else:
+        call = get_executor(entry.mode.value).run(entry.handler, parameters, tool_call_id)
+    # Bounded by the webhook's remaining budget so Vapi gets an answer inside its window
+    return await run_within_deadline(call, settings.TOOL_HANDLER_TIMEOUT_SECONDS, "tool_handler")
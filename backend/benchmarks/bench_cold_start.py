@@ -0,0 +1,119 @@
+"""
+Cold start: wall time from spawning a fresh interpreter to the first webhook
+response (import of app.main, startup event, one signed status-update webhook).
+Exits with status 1 when the median exceeds the budget, so it can gate CI.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cold_start [--runs 7] [--budget-ms 1000] [--profile]
+
+--profile prints the slowest imports of app.main (python -X importtime).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD_ENV = {
+    "VAPI_API_KEY": "bench-key",
+    "ASSISTANT_MIRROR_SYNC_ENABLED": "false",
+    "WARMUP_ENABLED": "false",
+    "DOTENV_SEARCH": "false",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def child() -> None:
+    """Runs in the spawned interpreter; prints its timings as JSON."""
+    started = time.perf_counter()
+    import asyncio
+    import httpx
+    from app.config import settings
+    from app.dependencies.security import compute_signature
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def first_response():
+        body = json.dumps({"message": {"type": "status-update", "status": "in-progress", "call": {"id": "bench-call"}}}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if settings.VAPI_WEBHOOK_SECRET:
+            timestamp = str(int(time.time()))
+            headers["x-vapi-timestamp"] = timestamp
+            headers["x-vapi-signature"] = compute_signature(settings.VAPI_WEBHOOK_SECRET, body, timestamp)
+        async with app.router.lifespan_context(app):
+            startup_done = time.perf_counter()
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                response = await client.post("/api/vapi-webhook", content=body, headers=headers)
+            response.raise_for_status()
+            responded_at = time.time()
+            responded = time.perf_counter()
+        return startup_done, responded, responded_at
+
+    startup_done, responded, responded_at = asyncio.run(first_response())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (startup_done - imported) * 1000,
+        "request_ms": (responded - startup_done) * 1000,
+        "responded_at": responded_at,
+    }))
+
+
+def _spawn() -> dict:
+    env = {**os.environ, **CHILD_ENV}
+    spawned_at = time.time()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_cold_start", "--child"],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["total_ms"] = (result.pop("responded_at") - spawned_at) * 1000
+    return result
+
+
+def profile(top: int = 15) -> None:
+    env = {**os.environ, **CHILD_ENV}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+    print("Slowest imports under app.main (cumulative, self, module):")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms {self_us / 1000:8.1f} ms  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "1000")))
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return 0
+
+    if args.profile:
+        profile()
+    results = [_spawn() for _ in range(args.runs)]
+    for key in ("import_ms", "startup_ms", "request_ms", "total_ms"):
+        values = [result[key] for result in results]
+        print(f"{key:>12}: median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms  max {max(values):7.1f} ms")
+
+    median_total = statistics.median(result["total_ms"] for result in results)
+    if median_total > args.budget_ms:
+        print(f"FAIL: time to first response {median_total:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        return 1
+    print(f"OK: time to first response {median_total:.1f} ms within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
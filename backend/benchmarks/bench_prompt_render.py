@@ -0,0 +1,95 @@
+"""
+Per-request cost of building a persona prompt: compiled template renders
+(cache misses), render-cache hits, and the former hand-written function.
+
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_render [number_of_renders]
+"""
+import random
+import sys
+import time
+
+from app.services import prompt_service
+
+NAMES = ["Sofia", "Liam", "Mia", "Noah", "Ava", "Lucas", "Emma", "Mateo"]
+PERSONALITIES = ["Witty", "Shy", "Adventurous", "Thoughtful", "Sarcastic"]
+SETTINGS = ["cozy café", "rooftop bar", "art gallery", "park picnic"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+INTERESTS = ["hiking", "jazz", "board games", "cooking", "photography", "travel"]
+
+
+def personas(count: int, rng: random.Random) -> list:
+    return [
+        dict(
+            name=rng.choice(NAMES),
+            age=rng.randint(21, 45),
+            personality=rng.choice(PERSONALITIES),
+            setting=rng.choice(SETTINGS),
+            difficulty=rng.choice(DIFFICULTIES),
+            interests=rng.sample(INTERESTS, rng.randint(0, 3)) or None,
+            scenario_description=f"Scenario {i}" if rng.random() < 0.5 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_prompt(name, age, personality, setting, difficulty, interests=None, scenario_description=None) -> str:
+    """The hard-coded function templates replaced, for comparison."""
+    lines = [
+        f"You are impersonating {name}, a {age}-year-old who identifies as {personality.lower()}.",
+        f"The current setting for your conversation is a first date at a {setting}.",
+        "You are designed to help users practice their dating conversation skills.",
+        "Your primary goal is to engage in a natural, flowing conversation, making the user feel comfortable and confident.",
+        "Maintain a friendly, warm, and engaging tone throughout the conversation.",
+    ]
+    if difficulty == "easy":
+        lines.append("You are very receptive, ask leading questions, and try to keep the conversation going smoothly. Be very forgiving of awkward pauses from the user.")
+    elif difficulty == "medium":
+        lines.append("You expect a bit more effort from the user to carry the conversation. You can be a little playful or challenging at times, but still aim to be supportive.")
+    elif difficulty == "hard":
+        lines.append("You are more discerning and might test the user's conversational skills. You might be a bit reserved initially or bring up more complex topics. The user needs to impress you.")
+    else:
+        lines.append("You are very receptive and try to keep the conversation going smoothly.")
+    if interests:
+        lines.append(f"You particularly enjoy talking about {', '.join(interests[:-1]) + (' and ' + interests[-1] if len(interests) > 1 else interests[0])}.")
+    else:
+        lines.append("You have a keen interest in travel, movies, and good food.")
+    if scenario_description:
+        lines.append(f"Additional context for this scenario: {scenario_description}")
+    lines.extend([
+        "Do not break character under any circumstances.",
+        "Never reveal that you are an AI or a language model.",
+        f"Respond naturally as {name} would, drawing upon the described personality and setting.",
+    ])
+    return " ".join(lines)
+
+
+def bench(label: str, render, inputs: list) -> None:
+    started = time.perf_counter()
+    for persona in inputs:
+        render(**persona)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>22}: {elapsed / len(inputs) * 1e6:7.2f} us/render, {len(inputs) / elapsed:12,.0f} renders/s")
+
+
+def main(count: int) -> None:
+    rng = random.Random(7)
+    unique = personas(count, rng)
+    template = prompt_service.resolve_template()
+
+    # Every persona distinct from the last run: cache misses, i.e. actual template renders
+    prompt_service._render_cache.clear()
+    bench("compiled, uncached", lambda **p: template.render(p), unique)
+    bench("legacy function", legacy_prompt, unique)
+    bench("generate, cache miss", prompt_service.generate_datemate_prompt, unique[:prompt_service.settings.PROMPT_RENDER_CACHE_SIZE])
+    # Repeated personas (presets, retries): served from the LRU
+    repeated = [rng.choice(unique[:200]) for _ in range(count)]
+    bench("generate, cache hit", prompt_service.generate_datemate_prompt, repeated)
+    print(prompt_service._render_cache.stats())
+
+    sample = unique[0]
+    assert prompt_service.generate_datemate_prompt(**sample) == legacy_prompt(**sample)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
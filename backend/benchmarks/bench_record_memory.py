@@ -0,0 +1,72 @@
+"""
+Memory held by the local assistant catalog: raw response dicts, AssistantSummary
+models (what the index used to hold), compact AssistantRecords (slots, interned
+attributes) and the mirror's zlib-compressed raw objects.
+
+Run from the backend directory:
+    python -m benchmarks.bench_record_memory [number_of_assistants]
+"""
+import gc
+import json
+import random
+import sys
+import tracemalloc
+
+from app.services.assistant_mirror import AssistantMirror
+from app.services.assistant_parsing import process_assistant_item
+from app.services.records import AssistantRecord
+
+NAMES = ["Sofia", "Liam", "Maya", "Noah", "Ava", "Ethan", "Zoe", "Lucas"]
+PERSONALITIES = ["friendly", "shy", "witty", "curious", "sarcastic"]
+SETTINGS = ["coffee shop", "bookstore", "park bench", "rooftop bar"]
+VOICES = ["sarah", "josh", "rachel", "adam"]
+
+
+def synthetic_assistant_json(index: int, rng: random.Random) -> str:
+    name = rng.choice(NAMES)
+    difficulty = rng.choice(["easy", "medium", "hard"])
+    personality = rng.choice(PERSONALITIES)
+    setting = rng.choice(SETTINGS)
+    prompt = (
+        f"You are {name}, a {rng.randint(21, 45)} year-old who is {personality} and easygoing. "
+        f"You are meeting the user at a {setting}. The difficulty is {difficulty}. "
+        + "Keep replies short, ask follow-up questions and react naturally to what the user says. " * 8
+    )
+    return json.dumps({
+        "id": f"asst-{index:08d}-5c1e-4b8e-{rng.getrandbits(48):012x}",
+        "name": f"DateMate Scenario - {name} ({difficulty})",
+        "model": {"provider": "openai", "model": "gpt-4o", "messages": [{"role": "system", "content": prompt}]},
+        "voice": {"provider": "11labs", "voiceId": rng.choice(VOICES)},
+        "firstMessage": f"Hi, I'm {name}!",
+        "metadata": {"app_persona_name": name, "app_personality": personality, "app_setting": setting, "app_difficulty": difficulty},
+        "createdAt": "2024-05-01T18:30:00.000Z",
+        "updatedAt": "2024-05-02T09:12:00.000Z",
+    })
+
+
+def measure(label: str, build, payloads: list) -> None:
+    gc.collect()
+    tracemalloc.start()
+    rows = [build(payload) for payload in payloads]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_100k = current * 100_000 / len(rows)
+    print(f"{label:>16}: {current / 1e6:8.1f} MB total, {per_100k / 1e6:8.1f} MB per 100k assistants, {current / len(rows):7.0f} B/assistant")
+    del rows
+
+
+def main(count: int) -> None:
+    rng = random.Random(42)
+    payloads = [synthetic_assistant_json(i, rng) for i in range(count)]
+    measure("raw dicts", json.loads, payloads)
+    measure("AssistantSummary", lambda p: process_assistant_item(json.loads(p)), payloads)
+    measure("AssistantRecord", lambda p: AssistantRecord.from_vapi(json.loads(p)), payloads)
+    measure("mirror (zlib)", lambda p: AssistantMirror._pack(json.loads(p)), payloads)
+
+    sample = json.loads(payloads[0])
+    assert AssistantRecord.from_vapi(sample).to_summary() == process_assistant_item(sample)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,73 @@
+"""
+Cost and size of encoding a list-calls page: JSON serialization, gzip at each
+level (brotli too when installed), and the cached path that skips recompression.
+
+Run from the backend directory:
+    python -m benchmarks.bench_response_encoding [calls_per_page]
+"""
+import asyncio
+import gzip
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+
+from app.models import CallAnalytics, CallsList
+from app.services import response_encoding
+
+WORDS = "hi hello so what do you like to do on weekends I love hiking and jazz really that sounds fun".split()
+
+
+def page(count: int, rng: random.Random) -> CallsList:
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return CallsList(data=[
+        CallAnalytics(
+            call_id=f"call-{i}",
+            assistant_id="assistant-1",
+            start_time=started + timedelta(minutes=i),
+            end_time=started + timedelta(minutes=i, seconds=rng.randint(30, 600)),
+            duration=rng.randint(30, 600),
+            transcript="\n".join(f"{rng.choice(['AI', 'User'])}: {' '.join(rng.choices(WORDS, k=12))}" for _ in range(30)),
+            summary=" ".join(rng.choices(WORDS, k=40)),
+        )
+        for i in range(count)
+    ])
+
+
+def request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+def timed(label: str, fn, repeat: int = 50) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:>24}: {elapsed * 1000:7.2f} ms  {len(out):9,} bytes")
+
+
+def main(count: int) -> None:
+    content = page(count, random.Random(7))
+    body = response_encoding.serialize(content, response_encoding.JSON)
+    timed("serialize json", lambda: response_encoding.serialize(content, response_encoding.JSON))
+    for level in (1, 3, 5, 6, 9):
+        timed(f"gzip level {level}", lambda: gzip.compress(body, compresslevel=level, mtime=0))
+    brotli = response_encoding._brotli()
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            timed(f"brotli quality {quality}", lambda: brotli.compress(body, quality=quality))
+
+    async def encoded():
+        response = await response_encoding.encode_response(request("gzip, br"), content)
+        return response.body
+
+    response_encoding._compressed.clear()
+    timed("encode_response, cold", lambda: (response_encoding._compressed.clear(), asyncio.run(encoded()))[1], repeat=20)
+    timed("encode_response, cached", lambda: asyncio.run(encoded()), repeat=20)
+    print(response_encoding._compressed.stats())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,79 @@
+"""
+Throughput of the conversation-scoring pipeline on synthetic transcripts,
+inline (in yielding chunks) versus through the scoring process pool, and the
+longest the event loop went without running other tasks during each.
+
+Run from the backend directory:
+    python -m benchmarks.bench_scoring [number_of_calls]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from app.services import scoring_service
+from app.services.executor_service import shutdown_executors
+
+USER_LINES = [
+    "Um, so what do you like to do on weekends?",
+    "I mean, I'm kind of into hiking, like, a lot.",
+    "That sounds great, where did you grow up?",
+    "Basically I just moved here for work.",
+    "Have you been to the new place downtown?",
+]
+AI_LINES = [
+    "I love trying new restaurants and going to live music.",
+    "Oh nice! I grew up by the coast, so I miss the ocean.",
+    "Not yet, is it any good?",
+    "Work keeps me busy, but I make time for friends.",
+]
+
+
+def synthetic_call(index: int, rng: random.Random) -> dict:
+    messages = []
+    clock = 0.0
+    for turn in range(rng.randint(10, 40)):
+        role = "bot" if turn % 2 == 0 else "user"
+        text = rng.choice(AI_LINES if role == "bot" else USER_LINES)
+        duration = len(text) * 60 # ms
+        messages.append({"role": role, "message": text, "secondsFromStart": clock, "duration": duration})
+        clock += duration / 1000 + rng.uniform(0.2, 3.0)
+    return {"id": f"call-{index}", "messages": messages} # Not final, so nothing is cached
+
+
+async def longest_stall(stop: asyncio.Event) -> float:
+    """Largest gap between ticks of a task that only sleeps, i.e. how long the loop was blocked."""
+    longest, last = 0.0, time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        longest, last = max(longest, now - last), now
+    return longest
+
+
+async def run(turns: list, score) -> tuple:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(longest_stall(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await score(turns)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+async def main(count: int) -> None:
+    rng = random.Random(42)
+    turns = [scoring_service.extract_turns(synthetic_call(i, rng)) for i in range(count)]
+    # Always measure the pool, even where the default leaves it off (single-core hosts)
+    scoring_service.settings.SCORING_PROCESS_WORKERS = max(1, scoring_service.settings.SCORING_PROCESS_WORKERS)
+    await scoring_service._score_in_pool(turns[:100]) # Warm up the pool processes
+
+    for label, score in (("inline", scoring_service._score_inline), ("process pool", scoring_service._score_in_pool)):
+        elapsed, stall = await run(turns, score)
+        print(f"{label:>12}: {count} calls in {elapsed:.3f}s -> {count / elapsed:,.0f} calls/s, longest loop stall {stall * 1000:.1f} ms")
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,57 @@
+"""
+Measures the per-request cost of webhook signature verification.
+
+Run from the backend directory:
+    python -m benchmarks.bench_webhook_signature
+"""
+import json
+import os
+import time
+import timeit
+
+os.environ.setdefault("VAPI_WEBHOOK_SECRET", "bench-secret")
+
+from app.dependencies import security  # noqa: E402
+
+ITERATIONS = 20000
+
+
+def _payload(size: int) -> bytes:
+    message = {"message": {"type": "tool_calls", "padding": "x" * size}}
+    return json.dumps(message).encode("utf-8")
+
+
+def bench_verify(body_size: int) -> float:
+    body = _payload(body_size)
+    secret = "bench-secret"
+    timestamps = [str(int(time.time()))] * ITERATIONS
+    signatures = [security.compute_signature(secret, body + str(i).encode(), timestamps[i]) for i in range(ITERATIONS)]
+    bodies = [body + str(i).encode() for i in range(ITERATIONS)]
+
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        security.verify_webhook_signature(bodies[i], signatures[i], timestamps[i], secret)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def bench_replay_rejection() -> float:
+    body = _payload(1024)
+    secret = "bench-secret"
+    timestamp = str(int(time.time()))
+    signature = security.compute_signature(secret, body, timestamp)
+    security.verify_webhook_signature(body, signature, timestamp, secret)
+
+    def rejected():
+        try:
+            security.verify_webhook_signature(body, signature, timestamp, secret)
+        except security.WebhookVerificationError:
+            pass
+
+    return timeit.timeit(rejected, number=ITERATIONS) / ITERATIONS
+
+
+if __name__ == "__main__":
+    for size in (1024, 16 * 1024, 128 * 1024):
+        security._seen_signatures.clear()
+        print(f"verify  body={size:>7} bytes: {bench_verify(size) * 1e6:8.2f} us/request")
+    print(f"replay rejection:             {bench_replay_rejection() * 1e6:8.2f} us/request")
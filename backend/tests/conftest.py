@@ -0,0 +1,17 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# Settings are read from the environment at import time, so configure before any app import
+os.environ.update({
+    "VAPI_API_KEY": "test-vapi-key",
+    "VAPI_WEBHOOK_SECRET": "test-webhook-secret",
+    "DATA_DIR": tempfile.mkdtemp(prefix="datemate-tests-"),
+    "ASSISTANT_MIRROR_SYNC_ENABLED": "false",
+    "WARMUP_ENABLED": "false",
+    "DOTENV_SEARCH": "false",
+    "TENANTS_FILE": "",
+    "LOG_LEVEL": "WARNING",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,66 @@
+# tests/fake_vapi.py
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.services.tenant_service import current_tenant
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def iso(seconds: float) -> str:
+    """Vapi-style timestamp with millisecond precision."""
+    return (EPOCH + timedelta(seconds=seconds)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def make_calls(count: int, per_timestamp: int = 1, assistant_id: str = "asst-1") -> List[Dict[str, Any]]:
+    """`count` calls, `per_timestamp` of them sharing each createdAt millisecond."""
+    return [
+        {"id": f"call-{i:05d}", "assistantId": assistant_id, "createdAt": iso(i // per_timestamp), "updatedAt": iso(i // per_timestamp)}
+        for i in range(count)
+    ]
+
+
+class FakeVapiClient:
+    """
+    In-memory stand-in for VapiClient's list endpoints. Like Vapi it sorts by createdAt only,
+    so the order of rows sharing a timestamp is arbitrary (shuffled on every request).
+    """
+
+    def __init__(self, calls: Optional[List[Dict[str, Any]]] = None, assistants: Optional[List[Dict[str, Any]]] = None, seed: int = 0):
+        self.tenant = current_tenant()
+        self.calls = list(calls or [])
+        self.assistants = list(assistants or [])
+        self.requests: List[Dict[str, Any]] = []
+        self._rng = random.Random(seed)
+
+    def _list(self, rows, limit, lt=None, le=None, order_key="createdAt", ge_key=None, ge=None):
+        rows = [r for r in rows if (lt is None or r["createdAt"] < lt) and (le is None or r["createdAt"] <= le)]
+        if ge is not None:
+            rows = [r for r in rows if r[ge_key] >= ge]
+        self._rng.shuffle(rows)
+        rows.sort(key=lambda r: r[order_key], reverse=True)
+        return rows[:limit]
+
+    async def list_calls(self, assistant_id=None, limit=100, page=None, created_before=None, created_at_le=None):
+        self.requests.append({"kind": "calls", "limit": limit, "lt": created_before, "le": created_at_le})
+        rows = [c for c in self.calls if not assistant_id or c["assistantId"] == assistant_id]
+        return self._list(rows, limit, lt=created_before, le=created_at_le)
+
+    async def list_assistants(self, limit=10, page_token=None, created_before=None, updated_since=None, created_at_le=None):
+        self.requests.append({"kind": "assistants", "limit": limit, "lt": created_before, "le": created_at_le, "updated_since": updated_since})
+        return self._list(self.assistants, limit, lt=created_before, le=created_at_le, ge_key="updatedAt", ge=updated_since)
+
+    async def delete_call(self, call_id: str):
+        self.calls = [c for c in self.calls if c["id"] != call_id]
+        return {}
+
+    async def delete_assistant(self, assistant_id: str):
+        before = len(self.assistants)
+        self.assistants = [a for a in self.assistants if a["id"] != assistant_id]
+        if len(self.assistants) == before:
+            request = httpx.Request("DELETE", f"https://api.vapi.ai/assistant/{assistant_id}")
+            raise httpx.HTTPStatusError("Not found", request=request, response=httpx.Response(404, request=request))
+        return {}
@@ -0,0 +1,31 @@
+# tests/test_agent_jobs.py
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.datemate_router import agent_jobs
+from app.services.job_service import Job
+from app.services.tenant_service import Tenant, get_tenant, register_tenant
+
+register_tenant(Tenant(id="acme", vapi_api_key="acme-vapi-key", api_keys=("acme-client-key",)))
+
+
+def _finished_job(tenant: Tenant) -> Job:
+    job = Job({"name": "Sofia"}, None, tenant)
+    job.status, job.result = "succeeded", {"assistant_id": "asst-acme", "name": "Sofia", "prompt_used": "..."}
+    agent_jobs._finished.set(job.id, job)
+    return job
+
+
+def test_job_is_visible_to_its_own_tenant():
+    job = _finished_job(get_tenant("acme"))
+    with TestClient(app) as client:
+        response = client.get(f"/api/create-agent/jobs/{job.id}", headers={"X-API-Key": "acme-client-key"})
+    assert response.status_code == 200
+    assert response.json()["result"]["assistant_id"] == "asst-acme"
+
+
+def test_job_of_another_tenant_is_not_found():
+    job = _finished_job(get_tenant("acme"))
+    with TestClient(app) as client:
+        response = client.get(f"/api/create-agent/jobs/{job.id}") # Default tenant
+    assert response.status_code == 404
@@ -0,0 +1,96 @@
+# tests/test_assistant_mirror.py
+import asyncio
+import os
+import tempfile
+
+from app.services import assistant_mirror
+from app.services.assistant_mirror import AssistantMirror
+from tests.fake_vapi import FakeVapiClient, iso
+
+
+def make_assistants(count: int, per_timestamp: int = 1, updated: float = 0):
+    return [
+        {"id": f"asst-{i:05d}", "name": f"Persona {i}", "createdAt": iso(i // per_timestamp), "updatedAt": iso(updated)}
+        for i in range(count)
+    ]
+
+
+def _mirror() -> AssistantMirror:
+    return AssistantMirror(os.path.join(tempfile.mkdtemp(), "mirror.json"))
+
+
+def test_full_sync_pages_through_the_whole_catalog(monkeypatch):
+    monkeypatch.setattr(assistant_mirror, "SYNC_PAGE_SIZE", 10)
+    vapi = FakeVapiClient(assistants=make_assistants(95, per_timestamp=4))
+    mirror = _mirror()
+    assert asyncio.run(mirror.sync(vapi, full=True)) == 95
+    assert len(mirror) == 95
+    assert mirror.cursor == iso(0)
+
+
+def test_delta_sync_drains_every_page_before_moving_the_cursor(monkeypatch):
+    monkeypatch.setattr(assistant_mirror, "SYNC_PAGE_SIZE", 10)
+    vapi = FakeVapiClient(assistants=make_assistants(5))
+    mirror = _mirror()
+    asyncio.run(mirror.sync(vapi, full=True))
+
+    # 30 edits whose updatedAt order is the reverse of Vapi's createdAt listing order:
+    # the first page carries the newest updatedAt, which must not skip the later pages
+    edited = make_assistants(30, updated=0)
+    for i, assistant in enumerate(edited):
+        assistant["updatedAt"] = iso(1000 - i)
+        assistant["name"] = f"Edited {i}"
+    vapi.assistants = edited
+
+    assert asyncio.run(mirror.sync(vapi)) == 30
+    assert len(mirror) == 30
+    assert all(mirror.get(a["id"])["name"] == a["name"] for a in edited)
+    assert mirror.cursor == iso(1000)
+    assert len([r for r in vapi.requests if r["updated_since"] == iso(0)]) > 1
+
+
+class WritesDuringSync(FakeVapiClient):
+    """Applies local writes to the mirror while its sync is still reading pages."""
+
+    def __init__(self, mirror: AssistantMirror, writes, **kwargs):
+        super().__init__(**kwargs)
+        self.mirror = mirror
+        self.writes = writes
+
+    async def list_assistants(self, **kwargs):
+        page = await super().list_assistants(**kwargs)
+        while self.writes:
+            self.writes.pop(0)(self.mirror)
+        return page
+
+
+def test_local_writes_during_a_full_sync_survive_the_swap(monkeypatch):
+    monkeypatch.setattr(assistant_mirror, "SYNC_PAGE_SIZE", 10)
+    assistants = make_assistants(25)
+    mirror = _mirror()
+    created = {"id": "asst-new", "name": "Created", "createdAt": iso(5000), "updatedAt": iso(5000)}
+    renamed = {**assistants[3], "name": "Renamed", "updatedAt": iso(5000)}
+    vapi = WritesDuringSync(mirror, [
+        lambda m: m.apply(created),
+        lambda m: m.apply(renamed),
+        lambda m: m.remove(assistants[7]["id"]),
+    ], assistants=assistants)
+
+    asyncio.run(mirror.sync(vapi, full=True))
+    assert mirror.get("asst-new")["name"] == "Created"
+    assert mirror.get(assistants[3]["id"])["name"] == "Renamed"
+    assert mirror.get(assistants[7]["id"]) is None
+    assert len(mirror) == 25
+
+
+def test_delta_sync_does_not_overwrite_newer_local_writes():
+    mirror = _mirror()
+    asyncio.run(mirror.sync(FakeVapiClient(assistants=make_assistants(3)), full=True))
+    stale = {**make_assistants(3)[1], "name": "Stale", "updatedAt": iso(10)}
+    fresh = {**stale, "name": "Fresh", "updatedAt": iso(20)}
+    vapi = WritesDuringSync(mirror, [lambda m: m.apply(fresh)], assistants=[stale])
+
+    asyncio.run(mirror.sync(vapi))
+    assert mirror.get(stale["id"])["name"] == "Fresh"
+    # Local writes are only tracked while a sync runs
+    assert mirror._local_writes is None
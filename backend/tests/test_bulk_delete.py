@@ -0,0 +1,63 @@
+# tests/test_bulk_delete.py
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.routers import call_router
+from app.services.pagination import iter_newest_first
+from tests.fake_vapi import FakeVapiClient, iso, make_calls
+
+
+def _collect(vapi: FakeVapiClient, page_size: int):
+    async def run():
+        rows = []
+        async for page in iter_newest_first(lambda limit, le: vapi.list_calls(limit=limit, created_at_le=le), page_size):
+            rows.extend(page)
+        return rows
+    return asyncio.run(run())
+
+
+def test_iter_newest_first_reads_past_the_first_page():
+    vapi = FakeVapiClient(make_calls(2500))
+    rows = _collect(vapi, 1000)
+    assert len(rows) == 2500
+    assert len({row["id"] for row in rows}) == 2500
+
+
+def test_iter_newest_first_keeps_ties_across_page_boundaries():
+    # Seven calls per millisecond: every page boundary cuts through a timestamp
+    vapi = FakeVapiClient(make_calls(700, per_timestamp=7), seed=3)
+    rows = _collect(vapi, 50)
+    assert sorted(row["id"] for row in rows) == sorted(call["id"] for call in vapi.calls)
+
+
+def test_iter_newest_first_handles_more_ties_than_a_page():
+    vapi = FakeVapiClient(make_calls(120, per_timestamp=40))
+    rows = _collect(vapi, 10)
+    assert len({row["id"] for row in rows}) == 120
+
+
+def test_bulk_delete_calls_matches_beyond_one_upstream_page():
+    vapi = FakeVapiClient(make_calls(2500))
+    app.dependency_overrides[call_router.get_vapi_client] = lambda: vapi
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/calls/bulk-delete", json={"created_before": iso(2000), "dry_run": True})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.json()["matched"] == 2000
+
+
+def test_bulk_delete_calls_rejects_filters_over_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_DELETE_MAX_MATCHES", 100)
+    vapi = FakeVapiClient(make_calls(300))
+    app.dependency_overrides[call_router.get_vapi_client] = lambda: vapi
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/calls/bulk-delete", json={"assistant_id": "asst-1", "dry_run": True})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+# tests/test_deadlines.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.services import metrics, vapi_service
+from app.services.deadline import DeadlineExceeded, reset_deadline, run_within_deadline, set_deadline
+from app.services.executor_service import BoundedExecutor
+
+
+def test_executor_slot_is_held_until_a_timed_out_job_finishes():
+    executor = BoundedExecutor("test", ThreadPoolExecutor(max_workers=1), max_workers=1, max_queue=0)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def job():
+        release.wait(5)
+        finished.set()
+
+    async def run():
+        token = set_deadline(0.05)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await run_within_deadline(executor.run(job), 10, "test")
+        finally:
+            reset_deadline(token)
+        # The worker is still busy, so its slot must still count against the bound
+        assert executor.in_flight == 1
+
+    try:
+        asyncio.run(run())
+        release.set()
+        assert finished.wait(5)
+        executor.executor.shutdown(wait=True)
+        assert executor.in_flight == 0
+        assert executor.completed == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_vapi_service_reports_budget_timeouts_as_deadline_exceeded(monkeypatch):
+    async def slow(request):
+        await asyncio.sleep(0.1)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(slow))
+    monkeypatch.setattr(vapi_service, "get_http_client", lambda tenant: client)
+
+    async def run():
+        token = set_deadline(0.05)
+        try:
+            await vapi_service.start_vapi_phone_call("+15555550100", "asst-1", "phone-1")
+        finally:
+            reset_deadline(token)
+            await client.aclose()
+
+    before = metrics.get_counter("deadline.exceeded.upstream")
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+    assert metrics.get_counter("deadline.exceeded.upstream") == before + 1
@@ -0,0 +1,33 @@
+# tests/test_events.py
+import asyncio
+
+from starlette.requests import Request
+
+from app.routers.events_router import stream_call_events
+from app.services.event_bus import call_event_bus
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/events/calls", "headers": []})
+
+
+def test_stream_that_never_starts_leaves_no_subscriber():
+    before = call_event_bus.stats()["subscribers"]
+    response = asyncio.run(stream_call_events(_request(), call_id="call-1"))
+    del response # Client gone before the first chunk: the generator never runs
+    assert call_event_bus.stats()["subscribers"] == before
+
+
+def test_stream_subscribes_while_running_and_unsubscribes_on_close():
+    before = call_event_bus.stats()["subscribers"]
+
+    async def run():
+        response = await stream_call_events(_request(), call_id="call-1")
+        stream = response.body_iterator
+        assert (await stream.__anext__()).startswith("retry:")
+        during = call_event_bus.stats()["subscribers"]
+        await stream.aclose()
+        return during
+
+    assert asyncio.run(run()) == before + 1
+    assert call_event_bus.stats()["subscribers"] == before
@@ -0,0 +1,47 @@
+# tests/test_export.py
+import asyncio
+import json
+
+import pytest
+
+from app.services import export_service
+from tests.fake_vapi import FakeVapiClient, iso, make_calls
+from tests.test_assistant_mirror import make_assistants
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _read(manifest):
+    tables = [pa.parquet.read_table(export_service._export_path(manifest["export_id"], name)) for name in manifest["files"]]
+    return pa.concat_tables(tables).to_pylist()
+
+
+def test_call_export_writes_the_upstream_fields():
+    calls = make_calls(30)
+    long_transcript = "AI: Hi there!\nUser: Hello, how are you doing today?\n" * 20
+    for call in calls:
+        call.update(startTime=call["createdAt"], endTime=iso(60), transcript=long_transcript,
+                    analysis={"summary": "Went well", "success": True, "structuredData": {"mood": "good", "score": 7}})
+    vapi = FakeVapiClient(calls)
+
+    manifest = export_service.create_manifest("calls", "parquet", None, None)
+    manifest = asyncio.run(export_service.run_export(manifest["export_id"], vapi))
+    rows = _read(manifest)
+    assert manifest["complete"] and manifest["rows"] == 30
+    assert manifest["json_bytes"] == len(json.dumps(calls))
+    assert {row["transcript"] for row in rows} == {long_transcript}
+    assert rows[0]["structured_data.mood"] == "good" and rows[0]["structured_data.score"] == "7"
+    assert rows[0]["end_time"].isoformat().startswith("2024-01-01T00:01:00")
+
+
+def test_assistant_export_measures_the_upstream_payload():
+    assistants = make_assistants(12)
+    vapi = FakeVapiClient(assistants=assistants)
+
+    manifest = export_service.create_manifest("assistants", "parquet", None, None)
+    manifest = asyncio.run(export_service.run_export(manifest["export_id"], vapi))
+    assert manifest["rows"] == 12
+    rows = _read(manifest)
+    assert sorted(row["id"] for row in rows) == sorted(a["id"] for a in assistants)
+    upstream = sorted(assistants, key=lambda a: (a["createdAt"], a["id"]))
+    assert manifest["json_bytes"] == len(json.dumps(upstream))
@@ -0,0 +1,41 @@
+# tests/test_export_cursor.py
+import asyncio
+
+from app.config import settings
+from app.services import export_service
+from tests.fake_vapi import FakeVapiClient, iso, make_calls
+
+
+def _batches(vapi: FakeVapiClient, cursor, stop_after=None):
+    async def run():
+        manifest = {"assistant_id": "asst-1", "cursor": cursor}
+        out = []
+        async for calls, next_cursor in export_service._call_batches(manifest, vapi):
+            out.append((calls, next_cursor))
+            if stop_after is not None and len(out) == stop_after:
+                break
+        return out
+    return asyncio.run(run())
+
+
+def test_call_batches_keep_calls_sharing_the_boundary_millisecond(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 10)
+    vapi = FakeVapiClient(make_calls(95, per_timestamp=6), seed=5)
+    ids = [call["id"] for calls, _ in _batches(vapi, None) for call in calls]
+    assert sorted(ids) == sorted(call["id"] for call in vapi.calls)
+
+
+def test_call_batches_resume_from_a_saved_cursor(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 10)
+    vapi = FakeVapiClient(make_calls(95, per_timestamp=6), seed=9)
+    first = _batches(vapi, None, stop_after=3)
+    resumed = _batches(vapi, first[-1][1])
+    ids = [call["id"] for calls, _ in first + resumed for call in calls]
+    assert len(ids) == len(set(ids)) == 95
+
+
+def test_call_batches_start_before_the_requested_bound(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 10)
+    vapi = FakeVapiClient(make_calls(60, per_timestamp=3))
+    ids = {call["id"] for calls, _ in _batches(vapi, iso(10)) for call in calls}
+    assert ids == {call["id"] for call in vapi.calls if call["createdAt"] < iso(10)}
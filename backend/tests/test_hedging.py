@@ -0,0 +1,60 @@
+# tests/test_hedging.py
+import asyncio
+
+from app.services.hedging import Hedger
+
+
+def _hedger() -> Hedger:
+    return Hedger(percentile=95, budget_ratio=1.0, min_delay=0.01, initial_delay=0.01)
+
+
+def _attempts(*outcomes):
+    """Attempt factory: the n-th attempt sleeps, then returns its status code."""
+    calls = []
+
+    async def attempt():
+        delay, status = outcomes[len(calls)]
+        calls.append(status)
+        await asyncio.sleep(delay)
+        return status
+
+    return attempt, calls
+
+
+def _is_failure(status: int) -> bool:
+    return status >= 500 or status == 429
+
+
+def test_fast_server_error_does_not_win_over_a_pending_attempt():
+    hedger = _hedger()
+    attempt, calls = _attempts((0.2, 200), (0.0, 503))
+    assert asyncio.run(hedger.run(attempt, is_failure=_is_failure)) == 200
+    assert calls == [200, 503]
+    assert hedger.hedge_wins == 0
+
+
+def test_rate_limited_primary_loses_to_the_hedge():
+    hedger = _hedger()
+    attempt, _ = _attempts((0.05, 429), (0.0, 200))
+    assert asyncio.run(hedger.run(attempt, is_failure=_is_failure)) == 200
+    assert hedger.hedge_wins == 1
+
+
+def test_failure_is_returned_when_every_attempt_fails():
+    hedger = _hedger()
+    attempt, _ = _attempts((0.05, 502), (0.0, 503))
+    assert asyncio.run(hedger.run(attempt, is_failure=_is_failure)) in (502, 503)
+    assert not hedger._samples # Failed attempts say nothing about latency
+
+
+def test_latency_is_the_primary_attempts():
+    hedger = _hedger()
+    attempt, _ = _attempts((0.15, 200), (0.0, 503))
+    asyncio.run(hedger.run(attempt, is_failure=_is_failure))
+    assert list(hedger._samples)[0] >= 0.15
+
+    # A fast hedge win records at least the primary's elapsed time, not the hedge's own
+    hedger = _hedger()
+    attempt, _ = _attempts((1.0, 200), (0.0, 200))
+    asyncio.run(hedger.run(attempt))
+    assert list(hedger._samples)[0] >= 0.01
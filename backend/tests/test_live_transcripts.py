@@ -0,0 +1,105 @@
+# tests/test_live_transcripts.py
+import asyncio
+import time
+import uuid
+
+from app.models import VapiWebhookMessage
+from app.services import transcript_service
+from app.services.tenant_service import current_tenant
+
+
+def _said(call_id: str, role: str, text: str) -> VapiWebhookMessage:
+    return VapiWebhookMessage(type="transcript", role=role, transcript=text, transcriptType="final", call={"id": call_id, "assistantId": "asst-1"})
+
+
+def _ended(call_id: str) -> VapiWebhookMessage:
+    return VapiWebhookMessage(type="end-of-call-report", endedReason="customer-ended-call", call={"id": call_id})
+
+
+def test_late_transcript_event_after_end_of_call_is_dropped():
+    call_id = uuid.uuid4().hex
+
+    async def run():
+        await transcript_service.record_transcript_event(_said(call_id, "user", "Hi there"))
+        await transcript_service.record_transcript_event(_said(call_id, "assistant", "Hello!"))
+        await transcript_service.finish_call(_ended(call_id))
+        # A retried event arrives after the report, then the app shuts down
+        await transcript_service.record_transcript_event(_said(call_id, "user", "Hi there"))
+        await transcript_service.flush_live_transcripts()
+        return await transcript_service.read_transcript(call_id)
+
+    transcript = asyncio.run(run())
+    assert transcript["status"] == "ended"
+    assert [entry["text"] for entry in transcript["entries"]] == ["Hi there", "Hello!"]
+    assert transcript_service.live_transcripts.get(current_tenant().id, call_id) is None
+
+
+def test_partial_copy_never_replaces_a_complete_one():
+    call_id = uuid.uuid4().hex
+    record = {"tenant_id": current_tenant().id, "call_id": call_id, "entries": [{"offset": 0, "role": "user", "text": "Bye", "seconds_from_start": None}]}
+    assert transcript_service._write({**record, "complete": True})
+    assert not transcript_service._write({**record, "entries": [], "complete": False})
+    stored = transcript_service.load_stored_transcript(call_id)
+    assert stored["complete"] and len(stored["entries"]) == 1
+
+
+def _slowed(monkeypatch, name: str, seconds: float, after: bool = False):
+    """
+    Makes the first call of a blocking store function (run in a thread) slow: before it
+    does its work, or `after` it (a read that returns what was on disk back then).
+    """
+    original = getattr(transcript_service, name)
+    calls = []
+
+    def slow(*args, **kwargs):
+        calls.append(args)
+        first = len(calls) == 1
+        if first and not after:
+            time.sleep(seconds)
+        result = original(*args, **kwargs)
+        if first and after:
+            time.sleep(seconds)
+        return result
+
+    monkeypatch.setattr(transcript_service, name, slow)
+
+
+def test_event_arriving_while_the_report_is_stored_is_dropped(monkeypatch):
+    call_id = uuid.uuid4().hex
+    _slowed(monkeypatch, "_write", 0.2)
+
+    async def run():
+        await transcript_service.record_transcript_event(_said(call_id, "user", "See you"))
+        finishing = asyncio.create_task(transcript_service.finish_call(_ended(call_id)))
+        await asyncio.sleep(0.05) # The report's buffer is popped; its write is still going on
+        await transcript_service.record_transcript_event(_said(call_id, "assistant", "Bye!"))
+        assert transcript_service.live_transcripts.get(current_tenant().id, call_id) is None
+        await finishing
+        return await transcript_service.read_transcript(call_id)
+
+    transcript = asyncio.run(run())
+    assert transcript["status"] == "ended"
+    assert [entry["text"] for entry in transcript["entries"]] == ["See you"]
+
+
+def test_event_whose_load_outlasts_the_report_does_not_revive_the_call(monkeypatch):
+    call_id = uuid.uuid4().hex
+    tenant_id = current_tenant().id
+
+    async def run():
+        await transcript_service.record_transcript_event(_said(call_id, "user", "Still there?"))
+        # Evicted mid-call: an incomplete copy is on disk and nothing is buffered
+        buffer = transcript_service.live_transcripts.pop(tenant_id, call_id)
+        await transcript_service._flush({**buffer.to_dict(), "complete": False})
+
+        _slowed(monkeypatch, "load_stored_transcript", 0.2, after=True)
+        late = asyncio.create_task(transcript_service.record_transcript_event(_said(call_id, "assistant", "Yes!")))
+        await asyncio.sleep(0.05) # The event is reading the incomplete copy
+        await transcript_service.finish_call(_ended(call_id))
+        await late
+        assert transcript_service.live_transcripts.get(tenant_id, call_id) is None
+        return await transcript_service.read_transcript(call_id)
+
+    transcript = asyncio.run(run())
+    assert transcript["status"] == "ended"
+    assert [entry["text"] for entry in transcript["entries"]] == ["Still there?"]
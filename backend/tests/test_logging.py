@@ -0,0 +1,46 @@
+# tests/test_logging.py
+import logging
+
+from pydantic import BaseModel
+
+from app.services.logging_service import SamplingFilter, truncate_payload
+
+
+class CountingModel(BaseModel):
+    text: str = "x" * 50
+
+    def model_dump_json(self, **kwargs) -> str:
+        self.__dict__.setdefault("dumps", 0)
+        self.__dict__["dumps"] += 1
+        return super().model_dump_json(**kwargs)
+
+
+def _logger(rate: float, stream: list) -> logging.Logger:
+    logger = logging.getLogger(f"tests.logging.{rate}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = logging.Handler()
+    handler.emit = lambda record: stream.append(record.getMessage())
+    handler.addFilter(SamplingFilter({logger.name: rate}))
+    logger.addHandler(handler)
+    return logger
+
+
+def test_model_is_only_serialized_when_the_record_is_emitted():
+    model, emitted = CountingModel(), []
+    _logger(0.0, emitted).debug("Payload: %s", truncate_payload(model))
+    assert emitted == [] and model.__dict__.get("dumps", 0) == 0
+
+    _logger(1.0, emitted).debug("Payload: %s", truncate_payload(model, limit=10))
+    assert model.__dict__["dumps"] == 1
+    assert emitted == ['Payload: {"text":"x...<truncated 51 chars>']
+
+
+def test_callable_is_deferred_and_truncated():
+    calls, emitted = [], []
+    produce = lambda: calls.append(1) or "y" * 30
+    _logger(0.0, emitted).debug("%s", truncate_payload(produce))
+    assert calls == []
+    _logger(1.0, emitted).debug("%s", truncate_payload(produce, limit=5))
+    assert calls == [1] and emitted == ["yyyyy...<truncated 25 chars>"]
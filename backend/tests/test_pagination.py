@@ -0,0 +1,38 @@
+# tests/test_pagination.py
+import asyncio
+
+import pytest
+
+from app.services.pagination import InvalidCursorError, keyset_calls
+from tests.fake_vapi import FakeVapiClient, make_calls
+
+
+def _walk(vapi: FakeVapiClient, limit: int, assistant_id="asst-1", max_pages=1000):
+    async def run():
+        rows, cursor = [], None
+        for _ in range(max_pages):
+            page, cursor = await keyset_calls(vapi, assistant_id, limit, cursor)
+            assert len(page) <= limit
+            rows.extend(page)
+            if cursor is None:
+                return rows
+        raise AssertionError("pagination did not terminate")
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("per_timestamp,limit,seed", [(1, 10, 0), (7, 5, 1), (7, 7, 2), (25, 10, 3), (3, 1, 4)])
+def test_keyset_pages_cover_every_call_once_in_order(per_timestamp, limit, seed):
+    vapi = FakeVapiClient(make_calls(120, per_timestamp=per_timestamp), seed=seed)
+    rows = _walk(vapi, limit)
+    keys = [(row["createdAt"], row["id"]) for row in rows]
+    assert len(keys) == len(set(keys)) == 120
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_keyset_cursor_is_scoped_to_its_list():
+    vapi = FakeVapiClient(make_calls(30))
+    _, cursor = asyncio.run(keyset_calls(vapi, "asst-1", 10, None))
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(keyset_calls(vapi, "asst-2", 10, cursor))
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(keyset_calls(vapi, "asst-1", 10, cursor[:-4] + "AAAA"))
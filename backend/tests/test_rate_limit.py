@@ -0,0 +1,60 @@
+# tests/test_rate_limit.py
+import uuid
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.rate_limit import READ, WEBHOOK, WRITE, RateLimitMiddleware, TokenBucketLimiter, _client_key
+from app.services.tenant_service import Tenant, register_tenant
+
+register_tenant(Tenant(id="acme", vapi_api_key="acme-vapi-key", api_keys=("acme-client-key", "acme-other-client-key")))
+
+
+def _client(burst: int = 2) -> TestClient:
+    app = Starlette(routes=[Route("/api/things", lambda request: PlainTextResponse("ok"))])
+    limiter = TokenBucketLimiter({WEBHOOK: (0.001, burst), WRITE: (0.001, burst), READ: (0.001, burst)})
+    return TestClient(RateLimitMiddleware(app, limiter=limiter))
+
+
+def _scope(headers=(), client=("10.0.0.1", 1234)):
+    return {"type": "http", "headers": [(k.encode(), v.encode()) for k, v in headers], "client": client}
+
+
+def test_valid_key_is_bucketed_by_key():
+    assert _client_key(_scope([("x-api-key", "acme-client-key")])) == "key:acme-client-key"
+    assert _client_key(_scope([("x-api-key", "acme-other-client-key")])) == "key:acme-other-client-key"
+
+
+def test_unknown_or_missing_key_falls_back_to_ip():
+    assert _client_key(_scope([("x-api-key", "made-up")])) == "ip:10.0.0.1"
+    assert _client_key(_scope()) == "ip:10.0.0.1"
+
+
+def test_random_keys_do_not_bypass_the_limit():
+    client = _client(burst=2)
+    statuses = [client.get("/api/things", headers={"X-API-Key": uuid.uuid4().hex}).status_code for _ in range(5)]
+    assert statuses[:2] == [200, 200]
+    assert statuses[2:] == [429, 429, 429]
+
+
+def test_random_keys_do_not_grow_the_bucket_table():
+    client = _client(burst=100)
+    for _ in range(20):
+        client.get("/api/things", headers={"X-API-Key": uuid.uuid4().hex})
+    assert len(client.app.limiter._buckets) == 1
+
+
+def test_tenant_key_has_its_own_bucket():
+    client = _client(burst=1)
+    assert client.get("/api/things").status_code == 200
+    assert client.get("/api/things").status_code == 429
+    assert client.get("/api/things", headers={"X-API-Key": "acme-client-key"}).status_code == 200
+
+
+def test_clients_of_one_tenant_do_not_share_a_bucket():
+    client = _client(burst=1)
+    assert client.get("/api/things", headers={"X-API-Key": "acme-client-key"}).status_code == 200
+    assert client.get("/api/things", headers={"X-API-Key": "acme-client-key"}).status_code == 429
+    assert client.get("/api/things", headers={"X-API-Key": "acme-other-client-key"}).status_code == 200
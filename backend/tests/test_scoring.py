@@ -0,0 +1,81 @@
+# tests/test_scoring.py
+import asyncio
+
+from app.config import settings
+from app.services import scoring_service
+
+
+def _calls(count: int):
+    messages = [
+        {"role": "bot" if i % 2 == 0 else "user", "message": "So, um, what do you like to do?", "secondsFromStart": i * 3, "duration": 2000}
+        for i in range(20)
+    ]
+    return [{"id": f"call-{i}", "messages": messages} for i in range(count)]
+
+
+def test_score_calls_yields_to_the_event_loop_between_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_PROCESS_WORKERS", 0)
+    calls = _calls(10 * settings.SCORING_INLINE_CHUNK_SIZE)
+
+    async def run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        scores = await scoring_service.score_calls(calls)
+        done.set()
+        await task
+        return scores, ticks
+
+    scores, ticks = asyncio.run(run())
+    assert len(scores) == len(calls)
+    assert all(score["score"] is not None for score in scores.values())
+    assert ticks >= 10
+
+
+def test_backfill_pages_through_calls_and_scores_large_batches_in_the_pool(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.routers import analytics_router
+    from app.services.executor_service import get_executor, shutdown_executors
+    from tests.fake_vapi import FakeVapiClient, make_calls
+
+    monkeypatch.setattr(settings, "SCORING_PROCESS_WORKERS", 1)
+    monkeypatch.setattr(settings, "SCORING_PROCESS_POOL_MIN_BATCH", 60)
+    monkeypatch.setattr(settings, "SCORING_CHUNK_SIZE", 20)
+    monkeypatch.setattr(analytics_router, "MAX_UPSTREAM_LIMIT", 50) # Several upstream pages per batch
+    pooled = []
+    score_in_pool = scoring_service._score_in_pool
+
+    async def spy(batch):
+        pooled.append(len(batch))
+        return await score_in_pool(batch)
+
+    monkeypatch.setattr(scoring_service, "_score_in_pool", spy)
+    calls = make_calls(230)
+    for call in calls:
+        call["transcript"] = "AI: Hi, what do you do for fun?\nUser: Um, hiking mostly. You?"
+    vapi = FakeVapiClient(calls)
+    app.dependency_overrides[analytics_router.get_vapi_client] = lambda: vapi
+    shutdown_executors() # Restart the pools with the scoring pool enabled
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/calls/scores/backfill", params={"limit": 200})
+            completed = get_executor("scoring").completed
+    finally:
+        app.dependency_overrides.clear()
+        shutdown_executors()
+    assert response.status_code == 200
+    assert response.json()["scored"] == 200
+    assert response.json()["average_score"] is not None
+    assert pooled == [100, 100] # Two 50-call pages per pooled batch
+    assert completed == 10 # 20-call chunks
+    assert len([r for r in vapi.requests if r["kind"] == "calls"]) >= 4
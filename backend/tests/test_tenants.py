@@ -0,0 +1,28 @@
+# tests/test_tenants.py
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.tenant_service import Tenant, register_tenant, resolve_tenant
+
+register_tenant(Tenant(id="globex", vapi_api_key="globex-vapi-key", api_keys=("globex-client-key",)))
+
+
+def test_known_key_selects_its_tenant():
+    assert resolve_tenant(None, "globex-client-key").id == "globex"
+    assert resolve_tenant("globex", "globex-client-key").id == "globex"
+
+
+def test_unknown_key_is_rejected_not_defaulted():
+    assert resolve_tenant(None, "bogus-key") is None
+    assert resolve_tenant(settings.DEFAULT_TENANT_ID, "bogus-key") is None
+
+
+def test_no_credentials_use_the_default_tenant():
+    assert resolve_tenant(None, None).id == settings.DEFAULT_TENANT_ID
+
+
+def test_unknown_key_gets_401():
+    with TestClient(app) as client:
+        response = client.get("/api/assistants/", headers={"X-API-Key": "bogus-key"})
+    assert response.status_code == 401
@@ -0,0 +1,46 @@
+# tests/test_webhook_security.py
+import time
+
+import pytest
+
+from app.config import settings
+from app.dependencies import security
+from app.dependencies.security import WebhookVerificationError, compute_signature, verify_webhook_signature
+
+SECRET = "test-webhook-secret"
+
+
+@pytest.fixture(autouse=True)
+def fresh_replay_cache():
+    security._seen_signatures.clear()
+
+
+def test_timed_signature_is_accepted_once():
+    body, timestamp = b'{"message": {"type": "status-update"}}', str(int(time.time()))
+    signature = compute_signature(SECRET, body, timestamp)
+    verify_webhook_signature(body, signature, timestamp, SECRET)
+    with pytest.raises(WebhookVerificationError) as e:
+        verify_webhook_signature(body, signature, timestamp, SECRET)
+    assert e.value.reason == "replay"
+
+
+def test_untimed_signature_is_still_accepted_by_default():
+    body = b'{"message": {"type": "status-update"}}'
+    assert not settings.VAPI_WEBHOOK_REQUIRE_TIMESTAMP
+    verify_webhook_signature(body, compute_signature(SECRET, body), None, SECRET)
+
+
+def test_timestamp_is_required_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "VAPI_WEBHOOK_REQUIRE_TIMESTAMP", True)
+    body = b'{"message": {"type": "status-update"}}'
+    with pytest.raises(WebhookVerificationError) as e:
+        verify_webhook_signature(body, compute_signature(SECRET, body), None, SECRET)
+    assert e.value.reason == "missing_timestamp"
+
+
+def test_stale_timestamp_is_rejected():
+    body = b"{}"
+    timestamp = str(int(time.time()) - settings.VAPI_WEBHOOK_TOLERANCE_SECONDS - 60)
+    with pytest.raises(WebhookVerificationError) as e:
+        verify_webhook_signature(body, compute_signature(SECRET, body, timestamp), timestamp, SECRET)
+    assert e.value.reason == "stale_timestamp"